@@ -79,6 +79,9 @@ def find_arrays_in_file(file_path: Path) -> Dict[str, List[int]]:
     
     for match in matches:
         array_name = match.group(1)
+        # Only arrays with a txt mapping (skips e.g. the golden digest records and CRC table)
+        if get_output_filename(array_name) is None:
+            continue
         numbers = extract_array_from_content(content, array_name)
         if numbers is not None:
             arrays[array_name] = numbers
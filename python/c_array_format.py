@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+C Array Formatting
+
+Shared, NumPy-vectorized formatter for the C arrays emitted by
+generate_c_arrays.py and generate_cifar10_input.py.
+
+Values are converted through a lookup table of pre-formatted tokens (each
+carrying its trailing separator), so a whole chunk becomes one "".join()
+instead of one Python format call per element. Arrays are streamed to the
+output file in chunks, 12 values per line.
+"""
+
+import io
+
+import numpy as np
+
+VALUES_PER_LINE = 12
+
+# Elements formatted per chunk when streaming (a multiple of VALUES_PER_LINE)
+CHUNK_VALUES = VALUES_PER_LINE * 16384
+
+# Types printed as plain signed integers; any other integer type is masked to a byte
+SIGNED_TYPES = ("int8_t", "int16_t", "int32_t")
+FLOAT_TYPES = ("float",)
+
+# Largest value range that is formatted through a lookup table
+_MAX_LUT_RANGE = 1 << 17
+
+
+def c_values(data, array_type):
+    """
+    Convert array data to the integer (or float) values printed for array_type.
+
+    Signed C types print the value as-is, "float" prints floats and every other
+    type (uint8_t and the fallbacks) prints the value masked to 0..255.
+    """
+    flat = np.asarray(data).reshape(-1)
+    if array_type in FLOAT_TYPES:
+        return flat.astype(np.float64)
+
+    values = flat.astype(np.int64)
+    if array_type not in SIGNED_TYPES:
+        values &= 0xFF
+    return values
+
+
+def _tokens(values, indent):
+    """Format values as tokens with their trailing separator ("v, " or "v,\\n<indent>")."""
+    count = values.size
+    line_end = np.zeros(count, dtype=bool)
+    line_end[VALUES_PER_LINE - 1::VALUES_PER_LINE] = True
+
+    newline = ",\n" + indent
+    if values.dtype.kind == "f":
+        text = np.char.mod("%#.9g", values).astype(object) + "f"
+        # Non-finite values have no C literal; use the <math.h> macros (see _float_prelude())
+        text[np.isnan(values)] = "NAN"
+        text[np.isposinf(values)] = "INFINITY"
+        text[np.isneginf(values)] = "-INFINITY"
+        return np.where(line_end, text + newline, text + ", ")
+
+    lo = int(values.min())
+    hi = int(values.max())
+    if hi - lo < _MAX_LUT_RANGE:
+        lut = np.arange(lo, hi + 1).astype(str).astype(object)
+        table = np.concatenate([lut + ", ", lut + newline])
+        index = values - lo
+        index[line_end] += lut.size
+        return table[index]
+
+    text = values.astype(str).astype(object)
+    return np.where(line_end, text + newline, text + ", ")
+
+
+def write_c_values(f, data, array_type="uint8_t", indent="    "):
+    """Stream the comma-separated body of a C initializer, 12 values per line."""
+    values = c_values(data, array_type)
+    total = values.size
+    if total == 0:
+        return
+
+    f.write(indent)
+    for start in range(0, total, CHUNK_VALUES):
+        tokens = _tokens(values[start:start + CHUNK_VALUES], indent).tolist()
+        if start + CHUNK_VALUES >= total:
+            # Drop the separator after the final value
+            last = tokens[-1]
+            tokens[-1] = last[:last.index(",")]
+        f.write("".join(tokens))
+
+
+def _float_prelude(f, data, array_type):
+    """Include <math.h> before a float array that needs NAN/INFINITY."""
+    if array_type in FLOAT_TYPES and not np.all(np.isfinite(np.asarray(data, dtype=np.float64))):
+        f.write("#include <math.h> /* NAN, INFINITY */\n")
+
+
+def write_c_array(f, data, name, array_type="uint8_t"):
+    """Stream `const <type> <name>[N] = { ... };` (no trailing newline) to f."""
+    size = np.asarray(data).size
+    _float_prelude(f, data, array_type)
+    f.write(f"const {array_type} {name}[{size}] = {{\n")
+    write_c_values(f, data, array_type)
+    f.write("\n};" if size else "};")
+
+
+def write_c_array_2d(f, data, name, array_type="uint8_t"):
+    """Stream stacked (N, ...) data as a packed `const <type> <name>[N][size]` array."""
+    rows = np.asarray(data).reshape(len(data), -1)
+    num_rows, row_size = rows.shape
+
+    _float_prelude(f, rows, array_type)
+    f.write(f"const {array_type} {name}[{num_rows}][{row_size}] = {{\n")
+    for r in range(num_rows):
+        f.write("    {\n")
+        write_c_values(f, rows[r], array_type, indent="        ")
+        f.write("\n    },\n" if r + 1 < num_rows else "\n    }\n")
+    f.write("};")
+
+
+def array_to_c_format(data, name, array_type="uint8_t"):
+    """Convert numpy array to C array format."""
+    out = io.StringIO()
+    write_c_array(out, data, name, array_type)
+    return out.getvalue()
+
+
+def array_2d_to_c_format(data, name, array_type="uint8_t"):
+    """Convert stacked (N, ...) numpy data to a packed C array [N][size]."""
+    out = io.StringIO()
+    write_c_array_2d(out, data, name, array_type)
+    return out.getvalue()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Ethos-U Command Stream Memory Analyzer
+
+Statically tallies the memory traffic of a Vela raw .npz from its decoded
+command stream (see ethosu_cmd_decode.py), without running hardware:
+
+  - per base-pointer region: bytes read and written, the address interval
+    touched and the range of operations touching it,
+  - which memory backs each region, from the System_Config/Memory_Mode the
+    model was compiled with (weights -> const_mem_area, scratch ->
+    arena_mem_area, scratch_fast -> cache_mem_area),
+  - NPU operations that read or write slow memory directly (DMA reads from
+    slow memory are the intended prefetches and are only counted),
+  - accesses that fall outside the size get_region_size() reports for the
+    region in the generated <prefix>_buffers.c (an error), and writes into
+    the weights region (a warning: the weights array is const).
+
+Volumes are footprints: each operation is counted as touching its IFM, IFM2,
+OFM (per tile), weight and scale ranges once; IFMs are counted by tile 0.
+Ethos-U85 feature maps with CHAINED storage are passed between chained
+operations inside the NPU; their REGION register is left over from an earlier
+operation, so they are not counted or checked.
+The hardware may re-read an IFM or weights per block, so real traffic can be
+higher, but the ranking of regions by slow-memory traffic is what decides
+which ones to move into SRAM.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from ethosu_cmd_decode import decode
+from vela_raw_to_c import (
+    MAX_REGIONS, compute_regions, load_vela_npz, region_comment, region_role, region_sizes, vela_memory_areas
+)
+from vela_summary import find_summary_csv, read_summary_csv
+
+ELEM_BYTES = {"B8": 1, "B16": 2, "B32": 4, "B64": 8}
+FAST_MEMORIES = ("Sram",)
+
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+def feature_map_extent(fm):
+    """Bytes spanned from the base offset by a feature map (NHWC or NHCWB16)."""
+    h, w, c = fm["shape"]
+    elem = ELEM_BYTES.get(fm.get("precision"), 1)
+    if fm.get("format") == "NHCWB16":
+        bricks = _ceil_div(c, 16)
+        stride_x = 16 * elem
+        stride_c = w * stride_x
+        stride_y = bricks * stride_c
+        if fm.get("strides"):
+            stride_y, stride_x, stride_c = fm["strides"]
+        return (h - 1) * stride_y + (w - 1) * stride_x + (bricks - 1) * stride_c + 16 * elem
+    stride_c = elem
+    stride_x = c * elem
+    stride_y = w * stride_x
+    if fm.get("strides"):
+        stride_y, stride_x, stride_c = fm["strides"]
+    return (h - 1) * stride_y + (w - 1) * stride_x + (c - 1) * stride_c + elem
+
+
+def dma_extents(dma):
+    """(bytes moved, source span, destination span) of a DMA transfer."""
+    length = dma["length"]
+    sizes = [dma.get("size0", 1), dma.get("size1", 1)] if dma.get("stride_mode") else [1, 1]
+    if dma.get("stride_mode") == "D2":
+        sizes[1] = 1
+    moved = length * sizes[0] * sizes[1]
+    spans = []
+    for side in ("src", "dst"):
+        span = length + (sizes[0] - 1) * dma.get(f"{side}_stride0", length)
+        span += (sizes[1] - 1) * dma.get(f"{side}_stride1", span)
+        spans.append(span)
+    return moved, spans[0], spans[1]
+
+
+def operation_accesses(op):
+    """Yield (kind, operand, region, offset, span, bytes) for every memory access of an operation."""
+    if "dma" in op:
+        dma = op["dma"]
+        moved, src_span, dst_span = dma_extents(dma)
+        # INTERNAL transfers target NPU-internal memory (e.g. LUTs), not a base pointer
+        if dma.get("src_mode") != "INTERNAL":
+            yield "read", "dma_src", dma["src_region"], dma["src"], src_span, moved
+        if dma.get("dst_mode") != "INTERNAL":
+            yield "write", "dma_dst", dma["dst_region"], dma["dst"], dst_span, moved
+        return
+    for operand, kind in (("ifm", "read"), ("ifm2", "read"), ("ofm", "write")):
+        fm = op.get(operand)
+        if not fm or "shape" not in fm or fm.get("storage") == "CHAINED":
+            continue
+        if "tiles" not in fm:
+            span = feature_map_extent(fm)
+            yield kind, operand, fm["region"], fm["offset"], span, span
+            continue
+        for base, height, width in fm["tiles"]:
+            span = feature_map_extent(dict(fm, shape=[height, width, fm["shape"][2]]))
+            yield kind, operand, fm["region"], base, span, span
+    for operand in ("weights", "scales"):
+        stream = op.get(operand)
+        if stream and stream["length"]:
+            yield "read", operand, stream["region"], stream["offset"], stream["length"], stream["length"]
+
+
+def analyze(model, decoded, areas=None):
+    """Per-region traffic, slow-memory accesses, bounds violations and warnings."""
+    region_caps, region_sources = compute_regions(model)
+    sizes = region_sizes(model, region_caps)
+
+    regions = {}
+    slow = []
+    problems = []
+    warnings = []
+    operations = [op for stream in decoded["streams"] for op in stream["operations"]]
+    for index, op in enumerate(operations):
+        for kind, operand, region, offset, span, nbytes in operation_accesses(op):
+            memory = areas[region_role(model, region)] if areas else None
+            stats = regions.setdefault(region, {
+                "region": region,
+                "role": region_role(model, region),
+                "contents": region_comment(model, region_sources, region),
+                "memory": memory,
+                "size": sizes[region] if region < MAX_REGIONS else 0,
+                "read_bytes": 0,
+                "write_bytes": 0,
+                "reads": 0,
+                "writes": 0,
+                "low": offset,
+                "high": offset + span,
+                "first_op": index,
+                "last_op": index,
+                "operands": {},
+            })
+            stats[f"{kind}_bytes"] += nbytes
+            stats[f"{kind}s"] += 1
+            stats["low"] = min(stats["low"], offset)
+            stats["high"] = max(stats["high"], offset + span)
+            stats["last_op"] = index
+            stats["operands"][operand] = stats["operands"].get(operand, 0) + nbytes
+
+            access = {"op_index": index, "op": op["op"], "command": op["offset"], "operand": operand,
+                      "kind": kind, "region": region, "offset": offset, "span": span, "bytes": nbytes}
+            if offset + span > stats["size"]:
+                problems.append(dict(access, problem=f"ends at {offset + span}, past get_region_size({region}) = {stats['size']}"))
+            if kind == "write" and region == model["weight_region"]:
+                warnings.append(dict(access, problem="writes into the weights region"))
+            if memory and memory not in FAST_MEMORIES and operand != "dma_src":
+                slow.append(dict(access, memory=memory))
+
+    return {"regions": [regions[r] for r in sorted(regions)], "slow_accesses": slow, "problems": problems,
+            "warnings": warnings}
+
+
+def placement_hints(result):
+    """Regions ranked by the NPU traffic that would move to SRAM with them."""
+    totals = {}
+    for access in result["slow_accesses"]:
+        totals[access["region"]] = totals.get(access["region"], 0) + access["bytes"]
+    by_region = {stats["region"]: stats for stats in result["regions"]}
+    return [
+        {"region": r, "role": by_region[r]["role"], "memory": by_region[r]["memory"],
+         "slow_bytes": nbytes, "size": by_region[r]["size"]}
+        for r, nbytes in sorted(totals.items(), key=lambda item: -item[1])
+    ]
+
+
+def print_report(name, result, hints):
+    print(f"\n{'='*60}")
+    print(f"Command Stream Memory Traffic: {name}")
+    print(f"{'='*60}")
+    print(f"{'region':>6}  {'role':<12}  {'memory':<12}  {'size':>9}  {'read':>10}  {'written':>10}  "
+          f"{'interval':<21}  {'ops':<9}  contents")
+    for stats in result["regions"]:
+        interval = f"[0x{stats['low']:x}, 0x{stats['high']:x})"
+        print(
+            f"{stats['region']:>6}  {stats['role']:<12}  {str(stats['memory'] or '-'):<12}  {stats['size']:>9}  "
+            f"{stats['read_bytes']:>10}  {stats['write_bytes']:>10}  {interval:<21}  "
+            f"{stats['first_op']:>3}..{stats['last_op']:<4}  {stats['contents']}"
+        )
+        operands = ", ".join(f"{k} {v}" for k, v in sorted(stats["operands"].items(), key=lambda item: -item[1]))
+        print(f"{'':>8}bytes by operand: {operands}")
+
+    slow = result["slow_accesses"]
+    if slow:
+        counts = {}
+        for access in slow:
+            key = (access["region"], access["memory"], access["operand"])
+            count, nbytes = counts.get(key, (0, 0))
+            counts[key] = (count + 1, nbytes + access["bytes"])
+        print(f"\nNPU accesses to slow memory ({len(slow)}):")
+        for (region, memory, operand), (count, nbytes) in sorted(counts.items()):
+            print(f"  region {region} ({memory}) {operand:<8} {count:>4} access(es)  {nbytes:>10} bytes")
+        print("\nRegions worth placing in SRAM (slow-memory NPU traffic they would remove):")
+        for hint in hints:
+            print(f"  region {hint['region']} ({hint['role']}, {hint['memory']}): {hint['slow_bytes']} bytes, "
+                  f"needs {hint['size']} bytes of SRAM (vela_raw_to_c.py --placement {hint['region']}=SRAM)")
+    else:
+        print("\nNo NPU operation accesses slow memory directly.")
+
+    for title, entries in (("Out of bounds", result["problems"]), ("Warnings", result["warnings"])):
+        if not entries:
+            continue
+        print(f"\n{title} ({len(entries)}):")
+        for p in entries[:20]:
+            print(f"  op {p['op_index']} {p['op']} @{p['command']:05d} {p['operand']} "
+                  f"r{p['region']}+0x{p['offset']:x} span {p['span']}: {p['problem']}")
+        if len(entries) > 20:
+            print(f"  ... {len(entries) - 20} more (see --json)")
+    if not result["problems"]:
+        print("\nAll accesses stay inside the region sizes.")
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Static per-region memory traffic analysis of a Vela command stream")
+    parser.add_argument("npz", help="Vela raw .npz (--output-format raw)")
+    parser.add_argument("--vela-config", default=os.path.join(script_dir, os.pardir, "config", "ambiq_final.ini"),
+                        help="Vela .ini the model was compiled with")
+    parser.add_argument("--system-config", default=None,
+                        help="Vela System_Config name (default: from the summary CSV next to the npz)")
+    parser.add_argument("--memory-mode", default=None,
+                        help="Vela Memory_Mode name (default: from the summary CSV next to the npz)")
+    parser.add_argument("--summary-csv", default=None, help="Vela summary CSV naming the configs")
+    parser.add_argument("--arch", default=None, help="NPU instruction set (default: from the payload)")
+    parser.add_argument("--json", default=None, help="Also write the analysis as JSON")
+    args = parser.parse_args()
+
+    model = load_vela_npz(args.npz)
+    decoded = decode(model["cmd_data"].tobytes(), args.arch)
+
+    system_config, memory_mode = args.system_config, args.memory_mode
+    if not (system_config and memory_mode):
+        stem = os.path.basename(args.npz)
+        stem = stem[:-len("_vela.npz")] if stem.endswith("_vela.npz") else os.path.splitext(stem)[0]
+        summary_csv = args.summary_csv or find_summary_csv(os.path.dirname(os.path.abspath(args.npz)), stem, system_config)
+        if summary_csv:
+            summary = read_summary_csv(summary_csv)
+            system_config = system_config or summary.get("system_config")
+            memory_mode = memory_mode or summary.get("memory_mode")
+
+    areas = None
+    if system_config and memory_mode:
+        areas = vela_memory_areas(args.vela_config, system_config, memory_mode)
+        print(f"Memory config: System_Config {system_config}, Memory_Mode {memory_mode} -> "
+              + ", ".join(f"{role} {mem}" for role, mem in areas.items()))
+    else:
+        print("Warning: no System_Config/Memory_Mode; slow-memory accesses are not flagged", file=sys.stderr)
+
+    result = analyze(model, decoded, areas)
+    hints = placement_hints(result)
+    print_report(model["npz_name"], result, hints)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "npz": args.npz, "arch": decoded["arch"], "system_config": system_config, "memory_mode": memory_mode,
+                "memory_areas": areas, "placement_hints": hints, **result,
+            }, f, indent=1)
+        print(f"\nSaved analysis: {args.json}")
+
+    if result["problems"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Ethos-U Command Stream Decoder
+
+Decodes the driver payload Vela emits as cmd_data (the "COP1" custom operator
+payload: optimizer config, NOPs and the command stream) into a readable
+listing and a JSON form, so command streams can be inspected and compared
+across Vela versions.
+
+The instruction set is read from the register interface headers of the
+bundled driver (ethosu55/65/85_interface.h): the cmd0/cmd1 opcode enums, the
+per-command bitfield structs and the enum type of each field. The NPU is
+detected from the optimizer config in the payload (or given with --arch).
+
+Commands are decoded from a NumPy word view of the stream and replayed into
+a register state; every NPU_OP_* command becomes an operation carrying the
+state it consumes: IFM/IFM2/OFM region, offset and shape, weight and scale
+region/offset/length, kernel size/stride/dilation, and DMA transfers.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+INTERFACE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "ethos-u-core-driver-real", "src"
+)
+INTERFACE_HEADERS = {
+    "ethos-u55": "ethosu55_interface.h",
+    "ethos-u65": "ethosu65_interface.h",
+    "ethos-u85": "ethosu85_interface.h",
+}
+# CONFIG.product of the optimizer config word
+PRODUCTS = {0: "ethos-u55", 1: "ethos-u65", 2: "ethos-u85"}
+
+PAYLOAD_FOURCC = 0x31504F43  # "COP1"
+DRIVER_ACTIONS = {0: "RESERVED", 1: "OPTIMIZER_CONFIG", 2: "COMMAND_STREAM", 5: "NOP"}
+
+CMD1_CTRL = 1
+
+
+class Isa:
+    """Opcode names and field layouts of one NPU's command stream."""
+
+    def __init__(self, arch, header_text):
+        self.arch = arch
+        enums = {
+            name: {int(v): k for k, v in re.findall(r"(\w+)\s*=\s*(\d+)", body)}
+            for name, body in re.findall(r"enum (\w+)\s*\{([^}]*)\}", header_text)
+        }
+        self.cmd0 = {code: name[len("CMD0_OPCODE_"):] for code, name in enums["cmd0_opcode"].items()}
+        self.cmd1 = {code: name[len("CMD1_OPCODE_"):] for code, name in enums["cmd1_opcode"].items()}
+
+        # Field -> enum type, from the typed constructor arguments
+        field_enums = {}
+        for struct, args in re.findall(r"(npu_\w+)_t\(([^)]*)\)\s*:", header_text):
+            for enum, field in re.findall(r"NPU_NAMESPACE::(\w+)\s+_(\w+)", args):
+                field_enums.setdefault(struct, {})[field] = enum
+
+        # Bitfield layout per command: [(field, shift, mask, value names)]
+        self.layouts = {}
+        pattern = r"struct (npu_\w+)_t\s*\{\s*#ifdef __cplusplus\s*private:\s*#endif(.*?)#ifdef __cplusplus"
+        for struct, body in re.findall(pattern, header_text, re.S):
+            shift = 0
+            fields = []
+            for field, bits in re.findall(r"uint32_t\s+(\w+)\s*:\s*(\d+);", body):
+                bits = int(bits)
+                if not field.startswith("reserved") and field not in ("opcode", "control"):
+                    enum = field_enums.get(struct, {}).get(field)
+                    names = None
+                    if enum in enums:
+                        prefix = enum.upper() + "_"
+                        names = {v: n[len(prefix):] if n.startswith(prefix) else n for v, n in enums[enum].items()}
+                    fields.append((field, shift, (1 << bits) - 1, names))
+                shift += bits
+            self.layouts[struct.upper()] = fields
+
+    def decode_fields(self, name, value):
+        """Field values of one command; addr_hi/addr_lo are merged into addr."""
+        fields = {}
+        for field, shift, mask, names in self.layouts.get(name, []):
+            raw = (value >> shift) & mask
+            fields[field] = names.get(raw, raw) if names else raw
+        if "addr_lo" in fields:
+            fields["addr"] = (fields.pop("addr_hi", 0) << 32) | fields.pop("addr_lo")
+        return fields
+
+
+@lru_cache(maxsize=None)
+def load_isa(arch, interface_dir=INTERFACE_DIR):
+    path = os.path.join(interface_dir, INTERFACE_HEADERS[arch])
+    try:
+        with open(path) as f:
+            return Isa(arch, f.read())
+    except OSError:
+        raise SystemExit(f"Cannot read {path}; pass --interface-dir pointing at the driver's src directory")
+
+
+def read_cmd_data(path):
+    """Driver payload bytes from a Vela raw .npz, a generated *_cmd_data.h or a raw binary."""
+    if path.endswith(".npz"):
+        with np.load(path, allow_pickle=False) as z:
+            return np.asarray(z["cmd_data"]).tobytes()
+    if path.endswith(".h"):
+        with open(path) as f:
+            text = f.read()
+        body = text[text.index("{") + 1:text.index("}")]
+        return bytes(int(b, 16) for b in re.findall(r"0x([0-9a-fA-F]{1,2})\b", body))
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def parse_payload(blob):
+    """
+    Split the driver payload into its driver actions.
+
+    Returns (header, streams): header describes the optimizer config, and
+    streams is a list of (word_offset, uint32 array) command streams.
+    """
+    words = np.frombuffer(blob[:len(blob) // 4 * 4], dtype="<u4")
+    if not len(words) or int(words[0]) != PAYLOAD_FOURCC:
+        # Not a driver payload: treat the whole blob as one command stream
+        return {"fourcc": None, "actions": []}, [(0, words)]
+
+    header = {"fourcc": "COP1", "actions": []}
+    streams = []
+    pos = 1
+    while pos < len(words):
+        word = int(words[pos])
+        action = word & 0xFF
+        name = DRIVER_ACTIONS.get(action, f"UNKNOWN_{action}")
+        header["actions"].append(name)
+        if action == 1:
+            cfg, ident = int(words[pos + 1]), int(words[pos + 2])
+            header["optimizer_config"] = {
+                "product": PRODUCTS.get(cfg >> 28, f"unknown({cfg >> 28})"),
+                "macs_per_cc": 1 << (cfg & 0xF),
+                "cmd_stream_version": (cfg >> 4) & 0xF,
+                "custom_dma": (cfg >> 27) & 1,
+                "arch_version": f"{ident >> 28}.{(ident >> 20) & 0xFF}.{(ident >> 16) & 0xF}",
+                "release": f"r{(ident >> 8) & 0xF}p{(ident >> 4) & 0xF}",
+                "word": f"0x{cfg:08x}",
+                "id": f"0x{ident:08x}",
+            }
+            pos += 3
+        elif action == 2:
+            length = ((word >> 8) & 0xFF) << 16 | (word >> 16)
+            streams.append((pos + 1, words[pos + 1:pos + 1 + length]))
+            pos += 1 + length
+        elif action == 5:
+            pos += 1
+        else:
+            break  # The driver rejects unknown actions too
+    return header, streams
+
+
+def decode_commands(words, isa):
+    """Decode a command stream into [{"offset", "opcode", "fields"}]."""
+    opcodes = (words & 0x3FF).tolist()
+    ctrl = ((words >> 14) & 0x3).tolist()
+    values = words.tolist()
+
+    commands = []
+    pos = 0
+    while pos < len(values):
+        if ctrl[pos] == CMD1_CTRL:
+            name = isa.cmd1.get(opcodes[pos], f"CMD1_{opcodes[pos]}")
+            payload = values[pos + 1] if pos + 1 < len(values) else 0
+            value = values[pos] | payload << 32
+            size = 2
+        else:
+            name = isa.cmd0.get(opcodes[pos], f"CMD0_{opcodes[pos]}")
+            value = values[pos]
+            size = 1
+        commands.append({"offset": pos, "opcode": name, "fields": isa.decode_fields(name, value)})
+        pos += size
+    return commands
+
+
+def _value(fields):
+    """The single meaningful value of a register write (addr, length or only field)."""
+    for key in ("addr", "length"):
+        if key in fields:
+            return fields[key]
+    return next(iter(fields.values())) if len(fields) == 1 else fields
+
+
+def _feature_map(state, prefix, width_reg):
+    if f"NPU_SET_{prefix}_REGION" not in state:
+        return None
+    fm = {
+        "region": state[f"NPU_SET_{prefix}_REGION"]["region"],
+        "offset": _value(state.get(f"NPU_SET_{prefix}_BASE0", {"addr": 0})),
+    }
+    regs = ("HEIGHT_M1" if prefix == "OFM" else "HEIGHT0_M1", width_reg, "DEPTH_M1")
+    dims = [state.get(f"NPU_SET_{prefix}_{r}") for r in regs]
+    if prefix == "IFM2":
+        # IFM2 tiles default to the IFM tile shape; its depth is always the IFM's
+        dims = [d if d is not None and r != "DEPTH_M1" else state.get(f"NPU_SET_IFM_{r}") for d, r in zip(dims, regs)]
+    if all(d is not None for d in dims):
+        fm["shape"] = [_value(d) + 1 for d in dims]
+    precision = state.get(f"NPU_SET_{prefix}_PRECISION")
+    if precision:
+        fm["precision"] = precision.get("activation_precision")
+        fm["format"] = precision.get("activation_format")
+        if "activation_storage" in precision:
+            # Ethos-U85: CHAINED maps stay in the NPU and are not read from or written to memory
+            fm["storage"] = precision["activation_storage"]
+    strides = [state.get(f"NPU_SET_{prefix}_STRIDE_{axis}") for axis in "YXC"]
+    if all(st is not None for st in strides):
+        fm["strides"] = [_value(st) for st in strides]
+    if prefix == "OFM" and "shape" in fm:
+        tiles = _ofm_tiles(state, fm["shape"])
+        if len(tiles) > 1:
+            fm["tiles"] = tiles
+    return fm
+
+
+def _ofm_tiles(state, shape):
+    """
+    [(base, height, width)] of the OFM tiles in use. Tile 0 is height0 x
+    width0; tiles 1 (right of width0), 2 (below height0) and 3 (below
+    height1, right of width0) hold the rest, e.g. when writing into a ring.
+    """
+    height, width, _ = shape
+    h0 = min(_value(state.get("NPU_SET_OFM_HEIGHT0_M1", {"height_m1": height - 1})) + 1, height)
+    h1 = min(_value(state.get("NPU_SET_OFM_HEIGHT1_M1", {"height_m1": height - 1})) + 1, height)
+    w0 = min(_value(state.get("NPU_SET_OFM_WIDTH0_M1", {"width_m1": width - 1})) + 1, width)
+    base = [_value(state.get(f"NPU_SET_OFM_BASE{i}", {"addr": 0})) for i in range(4)]
+    tiles = [(base[0], h0, w0)]
+    if width > w0:
+        tiles.append((base[1], h1, width - w0))
+    if height > h0:
+        tiles.append((base[2], height - h0, w0))
+    if width > w0 and height > h1:
+        tiles.append((base[3], height - h1, width - w0))
+    return tiles
+
+
+def _ifm2_is_scalar(state):
+    broadcast = state.get("NPU_SET_IFM2_BROADCAST", {})
+    return broadcast.get("broadcast_mode") == "SCALAR" or broadcast.get("broadcast_constant") == 1
+
+
+def summarize_operation(op, state):
+    """The state an NPU_OP_* command consumes, as a flat dict."""
+    kind = op["opcode"][len("NPU_OP_"):]
+    summary = {"offset": op["offset"], "op": kind}
+    summary.update(op["fields"])
+
+    if kind in ("CONV", "DEPTHWISE", "POOL", "ELEMENTWISE", "RESIZE"):
+        summary["ifm"] = _feature_map(state, "IFM", "WIDTH0_M1")
+        summary["ofm"] = _feature_map(state, "OFM", "WIDTH_M1")
+        if kind == "ELEMENTWISE":
+            if _ifm2_is_scalar(state):
+                scalar = state.get("NPU_SET_IFM2_SCALAR") or state.get("NPU_SET_OP_SCALAR", {})  # Ethos-U55/65, U85
+                summary["ifm2"] = {"scalar": next(iter(scalar.values()), 0)}
+            else:
+                summary["ifm2"] = _feature_map(state, "IFM2", "WIDTH0_M1")
+            # Elementwise inputs never exceed the OFM (only broadcast smaller);
+            # Vela leaves stale IFM dimensions in place when they are unused.
+            for key in ("ifm", "ifm2"):
+                fm = summary[key]
+                if fm and "shape" in fm and summary["ofm"] and "shape" in summary["ofm"]:
+                    fm["shape"] = [min(i, o) for i, o in zip(fm["shape"], summary["ofm"]["shape"])]
+        if kind in ("CONV", "DEPTHWISE", "POOL"):
+            stride = state.get("NPU_SET_KERNEL_STRIDE", {})
+            summary["kernel"] = {
+                "width": _value(state.get("NPU_SET_KERNEL_WIDTH_M1", {"width_m1": 0})) + 1,
+                "height": _value(state.get("NPU_SET_KERNEL_HEIGHT_M1", {"height_m1": 0})) + 1,
+                "stride_x": (stride.get("stride_x_msb", 0) << 1 | stride.get("stride_x_lsb", 0)) + 1,
+                "stride_y": (stride.get("stride_y_msb", 0) << 1 | stride.get("stride_y_lsb", 0)) + 1,
+                "dilation_x": stride.get("dilation_x", "NONE"),
+                "dilation_y": stride.get("dilation_y", "NONE"),
+            }
+        if kind in ("CONV", "DEPTHWISE"):
+            summary["weights"] = {
+                "region": state.get("NPU_SET_WEIGHT_REGION", {}).get("region"),
+                "offset": _value(state.get("NPU_SET_WEIGHT_BASE", {"addr": 0})),
+                "length": _value(state.get("NPU_SET_WEIGHT_LENGTH", {"length": 0})),
+            }
+            summary["scales"] = {
+                "region": state.get("NPU_SET_SCALE_REGION", {}).get("region"),
+                "offset": _value(state.get("NPU_SET_SCALE_BASE", {"addr": 0})),
+                "length": _value(state.get("NPU_SET_SCALE_LENGTH", {"length": 0})),
+            }
+    elif kind == "DMA_START":
+        src = state.get("NPU_SET_DMA0_SRC_REGION", {})
+        dst = state.get("NPU_SET_DMA0_DST_REGION", {})
+        summary["dma"] = {
+            "src_region": src.get("region"),
+            "src_mode": src.get("region_mode"),
+            "src": _value(state.get("NPU_SET_DMA0_SRC", {"addr": 0})),
+            "dst_region": dst.get("region"),
+            "dst_mode": dst.get("region_mode"),
+            "dst": _value(state.get("NPU_SET_DMA0_DST", {"addr": 0})),
+            "length": _value(state.get("NPU_SET_DMA0_LEN", {"addr": 0})),
+        }
+        # 2D/3D transfers repeat length bytes size0 (x size1) times at the given strides
+        mode = src.get("stride_mode", "D1")
+        if mode != "D1":
+            dma = summary["dma"]
+            dma["stride_mode"] = mode
+            for reg in ("SIZE0", "SIZE1", "SRC_STRIDE0", "SRC_STRIDE1", "DST_STRIDE0", "DST_STRIDE1"):
+                if f"NPU_SET_DMA0_{reg}" in state:
+                    dma[reg.lower()] = _value(state[f"NPU_SET_DMA0_{reg}"])
+    return summary
+
+
+def decode_operations(commands):
+    """Replay register writes and emit one summary per NPU_OP_* command."""
+    state = {}
+    operations = []
+    for cmd in commands:
+        if cmd["opcode"].startswith("NPU_OP_"):
+            operations.append(summarize_operation(cmd, state))
+        else:
+            state[cmd["opcode"]] = cmd["fields"]
+    return operations
+
+
+def decode(blob, arch=None, interface_dir=INTERFACE_DIR):
+    """Decode a driver payload into a JSON-serializable dict."""
+    header, streams = parse_payload(blob)
+    if arch is None:
+        arch = header.get("optimizer_config", {}).get("product")
+        if arch not in INTERFACE_HEADERS:
+            raise SystemExit("Cannot detect the NPU from the payload; pass --arch")
+    isa = load_isa(arch, interface_dir)
+
+    result = {"arch": arch, "header": header, "streams": []}
+    for offset, words in streams:
+        commands = decode_commands(words, isa)
+        result["streams"].append({
+            "word_offset": offset,
+            "words": int(len(words)),
+            "commands": commands,
+            "operations": decode_operations(commands),
+        })
+    return result
+
+
+def _fmt_fields(fields):
+    return " ".join(
+        f"{k}=0x{v:x}" if k == "addr" and isinstance(v, int) else f"{k}={v}" for k, v in fields.items()
+    )
+
+
+def _fmt_fm(fm):
+    if not fm:
+        return "-"
+    if "scalar" in fm:
+        return f"scalar {fm['scalar']}"
+    shape = "x".join(str(d) for d in fm.get("shape", [])) or "?"
+    if fm.get("storage") == "CHAINED":
+        return f"chained {shape}"
+    return f"r{fm['region']}+0x{fm['offset']:x} {shape}"
+
+
+def format_operation(op):
+    kind = op["op"]
+    parts = [f"{kind:<11}"]
+    if "ifm" in op:
+        parts.append(f"ifm {_fmt_fm(op['ifm'])}")
+    if op.get("ifm2"):
+        parts.append(f"ifm2 {_fmt_fm(op['ifm2'])}")
+    if "ofm" in op:
+        parts.append(f"ofm {_fmt_fm(op['ofm'])}")
+    if "kernel" in op:
+        k = op["kernel"]
+        parts.append(f"kernel {k['width']}x{k['height']}/{k['stride_x']}x{k['stride_y']}")
+    if "weights" in op:
+        w = op["weights"]
+        parts.append(f"weights r{w['region']}+0x{w['offset']:x} len {w['length']}")
+    if "dma" in op:
+        d = op["dma"]
+        parts.append(f"r{d['src_region']}+0x{d['src']:x} -> r{d['dst_region']}+0x{d['dst']:x} len {d['length']}")
+    extras = {k: v for k, v in op.items() if k not in ("offset", "op", "ifm", "ifm2", "ofm", "kernel", "weights", "scales", "dma")}
+    if extras:
+        parts.append(_fmt_fields(extras))
+    return "  ".join(parts)
+
+
+def print_listing(result, show_commands=False):
+    header = result["header"]
+    print(f"Payload: {header['fourcc'] or 'raw command stream'}  arch: {result['arch']}")
+    cfg = header.get("optimizer_config")
+    if cfg:
+        print(
+            f"Optimizer config: {cfg['product']} {cfg['macs_per_cc']} MACs/cc, "
+            f"cmd stream v{cfg['cmd_stream_version']}, arch {cfg['arch_version']} {cfg['release']}"
+        )
+    for index, stream in enumerate(result["streams"]):
+        ops = stream["operations"]
+        counts = {}
+        for op in ops:
+            counts[op["op"]] = counts.get(op["op"], 0) + 1
+        print(f"\nCommand stream {index}: {stream['words']} words at payload word {stream['word_offset']}, "
+              f"{len(stream['commands'])} commands, {len(ops)} operations "
+              f"({', '.join(f'{n} {k}' for k, n in sorted(counts.items()))})")
+        if show_commands:
+            for cmd in stream["commands"]:
+                marker = "*" if cmd["opcode"].startswith("NPU_OP_") else " "
+                print(f"  {cmd['offset']:05d} {marker} {cmd['opcode']:<32} {_fmt_fields(cmd['fields'])}")
+        else:
+            for n, op in enumerate(ops):
+                print(f"  {n:4d}  @{op['offset']:05d}  {format_operation(op)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode an Ethos-U driver payload / command stream")
+    parser.add_argument("input", help="Vela raw .npz, generated *_cmd_data.h, or raw payload binary")
+    parser.add_argument("--arch", choices=sorted(INTERFACE_HEADERS), default=None,
+                        help="NPU instruction set (default: from the payload's optimizer config)")
+    parser.add_argument("--commands", action="store_true",
+                        help="List every command with its fields instead of the operation summary")
+    parser.add_argument("--json", default=None, help="Also write the decoded stream as JSON ('-' for stdout)")
+    parser.add_argument("--interface-dir", default=INTERFACE_DIR,
+                        help="Directory with ethosu55/65/85_interface.h (default: the bundled driver's src)")
+    args = parser.parse_args()
+
+    result = decode(read_cmd_data(args.input), args.arch, args.interface_dir)
+
+    if args.json == "-":
+        json.dump(result, sys.stdout, indent=1)
+        print()
+        return
+    print_listing(result, args.commands)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=1)
+        print(f"\nSaved JSON: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,19 +5,38 @@ TFLite Model C Array Generator
 This script executes a TFLite model with random input data and generates
 C header files containing uint8_t arrays for both input and output tensors.
 Supports 8-bit and 16-bit quantized models.
+
+With --num-vectors, --input-dir or a stacked --input-npy it runs many test
+vectors through a single interpreter and emits packed [N][size] arrays (or a
+raw binary file) instead of a single input/output pair.
+
+With --golden-digest the expected outputs are replaced by a few bytes per
+vector (hash, argmax, max, sum) and a C verifier (see golden_digest.py).
 """
 
 import argparse
 import numpy as np
-import tensorflow as tf
+import os
 import sys
+import time
 from pathlib import Path
 
+from c_array_format import write_c_array, write_c_array_2d
+from tflite_backend import BACKEND_CHOICES, backend_version, invoke_vectors, load_interpreter
+from golden_cache import CACHE_DIR_ENV, DEFAULT_MAX_BYTES, cache_key, load_golden, store_golden
+from golden_digest import DIGEST_CHOICES, check_digest_support, write_golden_digests
+
 
-def generate_random_input(input_details):
-    """Generate random input data based on tensor details."""
-    shape = input_details['shape']
+def generate_random_input(input_details, num_vectors=None):
+    """
+    Generate random input data based on tensor details.
+
+    If num_vectors is given, returns a stacked array of shape (num_vectors, *shape).
+    """
+    shape = tuple(input_details['shape'])
     dtype = input_details['dtype']
+    if num_vectors is not None:
+        shape = (num_vectors,) + shape
 
     # Generate random data in the appropriate range
     if dtype == np.uint8:
@@ -34,7 +53,11 @@ def generate_random_input(input_details):
 
 def load_input_npy(input_npy_path, input_details):
     """Load an input tensor from .npy and validate it against the model input."""
-    input_data = np.load(input_npy_path, allow_pickle=False)
+    return check_input_tensor(np.load(input_npy_path, allow_pickle=False), input_details)
+
+
+def check_input_tensor(input_data, input_details):
+    """Validate an input tensor against the model input."""
     expected_shape = tuple(input_details['shape'])
     expected_dtype = input_details['dtype']
 
@@ -70,33 +93,60 @@ def load_output_npy(output_npy_path, output_details):
     return output_data
 
 
-def array_to_c_format(data, name, array_type="uint8_t"):
-    """Convert numpy array to C array format."""
-    flat_data = data.flatten()
+def stack_vectors(data, details, label="Input"):
+    """
+    Normalize tensor data to a stacked (N, *shape) array of test vectors.
+
+    Accepts a single tensor matching the model shape, a stack of such tensors
+    (N, *shape) or, for batch-1 tensors, a stack along the batch dimension
+    (N, *shape[1:]).
+    """
+    expected_shape = tuple(details['shape'])
+    expected_dtype = details['dtype']
+    shape = tuple(data.shape)
+
+    if data.dtype != expected_dtype:
+        raise ValueError(
+            f"{label} NPY dtype mismatch: expected {expected_dtype}, got {data.dtype}"
+        )
+
+    if shape == expected_shape:
+        return data[np.newaxis]
+    if shape[1:] == expected_shape:
+        return data
+    if expected_shape[0] == 1 and shape[1:] == expected_shape[1:]:
+        return data.reshape((shape[0],) + expected_shape)
+
+    raise ValueError(
+        f"{label} NPY shape mismatch: expected {expected_shape} or a stack of it, got {shape}"
+    )
 
-    # Convert data to appropriate C type
-    if array_type == "int8_t":
-        c_values = [f"{int(val)}" for val in flat_data]
-    elif array_type == "int16_t":
-        c_values = [f"{int(val)}" for val in flat_data]
-    elif array_type == "uint8_t":
-        c_values = [f"{int(val) & 0xFF}" for val in flat_data]
-    else:
-        c_values = [f"{int(val) & 0xFF}" for val in flat_data]
 
-    # Format as C array with 12 values per line for readability
-    lines = []
-    lines.append(f"const {array_type} {name}[{len(flat_data)}] = {{")
+def load_raw_input(input_path):
+    """
+    Load input data from a .npy file, or stack a directory of .npy files
+    (sorted by filename, one vector per file), without validating it.
+    """
+    input_path = Path(input_path)
+    if input_path.is_dir():
+        files = sorted(input_path.glob('*.npy'))
+        if not files:
+            raise ValueError(f"No .npy files found in input directory: {input_path}")
+        return np.stack([np.load(f, allow_pickle=False) for f in files])
 
-    for i in range(0, len(c_values), 12):
-        chunk = c_values[i:i+12]
-        line = "    " + ", ".join(chunk)
-        if i + 12 < len(c_values):
-            line += ","
-        lines.append(line)
+    return np.load(input_path, allow_pickle=False)
 
-    lines.append("};")
-    return "\n".join(lines)
+
+def load_output_vectors(output_npy_path, output_details, num_vectors):
+    """Load stacked output vectors from .npy and validate them against the model output."""
+    output_data = stack_vectors(
+        np.load(output_npy_path, allow_pickle=False), output_details, "Output"
+    )
+    if output_data.shape[0] != num_vectors:
+        raise ValueError(
+            f"Output NPY vector count mismatch: expected {num_vectors}, got {output_data.shape[0]}"
+        )
+    return output_data
 
 
 def get_c_type_for_dtype(dtype):
@@ -107,6 +157,10 @@ def get_c_type_for_dtype(dtype):
         return "int8_t"
     elif dtype == np.int16:
         return "int16_t"
+    elif dtype == np.int32:
+        return "int32_t"
+    elif dtype == np.float32:
+        return "float"
     else:
         return "uint8_t"  # Default fallback
 
@@ -118,19 +172,45 @@ def run_tflite_inference(
     output_npy_path=None,
     source_output_npy_path=None,
     expected_output_npy_path=None,
+    input_dir_path=None,
+    num_vectors=1,
+    batch_size=32,
+    binary_path=None,
+    backend="auto",
+    num_threads=None,
+    cache_dir=None,
+    cache_max_bytes=DEFAULT_MAX_BYTES,
+    golden_digest=None,
+    golden_tolerance=0,
 ):
     """Run inference on TFLite model and generate C arrays."""
 
-    # Load TFLite model
-    interpreter = tf.lite.Interpreter(model_path=str(tflite_path))
-    interpreter.allocate_tensors()
+    input_path = input_dir_path if input_dir_path is not None else input_npy_path
+    raw_input = load_raw_input(input_path) if input_path is not None else None
+
+    # File-based inputs are deterministic, so their outputs can come from the golden cache
+    golden_key = None
+    cached = None
+    if cache_dir is not None and raw_input is not None:
+        golden_key = cache_key(tflite_path, raw_input, backend_version(backend))
+        cached = load_golden(cache_dir, golden_key)
+
+    if cached is not None:
+        interpreter = None
+        input_details, output_details, cached_output = cached
+    else:
+        # Load TFLite model
+        interpreter = load_interpreter(tflite_path, backend, num_threads)
 
-    # Get input and output details
-    input_details = interpreter.get_input_details()[0]
-    output_details = interpreter.get_output_details()[0]
+        # Get input and output details
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
 
     print(f"\n{'='*60}")
     print(f"Model: {tflite_path.name}")
+    print(f"Backend: {backend_version(backend)}")
+    if golden_key is not None:
+        print(f"Golden cache: {'hit' if cached is not None else 'miss'} ({golden_key[:16]})")
     print(f"{'='*60}")
     print(f"\nInput Details:")
     print(f"  Shape: {input_details['shape']}")
@@ -142,19 +222,77 @@ def run_tflite_inference(
     print(f"  Type: {output_details['dtype']}")
     print(f"  Quantization: {output_details['quantization']}")
 
+    if golden_digest is not None:
+        check_digest_support(output_details)
+
+    # Multi-vector inputs: a directory, a stacked .npy or --num-vectors > 1
+    input_vectors = None
+    if input_dir_path is not None:
+        input_vectors = stack_vectors(raw_input, input_details, "Input")
+        input_source = input_dir_path.name
+        print(f"\nLoaded {input_vectors.shape[0]} input vector(s) from: {input_dir_path}")
+    elif input_npy_path is not None:
+        if tuple(raw_input.shape) != tuple(input_details['shape']):
+            input_vectors = stack_vectors(raw_input, input_details, "Input")
+            input_source = input_npy_path.name
+            print(f"\nLoaded {input_vectors.shape[0]} stacked input vector(s) from: {input_npy_path}")
+    elif num_vectors > 1:
+        input_vectors = generate_random_input(input_details, num_vectors)
+        input_source = "generated-random"
+        print(f"\nGenerated {num_vectors} random input vectors")
+
+    if input_vectors is not None:
+        if cached is not None:
+            output_vectors = cached_output
+        else:
+            start = time.perf_counter()
+            output_vectors = invoke_vectors(
+                interpreter, input_details, output_details, input_vectors, batch_size
+            )
+            elapsed = time.perf_counter() - start
+            print(
+                f"Ran {input_vectors.shape[0]} vector(s) in {elapsed:.3f} s "
+                f"({input_vectors.shape[0] / max(elapsed, 1e-9):.1f} vectors/s)"
+            )
+            if golden_key is not None:
+                store_golden(cache_dir, golden_key, input_details, output_details,
+                             output_vectors, cache_max_bytes)
+
+        return write_batched_c_arrays(
+            tflite_path,
+            input_details,
+            output_details,
+            input_vectors,
+            output_vectors,
+            input_source,
+            output_path,
+            output_npy_path,
+            source_output_npy_path,
+            expected_output_npy_path,
+            binary_path,
+            golden_digest,
+            golden_tolerance,
+        )
+
     if input_npy_path is not None:
-        input_data = load_input_npy(input_npy_path, input_details)
+        input_data = check_input_tensor(raw_input, input_details)
         print(f"\nLoaded input from NPY: {input_npy_path}")
     else:
         input_data = generate_random_input(input_details)
         print(f"\nGenerated random input with shape: {input_data.shape}")
 
-    # Run inference
-    interpreter.set_tensor(input_details['index'], input_data)
-    interpreter.invoke()
-
-    # Get output
-    output_data = interpreter.get_tensor(output_details['index'])
+    if cached is not None:
+        output_data = cached_output
+    else:
+        # Run inference
+        interpreter.set_tensor(input_details['index'], input_data)
+        interpreter.invoke()
+
+        # Get output
+        output_data = interpreter.get_tensor(output_details['index'])
+        if golden_key is not None:
+            store_golden(cache_dir, golden_key, input_details, output_details,
+                         output_data, cache_max_bytes)
     print(f"Output shape: {output_data.shape}")
 
     if expected_output_npy_path is not None:
@@ -192,7 +330,13 @@ def run_tflite_inference(
     else:
         output_source = "inference-output"
 
-    c_content = f"""/*
+    # Determine output file path
+    if output_path is None:
+        output_path = tflite_path.parent / f"{model_name}_data.h"
+
+    # Stream the header; the arrays are formatted in bulk by c_array_format
+    with open(output_path, 'w') as f:
+        f.write(f"""/*
  * Generated C arrays for TFLite model: {tflite_path.name}
  *
  * Input file: {input_source}
@@ -210,29 +354,163 @@ def run_tflite_inference(
 #include <stdint.h>
 
 /* Input tensor data */
-{array_to_c_format(input_data, f"{model_name}_input", input_c_type)}
-
-/* Output tensor data */
-{array_to_c_format(output_data, f"{model_name}_output", output_c_type)}
+""")
+        write_c_array(f, input_data, f"{model_name}_input", input_c_type)
+        if golden_digest is None:
+            f.write("\n\n/* Output tensor data */\n")
+            write_c_array(f, output_data, f"{model_name}_output", output_c_type)
+        f.write(f"""
 
 /* Metadata */
 #define {model_name.upper()}_INPUT_SIZE {input_data.size}
 #define {model_name.upper()}_OUTPUT_SIZE {output_data.size}
 
-#endif /* {model_name.upper()}_DATA_H */
-"""
+""")
+        if golden_digest is not None:
+            write_golden_digests(f, model_name, output_data[np.newaxis], output_c_type,
+                                 golden_digest, golden_tolerance)
+            f.write("\n")
+        f.write(f"#endif /* {model_name.upper()}_DATA_H */\n")
+
+    print(f"\n✓ Generated C header file: {output_path}")
+    print(f"  Input array: {model_name}_input[{input_data.size}]")
+    if golden_digest is not None:
+        print(f"  Output digest: {model_name}_golden[1] ({golden_digest}), verifier {model_name}_verify_output()")
+    else:
+        print(f"  Output array: {model_name}_output[{output_data.size}]")
+
+    return output_path
+
+
+def write_batched_c_arrays(
+    tflite_path,
+    input_details,
+    output_details,
+    input_vectors,
+    output_vectors,
+    input_source,
+    output_path=None,
+    output_npy_path=None,
+    source_output_npy_path=None,
+    expected_output_npy_path=None,
+    binary_path=None,
+    golden_digest=None,
+    golden_tolerance=0,
+):
+    """
+    Verify/save stacked outputs and emit packed [N][size] input/output arrays.
+
+    With golden_digest, the outputs are emitted as per-vector digest records
+    (and left out of the binary file) instead.
+    """
+    num_vectors = input_vectors.shape[0]
+
+    if expected_output_npy_path is not None:
+        expected_output_data = load_output_vectors(
+            expected_output_npy_path, output_details, num_vectors
+        )
+        mismatched = [
+            i for i in range(num_vectors)
+            if not np.array_equal(output_vectors[i], expected_output_data[i])
+        ]
+        print(f"Expected output match: {not mismatched}")
+        if mismatched:
+            raise ValueError(
+                f"Model output does not match expected output NPY for {len(mismatched)} "
+                f"vector(s) (first: {mismatched[0]}): {expected_output_npy_path}"
+            )
+        print(f"Verified output against NPY: {expected_output_npy_path}")
+
+    if source_output_npy_path is not None:
+        output_vectors = load_output_vectors(source_output_npy_path, output_details, num_vectors)
+        print(f"Loaded output from NPY: {source_output_npy_path}")
+
+    if output_npy_path is not None:
+        np.save(output_npy_path, output_vectors, allow_pickle=False)
+        print(f"Saved output tensors to NPY: {output_npy_path}")
+
+    if source_output_npy_path is not None:
+        output_source = source_output_npy_path.name
+    elif expected_output_npy_path is not None:
+        output_source = expected_output_npy_path.name
+    elif output_npy_path is not None:
+        output_source = output_npy_path.name
+    else:
+        output_source = "inference-output"
+
+    input_c_type = get_c_type_for_dtype(input_details['dtype'])
+    output_c_type = get_c_type_for_dtype(output_details['dtype'])
+
+    model_name = tflite_path.stem.replace('-', '_').replace('.', '_')
+    input_size = int(np.prod(input_details['shape']))
+    output_size = int(np.prod(output_details['shape']))
 
-    # Determine output file path
     if output_path is None:
         output_path = tflite_path.parent / f"{model_name}_data.h"
 
-    # Write to file
+    output_bytes = 0 if golden_digest is not None else output_vectors.nbytes
+    if binary_path is not None:
+        # Packed row-major: all input vectors followed by all output vectors
+        with open(binary_path, 'wb') as f:
+            f.write(np.ascontiguousarray(input_vectors).tobytes())
+            if golden_digest is None:
+                f.write(np.ascontiguousarray(output_vectors).tobytes())
+
     with open(output_path, 'w') as f:
-        f.write(c_content)
+        f.write(f"""/*
+ * Generated C arrays for TFLite model: {tflite_path.name}
+ *
+ * Vectors: {num_vectors}
+ *
+ * Input file: {input_source}
+ * Input shape: {list(input_details['shape'])}
+ * Input type: {input_details['dtype']}
+ *
+ * Output file: {output_source}
+ * Output shape: {list(output_details['shape'])}
+ * Output type: {output_details['dtype']}
+ */
+
+#ifndef {model_name.upper()}_DATA_H
+#define {model_name.upper()}_DATA_H
+
+#include <stdint.h>
+
+""")
+        if binary_path is not None:
+            f.write(f"""/* Test vectors are stored in: {Path(binary_path).name} */
+#define {model_name.upper()}_BINARY_INPUTS_OFFSET 0
+#define {model_name.upper()}_BINARY_OUTPUTS_OFFSET {input_vectors.nbytes}
+#define {model_name.upper()}_BINARY_SIZE {input_vectors.nbytes + output_bytes}""")
+        else:
+            f.write("/* Input tensor data, one row per vector */\n")
+            write_c_array_2d(f, input_vectors, f"{model_name}_inputs", input_c_type)
+            if golden_digest is None:
+                f.write("\n\n/* Output tensor data, one row per vector */\n")
+                write_c_array_2d(f, output_vectors, f"{model_name}_outputs", output_c_type)
+        f.write(f"""
+
+/* Metadata */
+#define {model_name.upper()}_NUM_VECTORS {num_vectors}
+#define {model_name.upper()}_INPUT_SIZE {input_size}
+#define {model_name.upper()}_OUTPUT_SIZE {output_size}
+
+""")
+        if golden_digest is not None:
+            write_golden_digests(f, model_name, output_vectors, output_c_type, golden_digest, golden_tolerance)
+            f.write("\n")
+        f.write(f"#endif /* {model_name.upper()}_DATA_H */\n")
 
     print(f"\n✓ Generated C header file: {output_path}")
-    print(f"  Input array: {model_name}_input[{input_data.size}]")
-    print(f"  Output array: {model_name}_output[{output_data.size}]")
+    if binary_path is not None:
+        print(f"✓ Generated binary test vectors: {binary_path}")
+    else:
+        print(f"  Input array: {model_name}_inputs[{num_vectors}][{input_size}]")
+    if golden_digest is not None:
+        print(f"  Output digests: {model_name}_golden[{num_vectors}] ({golden_digest}), "
+              f"verifier {model_name}_verify_output() - {output_vectors.nbytes} bytes of outputs not embedded")
+    elif binary_path is None:
+        print(f"  Output array: {model_name}_outputs[{num_vectors}][{output_size}]")
 
     return output_path
 
@@ -277,6 +555,72 @@ def main():
         help='Optional expected output tensor .npy file. Must match the model output shape and dtype.'
     )
 
+    parser.add_argument(
+        '--input-dir',
+        type=str,
+        default=None,
+        help='Optional directory of input tensor .npy files, one test vector per file (sorted by name).'
+    )
+    parser.add_argument(
+        '--num-vectors',
+        type=int,
+        default=1,
+        help='Number of random test vectors to generate when no input is given (default: 1).'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=32,
+        help='Maximum vectors per invoke when the model allows resizing its batch dimension (default: 32, 1 disables).'
+    )
+    parser.add_argument(
+        '--binary',
+        type=str,
+        default=None,
+        help='Write multi-vector inputs followed by outputs to this raw binary file instead of header arrays.'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=BACKEND_CHOICES,
+        default='auto',
+        help='TFLite interpreter backend (default: auto, prefers ai_edge_litert, then tflite_runtime, then tensorflow).'
+    )
+    parser.add_argument(
+        '--num-threads',
+        type=int,
+        default=None,
+        help='Number of interpreter threads (default: backend default).'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=os.environ.get(CACHE_DIR_ENV),
+        help=f'Golden output cache directory for file-based inputs (default: ${CACHE_DIR_ENV}, unset disables the cache).'
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help='Size bound of the golden output cache in MB; least recently used entries are evicted (default: 1024).'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Disable the golden output cache even if a cache directory is configured.'
+    )
+    parser.add_argument(
+        '--golden-digest',
+        choices=DIGEST_CHOICES,
+        default=None,
+        help='Emit a per-vector hash (plus argmax, max and sum) and a C verifier instead of the output arrays.'
+    )
+    parser.add_argument(
+        '--golden-tolerance',
+        type=int,
+        default=0,
+        help='With --golden-digest, accept outputs whose summary is within this many LSBs of the golden one (default: 0, bit-exact).'
+    )
+
     args = parser.parse_args()
 
     tflite_path = Path(args.tflite_file)
@@ -294,6 +638,24 @@ def main():
         Path(args.expected_output_npy) if args.expected_output_npy is not None else None
     )
 
+    input_dir_path = Path(args.input_dir) if args.input_dir is not None else None
+
+    if input_npy_path is not None and input_dir_path is not None:
+        print("Error: --input-npy and --input-dir are mutually exclusive", file=sys.stderr)
+        sys.exit(1)
+
+    if args.golden_tolerance < 0:
+        print("Error: --golden-tolerance must be >= 0", file=sys.stderr)
+        sys.exit(1)
+
+    if args.num_vectors < 1 or args.batch_size < 1:
+        print("Error: --num-vectors and --batch-size must be >= 1", file=sys.stderr)
+        sys.exit(1)
+
+    if input_dir_path is not None and not input_dir_path.is_dir():
+        print(f"Error: input directory not found: {input_dir_path}", file=sys.stderr)
+        sys.exit(1)
+
     if input_npy_path is not None and not input_npy_path.exists():
         print(f"Error: input NPY file not found: {input_npy_path}", file=sys.stderr)
         sys.exit(1)
@@ -314,6 +676,16 @@ def main():
             output_npy_path,
             source_output_npy_path,
             expected_output_npy_path,
+            input_dir_path,
+            args.num_vectors,
+            args.batch_size,
+            args.binary,
+            args.backend,
+            args.num_threads,
+            None if args.no_cache else args.cache_dir,
+            args.cache_max_mb * 1024 * 1024,
+            args.golden_digest,
+            args.golden_tolerance,
         )
     except Exception as e:
         print(f"\nError processing model: {e}", file=sys.stderr)
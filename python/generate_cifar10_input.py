@@ -5,15 +5,46 @@ CIFAR-10 Image to C Array Generator
 This script loads a single image from CIFAR-10, transforms it for the ResNet model,
 runs inference, and generates C header files containing int8_t arrays for both
 input and output tensors, similar to generate_c_arrays.py.
+
+The CIFAR-10 pickle batches are converted once into memory-mapped .npy files,
+so single images load without decoding the whole dataset. Passing several
+--image-index values (or --image-range) runs them through one interpreter,
+reports top-1 accuracy and emits labelled [N][size] arrays.
 """
 
 import argparse
 import numpy as np
-import tensorflow as tf
+import os
 import sys
+import time
 from pathlib import Path
 import pickle
 
+from c_array_format import write_c_array, write_c_array_2d
+from tflite_backend import BACKEND_CHOICES, backend_version, invoke_vectors, load_interpreter
+
+
+CIFAR10_CLASS_NAMES = ['airplane', 'automobile', 'bird', 'cat', 'deer',
+                       'dog', 'frog', 'horse', 'ship', 'truck']
+
+# Directory tf.keras.datasets downloads into
+KERAS_DATASETS_DIR = Path.home() / ".keras" / "datasets"
+
+# Where cifar10.load_data() leaves the extracted pickle batches, relative to
+# KERAS_DATASETS_DIR: Keras 3 extracts into a "-target" directory, Keras 2 did not
+CIFAR10_BATCH_DIRS = (
+    Path("cifar-10-batches-py-target") / "cifar-10-batches-py",
+    Path("cifar-10-batches-py"),
+)
+
+# Default location of the memory-mapped .npy conversion
+CIFAR10_CACHE_DIR = Path.home() / ".keras" / "datasets" / "cifar-10-npy"
+
+CIFAR10_BATCHES = {
+    "train": [f"data_batch_{i}" for i in range(1, 6)],
+    "test": ["test_batch"],
+}
+
 
 def load_cifar10_batch(batch_file):
     """Load a CIFAR-10 batch file."""
@@ -26,101 +57,135 @@ def load_cifar10_batch(batch_file):
     labels = batch[b'labels']
     
     # Reshape to (10000, 32, 32, 3)
-    images = data.reshape(10000, 3, 32, 32).transpose(0, 2, 3, 1)
+    images = data.reshape(-1, 3, 32, 32).transpose(0, 2, 3, 1)
     
     return images, labels
 
 
+def find_cifar10_batches():
+    """Directory holding the extracted CIFAR-10 pickle batches, or None."""
+    for relative in CIFAR10_BATCH_DIRS:
+        data_dir = KERAS_DATASETS_DIR / relative
+        if (data_dir / "data_batch_1").exists() and (data_dir / "test_batch").exists():
+            return data_dir
+    return None
+
+
 def download_cifar10():
-    """Download CIFAR-10 dataset if not present."""
+    """Make sure the CIFAR-10 pickle batches are present, downloading them if needed."""
     cifar10_url = "https://www.cs.toronto.edu/~kriz/cifar-10-python.tar.gz"
-    data_dir = Path.home() / ".keras" / "datasets" / "cifar-10-batches-py"
+    data_dir = find_cifar10_batches()
     
-    if data_dir.exists() and (data_dir / "data_batch_1").exists():
+    if data_dir is not None:
         return data_dir
     
-    # Try to use tensorflow to download
+    # Keras downloads and extracts the pickle batches under KERAS_DATASETS_DIR
     try:
-        (x_train, y_train), (x_test, y_test) = tf.keras.datasets.cifar10.load_data()
-        # Save manually if needed
-        print("CIFAR-10 dataset loaded via TensorFlow")
-        return None  # We'll use the loaded data directly
+        import tensorflow as tf
+        tf.keras.datasets.cifar10.load_data()
+        print("CIFAR-10 dataset downloaded via TensorFlow")
     except Exception as e:
         print(f"Could not load CIFAR-10 via TensorFlow: {e}")
-        print(f"Please download CIFAR-10 manually to: {data_dir}")
+        print(f"Please download CIFAR-10 manually to: {KERAS_DATASETS_DIR / CIFAR10_BATCH_DIRS[-1]}")
         print(f"Or from: {cifar10_url}")
         sys.exit(1)
+    
+    data_dir = find_cifar10_batches()
+    if data_dir is None:
+        searched = ", ".join(str(KERAS_DATASETS_DIR / relative) for relative in CIFAR10_BATCH_DIRS)
+        print(f"Error: CIFAR-10 batch files not found in: {searched}")
+        sys.exit(1)
+    
+    return data_dir
 
 
-def load_cifar10_image(image_index=0, use_test_set=False):
-    """Load a single CIFAR-10 image."""
-    try:
-        # Try to load via TensorFlow/Keras
-        (x_train, y_train), (x_test, y_test) = tf.keras.datasets.cifar10.load_data()
-        
-        if use_test_set:
-            images = x_test
-            labels = y_test
-            dataset_name = "test"
-        else:
-            images = x_train
-            labels = y_train
-            dataset_name = "train"
-        
-        if image_index >= len(images):
-            print(f"Warning: image_index {image_index} >= {len(images)}, using index 0")
-            image_index = 0
-        
-        image = images[image_index]
-        label = labels[image_index][0]  # Unwrap from array
-        
-        # CIFAR-10 class names
-        class_names = ['airplane', 'automobile', 'bird', 'cat', 'deer', 
-                      'dog', 'frog', 'horse', 'ship', 'truck']
-        
-        print(f"Loaded image {image_index} from {dataset_name} set")
-        print(f"  Label: {label} ({class_names[label]})")
-        print(f"  Image shape: {image.shape}")
-        print(f"  Image dtype: {image.dtype}")
-        print(f"  Image range: [{image.min()}, {image.max()}]")
-        
-        return image, label, class_names[label]
-        
-    except Exception as e:
-        print(f"Error loading CIFAR-10: {e}")
-        print("Trying alternative method with pickle files...")
-        
-        # Alternative: try to load from pickle files
-        data_dir = Path.home() / ".keras" / "datasets" / "cifar-10-batches-py"
-        if not data_dir.exists():
-            print(f"Error: CIFAR-10 data directory not found: {data_dir}")
-            sys.exit(1)
-        
-        if use_test_set:
-            batch_file = data_dir / "test_batch"
-        else:
-            batch_file = data_dir / "data_batch_1"
-        
-        if not batch_file.exists():
-            print(f"Error: CIFAR-10 batch file not found: {batch_file}")
-            sys.exit(1)
-        
-        images, labels = load_cifar10_batch(batch_file)
-        
-        if image_index >= len(images):
-            print(f"Warning: image_index {image_index} >= {len(images)}, using index 0")
-            image_index = 0
+def _cache_paths(cache_dir, split):
+    return (
+        Path(cache_dir) / f"cifar10_{split}_images.npy",
+        Path(cache_dir) / f"cifar10_{split}_labels.npy",
+    )
+
+
+def build_cifar10_cache(cache_dir=None):
+    """
+    One-time conversion of the CIFAR-10 pickle batches into .npy files that
+    can be memory-mapped: cifar10_<split>_images.npy (N, 32, 32, 3) uint8 and
+    cifar10_<split>_labels.npy (N,) uint8.
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else CIFAR10_CACHE_DIR
+    
+    for split, batch_names in CIFAR10_BATCHES.items():
+        images_path, labels_path = _cache_paths(cache_dir, split)
+        if images_path.exists() and labels_path.exists():
+            continue
         
-        image = images[image_index]
-        label = labels[image_index]
+        data_dir = download_cifar10()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        print(f"Converting CIFAR-10 {split} batches to: {cache_dir}")
         
-        class_names = ['airplane', 'automobile', 'bird', 'cat', 'deer', 
-                      'dog', 'frog', 'horse', 'ship', 'truck']
+        batches = [load_cifar10_batch(data_dir / name) for name in batch_names]
+        total = sum(len(batch_images) for batch_images, _ in batches)
         
-        print(f"Loaded image {image_index} from {dataset_name} set")
-        print(f"  Label: {label} ({class_names[label]})")
+        # Write to temporary files and rename, so a partial conversion is never used
+        tmp_images_path = images_path.with_suffix(".tmp.npy")
+        tmp_labels_path = labels_path.with_suffix(".tmp.npy")
+        images = np.lib.format.open_memmap(
+            tmp_images_path, mode="w+", dtype=np.uint8, shape=(total, 32, 32, 3)
+        )
+        labels = np.empty(total, dtype=np.uint8)
+        offset = 0
+        for batch_images, batch_labels in batches:
+            images[offset:offset + len(batch_images)] = batch_images
+            labels[offset:offset + len(batch_labels)] = batch_labels
+            offset += len(batch_images)
+        images.flush()
+        del images
+        np.save(tmp_labels_path, labels)
         
-        return image, label, class_names[label]
+        os.replace(tmp_labels_path, labels_path)
+        os.replace(tmp_images_path, images_path)
+    
+    return cache_dir
+
+
+def load_cifar10_split(use_test_set=False, cache_dir=None):
+    """Return memory-mapped (images, labels) arrays for the train or test split."""
+    cache_dir = build_cifar10_cache(cache_dir)
+    images_path, labels_path = _cache_paths(cache_dir, "test" if use_test_set else "train")
+    return np.load(images_path, mmap_mode="r"), np.load(labels_path, mmap_mode="r")
+
+
+def load_cifar10_image(image_index=0, use_test_set=False, cache_dir=None):
+    """Load a single CIFAR-10 image."""
+    images, labels = load_cifar10_split(use_test_set, cache_dir)
+    dataset_name = "test" if use_test_set else "train"
+    
+    if image_index >= len(images):
+        print(f"Warning: image_index {image_index} >= {len(images)}, using index 0")
+        image_index = 0
+    
+    image = np.array(images[image_index])
+    label = int(labels[image_index])
+    
+    print(f"Loaded image {image_index} from {dataset_name} set")
+    print(f"  Label: {label} ({CIFAR10_CLASS_NAMES[label]})")
+    print(f"  Image shape: {image.shape}")
+    print(f"  Image dtype: {image.dtype}")
+    print(f"  Image range: [{image.min()}, {image.max()}]")
+    
+    return image, label, CIFAR10_CLASS_NAMES[label]
+
+
+def load_cifar10_images(image_indices, use_test_set=False, cache_dir=None):
+    """Load several CIFAR-10 images and labels from the memory-mapped cache."""
+    images, labels = load_cifar10_split(use_test_set, cache_dir)
+    image_indices = np.asarray(image_indices, dtype=np.int64)
+    
+    out_of_range = image_indices[(image_indices < 0) | (image_indices >= len(images))]
+    if out_of_range.size:
+        raise IndexError(f"Image index {int(out_of_range[0])} out of range (0..{len(images) - 1})")
+    
+    return np.asarray(images[image_indices]), np.asarray(labels[image_indices])
 
 
 def transform_image_for_model(image, input_details):
@@ -149,35 +214,6 @@ def transform_image_for_model(image, input_details):
     return image_uint8
 
 
-def array_to_c_format(data, name, array_type="int8_t"):
-    """Convert numpy array to C array format (same as generate_c_arrays.py)."""
-    flat_data = data.flatten()
-
-    # Convert data to appropriate C type
-    if array_type == "int8_t":
-        c_values = [f"{int(val)}" for val in flat_data]
-    elif array_type == "int16_t":
-        c_values = [f"{int(val)}" for val in flat_data]
-    elif array_type == "uint8_t":
-        c_values = [f"{int(val) & 0xFF}" for val in flat_data]
-    else:
-        c_values = [f"{int(val) & 0xFF}" for val in flat_data]
-
-    # Format as C array with 12 values per line for readability
-    lines = []
-    lines.append(f"const {array_type} {name}[{len(flat_data)}] = {{")
-
-    for i in range(0, len(c_values), 12):
-        chunk = c_values[i:i+12]
-        line = "    " + ", ".join(chunk)
-        if i + 12 < len(c_values):
-            line += ","
-        lines.append(line)
-
-    lines.append("};")
-    return "\n".join(lines)
-
-
 def get_c_type_for_dtype(dtype):
     """Map numpy dtype to C type."""
     if dtype == np.uint8:
@@ -186,16 +222,151 @@ def get_c_type_for_dtype(dtype):
         return "int8_t"
     elif dtype == np.int16:
         return "int16_t"
+    elif dtype == np.int32:
+        return "int32_t"
+    elif dtype == np.float32:
+        return "float"
     else:
         return "int8_t"  # Default fallback
 
 
-def run_cifar10_inference(tflite_path, image_index=0, use_test_set=False, output_path=None):
+def to_model_input(input_data_uint8, input_details):
+    """Convert uint8 [0, 255] CIFAR-10 data to the model input type."""
+    if input_details['dtype'] == np.int8:
+        # Convert uint8 [0, 255] to int8 [-128, 127] for model
+        input_data = input_data_uint8.astype(np.int32) - 128
+        return np.clip(input_data, -128, 127).astype(np.int8)
+    return input_data_uint8
+
+
+def parse_image_range(value):
+    """Parse a START:STOP image range (STOP exclusive) into a list of indices."""
+    try:
+        start, stop = (int(v) for v in value.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected START:STOP, got: {value}")
+    if start < 0 or stop <= start:
+        raise argparse.ArgumentTypeError(f"Empty or negative image range: {value}")
+    return list(range(start, stop))
+
+
+def run_cifar10_batch_inference(
+    tflite_path,
+    image_indices,
+    use_test_set=False,
+    output_path=None,
+    backend="auto",
+    num_threads=None,
+    batch_size=32,
+    cache_dir=None,
+):
+    """Run many CIFAR-10 images through one interpreter and generate labelled C arrays."""
+    
+    interpreter = load_interpreter(tflite_path, backend, num_threads)
+    input_details = interpreter.get_input_details()[0]
+    output_details = interpreter.get_output_details()[0]
+    dataset_name = 'test' if use_test_set else 'train'
+    num_vectors = len(image_indices)
+    
+    print(f"\n{'='*60}")
+    print(f"Model: {tflite_path.name}")
+    print(f"Backend: {backend_version(backend)}")
+    print(f"{'='*60}")
+    print(f"  Input: {input_details['shape']} {input_details['dtype']}")
+    print(f"  Output: {output_details['shape']} {output_details['dtype']}")
+    print(f"  Images: {num_vectors} from {dataset_name} set")
+    
+    start_time = time.perf_counter()
+    images, labels = load_cifar10_images(image_indices, use_test_set, cache_dir)
+    
+    input_data_uint8 = transform_image_for_model(images, input_details)
+    input_data_uint8 = input_data_uint8.reshape((num_vectors,) + tuple(input_details['shape']))
+    input_data_for_model = to_model_input(input_data_uint8, input_details)
+    
+    output_data = invoke_vectors(
+        interpreter, input_details, output_details, input_data_for_model, batch_size
+    )
+    elapsed = time.perf_counter() - start_time
+    
+    predicted = output_data.reshape(num_vectors, -1).argmax(axis=1)
+    correct = int(np.count_nonzero(predicted == labels))
+    
+    print(f"\n{'='*60}")
+    print("Results")
+    print(f"{'='*60}")
+    print(f"  Top-1 accuracy: {correct}/{num_vectors} ({100.0 * correct / num_vectors:.2f}%)")
+    print(f"  Inference time: {elapsed:.2f}s ({1000.0 * elapsed / num_vectors:.2f} ms/image)")
+    
+    output_c_type = get_c_type_for_dtype(output_details['dtype'])
+    model_name = tflite_path.stem.replace('-', '_').replace('.', '_')
+    guard = model_name.upper()
+    
+    if output_path is None:
+        output_path = tflite_path.parent / f"{model_name}_cifar10_batch_{num_vectors}_data.h"
+    
+    with open(output_path, 'w') as f:
+        f.write(f"""/*
+ * Generated C arrays for TFLite model: {tflite_path.name}
+ * CIFAR-10 Images: {num_vectors} ({dataset_name} set)
+ * Top-1 accuracy: {correct}/{num_vectors}
+ *
+ * Input shape (per vector): {list(input_details['shape'])}
+ * Input type: uint8_t (CIFAR-10 format [0, 255])
+ * Output shape (per vector): {list(output_details['shape'])}
+ * Output type: {output_details['dtype']}
+ */
+
+#ifndef {guard}_DATA_H
+#define {guard}_DATA_H
+
+#include <stdint.h>
+
+/* Input tensor data (CIFAR-10 images) */
+""")
+        write_c_array_2d(f, input_data_uint8, f"{model_name}_inputs", "uint8_t")
+        f.write("\n\n/* Output tensor data */\n")
+        write_c_array_2d(f, output_data, f"{model_name}_outputs", output_c_type)
+        f.write("\n\n/* CIFAR-10 image indices */\n")
+        write_c_array(f, np.asarray(image_indices), f"{model_name}_image_indices", "int32_t")
+        f.write("\n\n/* True labels */\n")
+        write_c_array(f, labels, f"{model_name}_labels", "uint8_t")
+        f.write("\n\n/* Predicted labels */\n")
+        write_c_array(f, predicted, f"{model_name}_predicted", "uint8_t")
+        f.write(f"""
+
+/* Metadata */
+#define {guard}_NUM_VECTORS {num_vectors}
+#define {guard}_INPUT_SIZE {input_data_uint8[0].size}
+#define {guard}_OUTPUT_SIZE {output_data[0].size}
+#define {guard}_TOP1_CORRECT {correct}
+
+#endif /* {guard}_DATA_H */
+""")
+    
+    print(f"\n{'='*60}")
+    print("Generated Files")
+    print(f"{'='*60}")
+    print(f"✓ Generated C header file: {output_path}")
+    print(f"  Input array: {model_name}_inputs[{num_vectors}][{input_data_uint8[0].size}] (uint8_t)")
+    print(f"  Output array: {model_name}_outputs[{num_vectors}][{output_data[0].size}]")
+    print(f"  Label arrays: {model_name}_labels[{num_vectors}], {model_name}_predicted[{num_vectors}]")
+    
+    return output_path
+
+
+def run_cifar10_inference(
+    tflite_path,
+    image_index=0,
+    use_test_set=False,
+    output_path=None,
+    backend="auto",
+    num_threads=None,
+    cache_dir=None,
+):
     """Load CIFAR-10 image, run inference, and generate C arrays."""
     
     # Load TFLite model
-    interpreter = tf.lite.Interpreter(model_path=str(tflite_path))
-    interpreter.allocate_tensors()
+    interpreter = load_interpreter(tflite_path, backend, num_threads)
     
     # Get input and output details
     input_details = interpreter.get_input_details()[0]
@@ -203,6 +374,7 @@ def run_cifar10_inference(tflite_path, image_index=0, use_test_set=False, output
     
     print(f"\n{'='*60}")
     print(f"Model: {tflite_path.name}")
+    print(f"Backend: {backend_version(backend)}")
     print(f"{'='*60}")
     print(f"\nInput Details:")
     print(f"  Shape: {input_details['shape']}")
@@ -218,7 +390,7 @@ def run_cifar10_inference(tflite_path, image_index=0, use_test_set=False, output
     print(f"\n{'='*60}")
     print("Loading CIFAR-10 Image")
     print(f"{'='*60}")
-    image, label, class_name = load_cifar10_image(image_index, use_test_set)
+    image, label, class_name = load_cifar10_image(image_index, use_test_set, cache_dir)
     
     # Transform image for model (returns uint8 for C array)
     print(f"\n{'='*60}")
@@ -230,14 +402,7 @@ def run_cifar10_inference(tflite_path, image_index=0, use_test_set=False, output
     print(f"  Transformed range: [{input_data_uint8.min()}, {input_data_uint8.max()}]")
     
     # Convert to int8 for model inference (if model expects int8)
-    if input_details['dtype'] == np.int8:
-        # Convert uint8 [0, 255] to int8 [-128, 127] for model
-        quant_params = input_details['quantization']
-        zero_point = quant_params[1] if len(quant_params) > 1 else -128
-        input_data_for_model = input_data_uint8.astype(np.int32) - 128
-        input_data_for_model = np.clip(input_data_for_model, -128, 127).astype(np.int8)
-    else:
-        input_data_for_model = input_data_uint8
+    input_data_for_model = to_model_input(input_data_uint8, input_details)
     
     # Run inference
     print(f"\n{'='*60}")
@@ -254,8 +419,7 @@ def run_cifar10_inference(tflite_path, image_index=0, use_test_set=False, output
     
     # Get predicted class
     predicted_class = np.argmax(output_data)
-    class_names = ['airplane', 'automobile', 'bird', 'cat', 'deer', 
-                  'dog', 'frog', 'horse', 'ship', 'truck']
+    class_names = CIFAR10_CLASS_NAMES
     print(f"  Predicted class: {predicted_class} ({class_names[predicted_class]})")
     print(f"  True class: {label} ({class_name})")
     print(f"  Match: {'✓' if predicted_class == label else '✗'}")
@@ -267,7 +431,13 @@ def run_cifar10_inference(tflite_path, image_index=0, use_test_set=False, output
     # Generate C file content
     model_name = tflite_path.stem.replace('-', '_').replace('.', '_')
     
-    c_content = f"""/*
+    # Determine output file path
+    if output_path is None:
+        output_path = tflite_path.parent / f"{model_name}_cifar10_{image_index}_data.h"
+    
+    # Stream the header; the arrays are formatted in bulk by c_array_format
+    with open(output_path, 'w') as f:
+        f.write(f"""/*
  * Generated C arrays for TFLite model: {tflite_path.name}
  * CIFAR-10 Image Index: {image_index} ({'test' if use_test_set else 'train'} set)
  * True Label: {label} ({class_name})
@@ -285,10 +455,11 @@ def run_cifar10_inference(tflite_path, image_index=0, use_test_set=False, output
 #include <stdint.h>
 
 /* Input tensor data (CIFAR-10 image) */
-{array_to_c_format(input_data_uint8, f"{model_name}_input", input_c_type)}
-
-/* Output tensor data */
-{array_to_c_format(output_data, f"{model_name}_output", output_c_type)}
+""")
+        write_c_array(f, input_data_uint8, f"{model_name}_input", input_c_type)
+        f.write("\n\n/* Output tensor data */\n")
+        write_c_array(f, output_data, f"{model_name}_output", output_c_type)
+        f.write(f"""
 
 /* Metadata */
 #define {model_name.upper()}_INPUT_SIZE {input_data_uint8.size}
@@ -297,16 +468,7 @@ def run_cifar10_inference(tflite_path, image_index=0, use_test_set=False, output
 #define {model_name.upper()}_PREDICTED_LABEL {predicted_class}
 
 #endif /* {model_name.upper()}_DATA_H */
-"""
-    
-    # Determine output file path
-    if output_path is None:
-        output_path = tflite_path.parent / f"{model_name}_cifar10_{image_index}_data.h"
-    
-    # Write to file
-    with open(output_path, 'w') as f:
-        f.write(c_content)
-    
+""")
     print(f"\n{'='*60}")
     print("Generated Files")
     print(f"{'='*60}")
@@ -329,8 +491,28 @@ def main():
     parser.add_argument(
         '-i', '--image-index',
         type=int,
-        default=0,
-        help='Index of CIFAR-10 image to use (default: 0)'
+        nargs='+',
+        default=[0],
+        help='Index of CIFAR-10 image to use (default: 0); several indices select batch mode'
+    )
+    parser.add_argument(
+        '--image-range',
+        type=parse_image_range,
+        default=None,
+        metavar='START:STOP',
+        help='Batch mode over images START..STOP-1 (overrides --image-index)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=32,
+        help='Images per interpreter invoke in batch mode when the model allows it (default: 32)'
+    )
+    parser.add_argument(
+        '--dataset-cache',
+        type=str,
+        default=None,
+        help=f'Directory for the memory-mapped CIFAR-10 .npy cache (default: {CIFAR10_CACHE_DIR})'
     )
     parser.add_argument(
         '--test-set',
@@ -341,7 +523,20 @@ def main():
         '-o', '--output',
         type=str,
         default=None,
-        help='Output C header file path (default: <model_name>_cifar10_<index>_data.h)'
+        help='Output C header file path (default: <model_name>_cifar10_<index>_data.h, '
+             'or <model_name>_cifar10_batch_<N>_data.h in batch mode)'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=BACKEND_CHOICES,
+        default='auto',
+        help='TFLite interpreter backend (default: auto, prefers ai_edge_litert, then tflite_runtime, then tensorflow)'
+    )
+    parser.add_argument(
+        '--num-threads',
+        type=int,
+        default=None,
+        help='Number of interpreter threads (default: backend default)'
     )
     
     args = parser.parse_args()
@@ -352,13 +547,30 @@ def main():
         print(f"Error: TFLite file not found: {tflite_path}", file=sys.stderr)
         sys.exit(1)
     
+    image_indices = args.image_range if args.image_range is not None else args.image_index
+    
     try:
-        run_cifar10_inference(
-            tflite_path, 
-            args.image_index, 
-            args.test_set,
-            args.output
-        )
+        if len(image_indices) > 1:
+            run_cifar10_batch_inference(
+                tflite_path,
+                image_indices,
+                args.test_set,
+                args.output,
+                args.backend,
+                args.num_threads,
+                args.batch_size,
+                args.dataset_cache,
+            )
+        else:
+            run_cifar10_inference(
+                tflite_path, 
+                image_indices[0], 
+                args.test_set,
+                args.output,
+                args.backend,
+                args.num_threads,
+                args.dataset_cache,
+            )
     except Exception as e:
         print(f"\nError processing model: {e}", file=sys.stderr)
         import traceback
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Golden Output Cache
+
+On-disk cache of reference inference results for generate_c_arrays.py.
+
+Entries are keyed by the SHA-256 of the .tflite contents, the input tensor
+bytes (with dtype and shape) and the interpreter backend version. Each entry
+stores the output tensor(s) together with the input/output tensor details so
+that a hit needs no interpreter at all.
+
+The cache is safe to share between parallel workers: entries are written to
+a temporary file and atomically renamed into place, readers treat a vanished
+entry as a miss, and eviction tolerates files removed by another process.
+Eviction is least-recently-used (by mtime, refreshed on every hit) once the
+total size exceeds the configured bound.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+CACHE_DIR_ENV = "VELA_GOLDEN_CACHE_DIR"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+ENTRY_SUFFIX = ".npz"
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(model_path, input_data, backend_id):
+    """Return the cache key for a model, an input array and an interpreter backend."""
+    input_data = np.ascontiguousarray(input_data)
+    digest = hashlib.sha256()
+    digest.update(_hash_file(model_path).encode())
+    digest.update(f"{input_data.dtype.str}{input_data.shape}".encode())
+    digest.update(input_data.tobytes())
+    digest.update(backend_id.encode())
+    return digest.hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    return Path(cache_dir) / key[:2] / f"{key}{ENTRY_SUFFIX}"
+
+
+def _details_to_json(details):
+    scale, zero_point = details['quantization']
+    return {
+        "index": int(details['index']),
+        "shape": [int(d) for d in details['shape']],
+        "shape_dtype": np.asarray(details['shape']).dtype.name,
+        "dtype": np.dtype(details['dtype']).name,
+        "quantization": [float(scale), int(zero_point)],
+    }
+
+
+def _details_from_json(data):
+    return {
+        "index": data["index"],
+        "shape": np.array(data["shape"], dtype=data["shape_dtype"]),
+        "dtype": np.dtype(data["dtype"]).type,
+        "quantization": (data["quantization"][0], data["quantization"][1]),
+    }
+
+
+def load_golden(cache_dir, key):
+    """
+    Look up a cache entry.
+
+    Returns (input_details, output_details, output_data) on a hit, else None.
+    """
+    path = _entry_path(cache_dir, key)
+    try:
+        with np.load(path, allow_pickle=False) as entry:
+            meta = json.loads(str(entry["meta"]))
+            output_data = entry["output"]
+        # Truncated or old-format metadata is a miss, like a corrupt file
+        input_details = _details_from_json(meta["input_details"])
+        output_details = _details_from_json(meta["output_details"])
+        os.utime(path)  # Refresh LRU position
+    except (FileNotFoundError, KeyError, IndexError, TypeError, ValueError, OSError):
+        return None
+
+    return input_details, output_details, output_data
+
+
+def store_golden(cache_dir, key, input_details, output_details, output_data, max_bytes=DEFAULT_MAX_BYTES):
+    """Atomically write a cache entry, then evict old entries beyond max_bytes."""
+    path = _entry_path(cache_dir, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    meta = json.dumps({
+        "input_details": _details_to_json(input_details),
+        "output_details": _details_to_json(output_details),
+    })
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=ENTRY_SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, output=output_data, meta=np.array(meta))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    evict(cache_dir, max_bytes)
+    return path
+
+
+def evict(cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+    """Delete least-recently-used entries until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    for path in Path(cache_dir).glob(f"*/*{ENTRY_SUFFIX}"):
+        if path.name.startswith(".tmp-"):
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass  # Already evicted by another worker
+        total -= size
+
+    return removed
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Golden Output Digests
+
+Compact replacement for the full golden output arrays of generate_c_arrays.py.
+Per test vector only a digest record is emitted:
+
+  - a hash of the output tensor bytes (CRC-32 as in zlib, or 64-bit FNV-1a),
+  - summary statistics of the integer output: argmax, max and sum.
+
+A matching C verifier is emitted next to the records. It makes one pass over
+the device output, computing the same hash and statistics, and accepts
+either a bit-exact match or, with a tolerance of T > 0, an output whose
+statistics are consistent with every element being within T of the golden one:
+
+  - |max - golden max| <= T,
+  - |sum - golden sum| <= T * size,
+  - the element at the golden argmax is within 2T of the device max.
+
+These are necessary conditions, so an output that is within tolerance is never
+rejected, but a summary cannot prove that every element is within T.
+"""
+
+import zlib
+
+import numpy as np
+
+DIGEST_CHOICES = ("crc32", "fnv1a64")
+
+FNV64_OFFSET = 0xCBF29CE484222325
+FNV64_PRIME = 0x100000001B3
+
+# Integer output types the summary statistics (int16 max/argmax, int32 sum) can hold
+STAT_DTYPES = (np.int8, np.uint8, np.int16)
+
+
+def _rows(output_vectors):
+    """Output tensors as a (N, bytes) uint8 matrix in their in-memory (little-endian) layout."""
+    vectors = np.ascontiguousarray(output_vectors)
+    return vectors.reshape(vectors.shape[0], -1).view(np.uint8)
+
+
+def crc32_vectors(output_vectors):
+    """zlib CRC-32 of every vector's bytes."""
+    return np.array([zlib.crc32(row.tobytes()) for row in _rows(output_vectors)], dtype=np.uint64)
+
+
+def fnv1a64_vectors(output_vectors):
+    """64-bit FNV-1a of every vector's bytes, vectorized across vectors."""
+    rows = _rows(output_vectors).astype(np.uint64)
+    digest = np.full(rows.shape[0], FNV64_OFFSET, dtype=np.uint64)
+    prime = np.uint64(FNV64_PRIME)
+    with np.errstate(over="ignore"):
+        for column in rows.T:
+            digest = (digest ^ column) * prime
+    return digest
+
+
+def output_summaries(output_vectors):
+    """Per-vector (argmax, max, sum) of integer outputs, as the C verifier computes them."""
+    flat = output_vectors.reshape(output_vectors.shape[0], -1)
+    values = flat.astype(np.int64)
+    return values.argmax(axis=1), values.max(axis=1), values.sum(axis=1)
+
+
+def check_digest_support(output_details):
+    """Raise ValueError when the output cannot be summarized by the C verifier."""
+    dtype = output_details['dtype']
+    size = int(np.prod(output_details['shape']))
+    if dtype not in STAT_DTYPES:
+        raise ValueError(f"Golden digests need an int8, uint8 or int16 output, got {dtype}")
+    if size > 0xFFFF:
+        raise ValueError(f"Golden digests store the argmax as uint16, but the output has {size} elements")
+    info = np.iinfo(dtype)
+    if size * max(info.max, -int(info.min)) >= 1 << 31:
+        raise ValueError(f"The output sum of {size} {np.dtype(dtype).name} values may overflow int32")
+
+
+VERIFIER_SOURCE = """
+/* Single-pass verifier: returns 0 for a bit-exact match, 1 if the output differs
+ * but its argmax, max and sum are within {upper}_GOLDEN_TOLERANCE of the golden
+ * ones, and -1 otherwise. stats (optional) receives the device output's record. */
+static inline int {name}_verify_output(int vector, const {c_type} *output, {name}_golden_t *stats)
+{{
+    const {name}_golden_t *golden = &{name}_golden[vector];
+    {hash_type} hash = {hash_init};
+    int32_t sum = 0;
+    int32_t max_value = output[0];
+    uint16_t argmax = 0;
+    for (uint32_t i = 0; i < {upper}_OUTPUT_SIZE; ++i) {{
+        int32_t value = output[i];
+{hash_update}
+        sum += value;
+        if (value > max_value) {{
+            max_value = value;
+            argmax = (uint16_t)i;
+        }}
+    }}
+    hash = {hash_final};
+    if (stats) {{
+        stats->hash = hash;
+        stats->sum = sum;
+        stats->argmax = argmax;
+        stats->max = (int16_t)max_value;
+    }}
+    if (hash == golden->hash) return 0;
+
+    int32_t tolerance = {upper}_GOLDEN_TOLERANCE;
+    if (tolerance <= 0) return -1;
+    if (max_value - golden->max > tolerance || golden->max - max_value > tolerance) return -1;
+    if (sum - golden->sum > tolerance * {upper}_OUTPUT_SIZE || golden->sum - sum > tolerance * {upper}_OUTPUT_SIZE) return -1;
+    if (output[golden->argmax] < max_value - 2 * tolerance) return -1;
+    return 1;
+}}
+"""
+
+CRC32_POLY = 0xEDB88320
+
+
+def crc32_nibble_table():
+    """16-entry table for the reflected zlib CRC-32, consumed 4 bits per step."""
+    table = []
+    for n in range(16):
+        crc = n
+        for _ in range(4):
+            crc = (crc >> 1) ^ (CRC32_POLY if crc & 1 else 0)
+        table.append(crc)
+    return table
+
+
+def _byte_updates(c_type, step):
+    """C statements feeding each byte of `value` to a hash step (int16: low byte first, as stored)."""
+    if c_type == "int16_t":
+        return "\n".join(step.format(byte=f"((uint32_t)value >> {shift}) & 0xFFu") for shift in (0, 8))
+    return step.format(byte="(uint32_t)value & 0xFFu")
+
+
+def write_golden_digests(f, name, output_vectors, c_type, digest="crc32", tolerance=0):
+    """Write the digest record type, one record per vector and the C verifier."""
+    upper = name.upper()
+    if digest == "crc32":
+        hashes = crc32_vectors(output_vectors)
+        hash_type, hash_init, hash_final, hash_fmt = "uint32_t", "0xFFFFFFFFu", "hash ^ 0xFFFFFFFFu", "0x{:08X}u"
+        step = ("        hash ^= {byte};\n"
+                f"        hash = (hash >> 4) ^ {name}_crc32_nibble[hash & 0xFu];\n"
+                f"        hash = (hash >> 4) ^ {name}_crc32_nibble[hash & 0xFu];")
+    else:
+        hashes = fnv1a64_vectors(output_vectors)
+        hash_type, hash_init, hash_final, hash_fmt = "uint64_t", f"0x{FNV64_OFFSET:016X}ull", "hash", "0x{:016X}ull"
+        step = f"        hash = (hash ^ ({{byte}})) * 0x{FNV64_PRIME:016X}ull;"
+
+    argmax, max_value, total = output_summaries(output_vectors)
+    f.write(f"""/* Golden output digests ({digest}), one record per vector instead of the output arrays */
+#define {upper}_GOLDEN_DIGEST "{digest}"
+#ifndef {upper}_GOLDEN_TOLERANCE
+#define {upper}_GOLDEN_TOLERANCE {tolerance}
+#endif
+
+typedef struct {{
+    {hash_type} hash;
+    int32_t sum;
+    uint16_t argmax;
+    int16_t max;
+}} {name}_golden_t;
+
+static const {name}_golden_t {name}_golden[{output_vectors.shape[0]}] = {{
+""")
+    for h, s, a, m in zip(hashes, total, argmax, max_value):
+        f.write(f"    {{ {hash_fmt.format(int(h))}, {int(s)}, {int(a)}, {int(m)} }},\n")
+    f.write("};\n\n")
+    if digest == "crc32":
+        rows = [", ".join(f"0x{v:08X}u" for v in crc32_nibble_table()[i:i + 8]) for i in (0, 8)]
+        f.write(f"/* CRC-32 (zlib polynomial, reflected), 4 bits per step */\n"
+                f"static const uint32_t {name}_crc32_nibble[16] = {{\n    {rows[0]},\n    {rows[1]},\n}};\n")
+    f.write(VERIFIER_SOURCE.format(
+        name=name, upper=upper, c_type=c_type, hash_type=hash_type, hash_init=hash_init,
+        hash_final=hash_final, hash_update=_byte_updates(c_type, step)
+    ))
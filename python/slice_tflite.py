@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import argparse
 import copy
+import csv
 import os
 import subprocess
 import sys
@@ -9,9 +10,29 @@ from pathlib import Path
 import flatbuffers
 from tensorflow.lite.python import schema_py_generated as schema_fb
 
+from vela_summary import find_summary_csv, read_summary_csv
+
 # TFLite flatbuffer file identifier
 _FILE_IDENTIFIER = b"TFL3"
 
+# Cumulative Vela summary metrics that are differenced between consecutive slices
+REPORT_METRICS = [
+    "inference_time",
+    "cycles_total",
+    "cycles_npu",
+    "nn_macs",
+    "sram_feature_map_read_bytes",
+    "sram_feature_map_write_bytes",
+    "dram_feature_map_read_bytes",
+    "dram_feature_map_write_bytes",
+    "dram_weight_read_bytes",
+    "dram_total_bytes",
+]
+
+_BUILTIN_OP_NAMES = {
+    value: name for name, value in vars(schema_fb.BuiltinOperator).items() if not name.startswith("_")
+}
+
 
 def load_tflite_model(path: str) -> schema_fb.ModelT:
     """Load a .tflite file into a mutable ModelT object."""
@@ -76,6 +97,42 @@ def make_prefix_model(
     return model
 
 
+def operator_type_name(model: schema_fb.ModelT, op: schema_fb.OperatorT) -> str:
+    """Return the builtin (or custom) operator name for `op`."""
+    op_code = model.operatorCodes[op.opcodeIndex]
+    # builtinCode replaced deprecatedBuiltinCode for codes >= 127; the larger one is valid
+    code = max(op_code.builtinCode, op_code.deprecatedBuiltinCode)
+    if code == schema_fb.BuiltinOperator.CUSTOM and op_code.customCode:
+        custom = op_code.customCode
+        return custom.decode() if isinstance(custom, bytes) else str(custom)
+    return _BUILTIN_OP_NAMES.get(code, f"OP_{code}")
+
+
+def describe_operators(
+    model: schema_fb.ModelT,
+    start: int,
+    end: int,
+    subgraph_index: int = 0,
+) -> list:
+    """
+    Describe operators [start, end) of a subgraph as
+    (index, type name, input shapes, output shapes) tuples.
+    """
+    sg = model.subgraphs[subgraph_index]
+
+    def shapes(tensor_indices):
+        return [
+            list(sg.tensors[t].shape) if sg.tensors[t].shape is not None else []
+            for t in (tensor_indices if tensor_indices is not None else [])
+            if t >= 0
+        ]
+
+    return [
+        (i, operator_type_name(model, op), shapes(op.inputs), shapes(op.outputs))
+        for i, op in enumerate(sg.operators[start:end], start=start)
+    ]
+
+
 def run_vela_pipeline_for_slice(
     slice_path: str,
     slice_dir: str,
@@ -146,7 +203,7 @@ def chunk_tflite(
     run_pipeline: bool = False,
     pipeline_args: dict = None,
     script_dir: Path = None,
-) -> None:
+) -> list:
     """
     Chunk the input TFLite model into multiple models:
     first `step` ops, first `2*step` ops, first `3*step` ops, etc.
@@ -160,6 +217,8 @@ def chunk_tflite(
       slice_1/output/  (pipeline outputs for slice 1)
       slice_2/output/  (pipeline outputs for slice 2)
       ...
+
+    Returns a list of (slice_dir, slice_path, num_ops) tuples in slice order.
     """
     if step <= 0:
         raise ValueError("step must be > 0")
@@ -185,6 +244,7 @@ def chunk_tflite(
 
     print(f"Total operators in subgraph {subgraph_index}: {num_ops}")
 
+    slices = []
     iteration = 1
     current_ops = step
 
@@ -200,6 +260,7 @@ def chunk_tflite(
 
         save_tflite_model(prefix_model, out_path)
         print(f"Saved {out_path}  (first {current_ops} operators)")
+        slices.append((slice_dir, out_path, current_ops))
         
         # Run vela pipeline for this slice if requested
         if run_pipeline:
@@ -221,11 +282,109 @@ def chunk_tflite(
 
         save_tflite_model(prefix_model, out_path)
         print(f"Saved {out_path}  (first {num_ops} operators / full model)")
+        slices.append((slice_dir, out_path, num_ops))
         
         # Run vela pipeline for this slice if requested
         if run_pipeline:
             run_vela_pipeline_for_slice(out_path, slice_dir, pipeline_args or {}, script_dir or Path(__file__).parent.parent)
 
+    return slices
+
+
+def report_slice_costs(
+    input_path: str,
+    slices: list,
+    subgraph_index: int = 0,
+    system_config: str = None,
+    csv_path: str = None,
+    top: int = 10,
+) -> list:
+    """
+    Difference the Vela summaries of consecutive prefix slices into a
+    per-operator (or per-step) cost table.
+
+    Slice k covers operators [ops(k-1), ops(k)); its cost is the summary of
+    slice k minus the summary of the previous slice that has a summary.
+    Vela schedules each slice independently, so fusing and cascading at the
+    slice boundary can make individual deltas negative.
+    """
+    model = load_tflite_model(input_path)
+
+    rows = []
+    previous = {metric: 0 for metric in REPORT_METRICS}
+    previous_ops = 0
+
+    for slice_dir, slice_path, num_ops in slices:
+        slice_name = os.path.splitext(os.path.basename(slice_path))[0]
+        summary_path = find_summary_csv(os.path.join(slice_dir, "output"), slice_name, system_config)
+        if summary_path is None:
+            print(f"Warning: no Vela summary CSV for {slice_name}, skipping", file=sys.stderr)
+            continue
+
+        summary = read_summary_csv(summary_path)
+        ops = describe_operators(model, previous_ops, num_ops, subgraph_index)
+
+        row = {
+            "slice": slice_name,
+            "first_op": previous_ops,
+            "last_op": num_ops - 1,
+            "op_types": "+".join(op_type for _, op_type, _, _ in ops),
+            "ops": "; ".join(
+                f"{idx}:{op_type} {ins}->{outs}" for idx, op_type, ins, outs in ops
+            ),
+        }
+        for metric in REPORT_METRICS:
+            value = summary.get(metric, 0) or 0
+            row[metric] = value - previous[metric]
+            previous[metric] = value
+
+        rows.append(row)
+        previous_ops = num_ops
+
+    if not rows:
+        print("Error: no slice summaries found (run with --run-pipeline first)", file=sys.stderr)
+        return rows
+
+    total_time = sum(row["inference_time"] for row in rows) or 1.0
+
+    print(f"\n{'='*60}")
+    print("Per-Operator Cost Attribution")
+    print(f"{'='*60}")
+    header = f"{'ops':>9}  {'time_us':>10}  {'share':>6}  {'cycles':>9}  {'macs':>10}  " \
+             f"{'sram_rd':>9}  {'sram_wr':>9}  {'dram_rd':>9}  {'dram_wr':>9}  op_types"
+    print(header)
+    for row in rows:
+        print(
+            f"{row['first_op']:>4}-{row['last_op']:<4}  "
+            f"{row['inference_time'] * 1e6:>10.2f}  "
+            f"{100 * row['inference_time'] / total_time:>5.1f}%  "
+            f"{row['cycles_total']:>9}  "
+            f"{row['nn_macs']:>10}  "
+            f"{row['sram_feature_map_read_bytes']:>9}  "
+            f"{row['sram_feature_map_write_bytes']:>9}  "
+            f"{row['dram_feature_map_read_bytes'] + row['dram_weight_read_bytes']:>9}  "
+            f"{row['dram_feature_map_write_bytes']:>9}  "
+            f"{row['op_types']}"
+        )
+
+    hotspots = sorted(rows, key=lambda r: r["inference_time"], reverse=True)[:top]
+    print(f"\nTop {len(hotspots)} hotspots by estimated inference time:")
+    for row in hotspots:
+        print(
+            f"  ops {row['first_op']}-{row['last_op']}: "
+            f"{row['inference_time'] * 1e6:.2f} us "
+            f"({100 * row['inference_time'] / total_time:.1f}%)  {row['ops']}"
+        )
+
+    if csv_path is not None:
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\nSaved cost table: {csv_path}")
+
+    return rows
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -261,6 +420,26 @@ def main():
         action="store_true",
         help="Run vela pipeline for each slice after creating it",
     )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help=(
+            "Difference the per-slice Vela summary CSVs into a per-operator cost table "
+            "(use --step 1 for single-operator resolution)"
+        ),
+    )
+    parser.add_argument(
+        "--report-csv",
+        type=str,
+        default=None,
+        help="Output CSV for --report (default: <output-dir>/<model>_slice_costs.csv)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of hotspots listed by --report (default: 10)",
+    )
     
     # Vela pipeline arguments (passed through)
     parser.add_argument(
@@ -330,7 +509,7 @@ def main():
     
     script_dir = Path(__file__).parent.parent
     
-    chunk_tflite(
+    slices = chunk_tflite(
         args.model,
         step=args.step,
         subgraph_index=args.subgraph,
@@ -340,6 +519,21 @@ def main():
         script_dir=script_dir,
     )
 
+    if args.report:
+        report_csv = args.report_csv
+        if report_csv is None:
+            base_dir = args.output_dir or os.path.dirname(args.model)
+            name = os.path.splitext(os.path.basename(args.model))[0]
+            report_csv = os.path.join(base_dir, f"{name}_slice_costs.csv")
+        report_slice_costs(
+            args.model,
+            slices,
+            subgraph_index=args.subgraph,
+            system_config=args.system_config,
+            csv_path=report_csv,
+            top=args.top,
+        )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+TFLite Interpreter Backend
+
+Creates a TFLite interpreter from the lightest runtime that is installed:
+
+  1. ai_edge_litert   (pip install ai-edge-litert)
+  2. tflite_runtime   (pip install tflite-runtime)
+  3. tensorflow       (full TensorFlow, imported lazily as a fallback)
+
+All three expose the same Interpreter API. Selection only probes for the
+packages, so nothing heavy is imported until an interpreter is requested.
+The TFLITE_BACKEND environment variable overrides the "auto" choice.
+"""
+
+import importlib.metadata
+import importlib.util
+import os
+
+import numpy as np
+
+# backend name -> (top-level module, distribution name)
+BACKENDS = {
+    "litert": ("ai_edge_litert", "ai-edge-litert"),
+    "tflite_runtime": ("tflite_runtime", "tflite-runtime"),
+    "tensorflow": ("tensorflow", "tensorflow"),
+}
+
+BACKEND_CHOICES = ["auto"] + list(BACKENDS)
+
+
+def resolve_backend(backend="auto"):
+    """Return the backend name to use, without importing it."""
+    if backend == "auto":
+        backend = os.environ.get("TFLITE_BACKEND", "auto")
+
+    if backend != "auto":
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown TFLite backend: {backend} (choose from {BACKEND_CHOICES})")
+        return backend
+
+    for name, (module, _) in BACKENDS.items():
+        if importlib.util.find_spec(module) is not None:
+            return name
+
+    raise ImportError(
+        "No TFLite interpreter found; install ai-edge-litert, tflite-runtime or tensorflow"
+    )
+
+
+def backend_version(backend="auto"):
+    """Return "<backend>-<version>" for the resolved backend, without importing it."""
+    name = resolve_backend(backend)
+    try:
+        version = importlib.metadata.version(BACKENDS[name][1])
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"{name}-{version}"
+
+
+def load_interpreter(model_path, backend="auto", num_threads=None):
+    """Create and allocate a TFLite interpreter for model_path."""
+    name = resolve_backend(backend)
+
+    if name == "litert":
+        from ai_edge_litert.interpreter import Interpreter
+    elif name == "tflite_runtime":
+        from tflite_runtime.interpreter import Interpreter
+    else:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+
+    interpreter = Interpreter(model_path=str(model_path), num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def resize_batch(interpreter, input_details, batch_size):
+    """Resize the model input batch dimension. Returns False if the model refuses."""
+    shape = list(input_details['shape'])
+    shape[0] = batch_size
+    try:
+        interpreter.resize_tensor_input(input_details['index'], shape)
+        interpreter.allocate_tensors()
+        return True
+    except (RuntimeError, ValueError):
+        interpreter.resize_tensor_input(input_details['index'], list(input_details['shape']))
+        interpreter.allocate_tensors()
+        return False
+
+
+def invoke_vectors(interpreter, input_details, output_details, inputs, batch_size=32):
+    """
+    Run stacked input vectors (N, *input_shape) through a single interpreter.
+
+    Batch-1 models are resized to process up to batch_size vectors per invoke
+    when the model accepts it (and the output batch follows the input batch);
+    otherwise each vector is invoked separately.
+    Returns stacked outputs of shape (N, *output_shape).
+    """
+    num_vectors = inputs.shape[0]
+    input_shape = tuple(input_details['shape'])
+    output_shape = tuple(output_details['shape'])
+    outputs = np.empty((num_vectors,) + output_shape, dtype=output_details['dtype'])
+
+    batch = min(batch_size, num_vectors)
+    done = 0
+
+    if batch > 1 and input_shape[0] == 1 and output_shape[0] == 1 and \
+            resize_batch(interpreter, input_details, batch):
+        while done < num_vectors:
+            chunk = inputs[done:done + batch].reshape((-1,) + input_shape[1:])
+            count = chunk.shape[0]
+            if count < batch:
+                # Pad the tail so the tensors never need to be reallocated
+                padding = np.zeros((batch - count,) + input_shape[1:], dtype=chunk.dtype)
+                chunk = np.concatenate([chunk, padding])
+
+            interpreter.set_tensor(input_details['index'], chunk)
+            interpreter.invoke()
+            result = interpreter.get_tensor(output_details['index'])
+
+            if result.shape != (batch,) + output_shape[1:]:
+                print(
+                    f"Note: model output batch does not follow the input batch "
+                    f"(got {result.shape}); invoking per vector"
+                )
+                break
+            outputs[done:done + count] = result[:count].reshape((count,) + output_shape)
+            done += count
+
+        # Restore the original shape for any per-vector remainder and later users
+        interpreter.resize_tensor_input(input_details['index'], list(input_shape))
+        interpreter.allocate_tensors()
+
+    for i in range(done, num_vectors):
+        interpreter.set_tensor(input_details['index'], inputs[i])
+        interpreter.invoke()
+        outputs[i] = interpreter.get_tensor(output_details['index'])
+
+    return outputs
@@ -0,0 +1,677 @@
+#!/usr/bin/env python3
+"""
+Convert several Vela raw .npz files into one multi-model C bundle.
+
+The models are assumed to run one after another on the same NPU (never
+concurrently), so their scratch/tensor regions can live in one shared arena
+per region, sized to the largest requirement instead of the sum. Regions that
+hold variables (persistent state) stay private to their model.
+
+Per model this emits the usual vela_raw_to_c.py files (_cmd_data.h,
+_weights.h, _meta.h, _buffers.h/.c, _run.h/.c); the bundle adds
+<bundle>_bundle.h/.c with the shared arenas and the shared NPU driver.
+
+With --dedup-weights the weight blobs are packed into one pool instead:
+the command stream addresses weights relative to the weight region base, so
+a blob can only be shared as a whole, at an aligned position where the pool
+already holds the same bytes (identical blobs, a blob contained in another,
+or a blob whose head matches the tail of the pool).
+
+With --schedule the bundle also gets <bundle>_sched.h/.c, a cooperative
+scheduler: a const job table (one entry per model, in priority order),
+periodic releases from <bundle>_sched_tick(), a pending bitmask that serves as
+the priority queue, and dispatch through each model's async API, where the
+next pending job starts as soon as the running one completes.
+"""
+import argparse, os, textwrap
+from pathlib import Path
+
+from vela_raw_to_c import (
+    HEADER,
+    MAX_REGIONS,
+    compute_regions,
+    load_vela_npz,
+    to_c_hex,
+    write_cmd_header,
+    write_meta_header,
+    write_runner,
+    write_weights_header,
+)
+
+
+def default_prefix(npz_path):
+    """Symbol prefix for a Vela output file: <model>_vela.npz -> <model>."""
+    stem = Path(npz_path).stem
+    if stem.endswith("_vela"):
+        stem = stem[:-len("_vela")]
+    return stem.replace("-", "_").replace(".", "_")
+
+
+def load_models(npz_paths, prefixes):
+    """Load every model and its region requirements."""
+    models = []
+    for npz_path, prefix in zip(npz_paths, prefixes):
+        model = load_vela_npz(npz_path)
+        region_caps, region_sources = compute_regions(model)
+        models.append({
+            "prefix": prefix,
+            "model": model,
+            "region_caps": region_caps,
+            "region_sources": region_sources,
+        })
+    return models
+
+
+def plan_arena(models):
+    """
+    Decide which regions are shared and how large each shared arena must be.
+
+    Returns (arena_sizes, private) where arena_sizes maps region -> bytes and
+    private is a set of (prefix, region) pairs that keep their own buffer
+    because the region holds variables that must survive other models' runs.
+    """
+    arena_sizes = {}
+    private = set()
+    for m in models:
+        for r, cap in m["region_caps"].items():
+            if cap == 0:
+                continue
+            if any(name == "VARIABLE" for name, _, _, _ in m["region_sources"][r]):
+                private.add((m["prefix"], r))
+                continue
+            arena_sizes[r] = max(arena_sizes.get(r, 0), cap)
+    return dict(sorted(arena_sizes.items())), private
+
+
+def _column_width(header, values, minimum=0):
+    """Width that fits the header and every value as printed."""
+    return max([minimum, len(str(header))] + [len(str(v)) for v in values])
+
+
+def arena_report(models, arena_sizes, private):
+    """Print per-region requirements and the bytes saved by sharing."""
+    rows = []
+    total_sum = 0
+    total_arena = 0
+    for r in range(MAX_REGIONS):
+        caps = [m["region_caps"][r] for m in models]
+        if not any(caps):
+            continue
+        kept = sum(cap for m, cap in zip(models, caps) if (m["prefix"], r) in private)
+        region_sum = sum(caps)
+        region_arena = arena_sizes.get(r, 0) + kept
+        total_sum += region_sum
+        total_arena += region_arena
+        rows.append((r, caps, region_sum, region_arena, "  (variables kept private)" if kept else ""))
+
+    width = max(_column_width(m["prefix"], [row[1][i] for row in rows]) for i, m in enumerate(models))
+    total_width = _column_width("Arena", [total_sum, total_arena], 10)
+    print(f"\n{'Region':<8}" + "".join(f"{m['prefix']:>{width + 2}}" for m in models)
+          + f"{'Sum':>{total_width + 2}}{'Arena':>{total_width + 2}}")
+    for r, caps, region_sum, region_arena, note in rows:
+        print(f"{r:<8}" + "".join(f"{cap:>{width + 2}}" for cap in caps)
+              + f"{region_sum:>{total_width + 2}}{region_arena:>{total_width + 2}}{note}")
+
+    saved = total_sum - total_arena
+    print(f"\nRAM for regions: {total_sum} bytes separately, {total_arena} bytes shared "
+          f"({saved} bytes saved)")
+    return total_sum, total_arena
+
+
+def _aligned_find(pool, blob, align):
+    """Lowest aligned position where blob occurs in pool, or -1."""
+    pos = pool.find(blob)
+    while pos >= 0 and pos % align:
+        pos = pool.find(blob, pos + 1)
+    return pos
+
+
+def _aligned_overlap(pool, blob, align):
+    """Aligned position where the tail of pool equals the head of blob, or -1."""
+    start = max(0, len(pool) - len(blob) + 1)
+    start += -start % align
+    for pos in range(start, len(pool), align):
+        if blob.startswith(pool[pos:]):
+            return pos
+    return -1
+
+
+def build_weight_pool(blobs, align=16):
+    """
+    Pack weight blobs into one pool, reusing bytes already in it.
+
+    Larger blobs are placed first so smaller variants are more likely to be
+    found inside them. Returns (pool, offsets) with one pool offset per blob.
+    """
+    pool = bytearray()
+    offsets = [None] * len(blobs)
+    for i in sorted(range(len(blobs)), key=lambda i: -len(blobs[i])):
+        blob = blobs[i]
+        pos = _aligned_find(pool, blob, align)
+        if pos < 0:
+            pos = _aligned_overlap(pool, blob, align)
+        if pos < 0:
+            pool += bytes(-len(pool) % align)
+            pos = len(pool)
+        if pos + len(blob) > len(pool):
+            pool += blob[len(pool) - pos:]
+        offsets[i] = pos
+    return bytes(pool), offsets
+
+
+def duplicate_chunk_bytes(blobs, chunk=256):
+    """Bytes in aligned chunks that occur more than once across blobs (an upper bound on sharing)."""
+    seen = set()
+    duplicate = 0
+    for blob in blobs:
+        for pos in range(0, len(blob) - chunk + 1, chunk):
+            piece = blob[pos:pos + chunk]
+            if piece in seen:
+                duplicate += chunk
+            else:
+                seen.add(piece)
+    return duplicate
+
+
+def weight_pool_report(models, blobs, pool, offsets):
+    """Print where each model's weights live in the pool and the bytes saved."""
+    width = _column_width("Model", [m["prefix"] for m in models])
+    size_width = _column_width("Weights", [len(b) for b in blobs], 10)
+    offset_width = _column_width("Pool offset", offsets, 11)
+    print(f"\n{'Model':<{width}}{'Weights':>{size_width + 2}}{'Pool offset':>{offset_width + 3}}")
+    for m, blob, off in zip(models, blobs, offsets):
+        print(f"{m['prefix']:<{width}}{len(blob):>{size_width + 2}}{off:>{offset_width + 3}}")
+
+    total = sum(len(b) for b in blobs)
+    saved = total - len(pool)
+    print(f"\nFlash for weights: {total} bytes separately, {len(pool)} bytes pooled ({saved} bytes saved)")
+    chunk_dup = duplicate_chunk_bytes(blobs)
+    if chunk_dup > saved:
+        print(f"Note: {chunk_dup} bytes are in repeated 256-byte chunks, but only whole blobs "
+              f"can be shared because each command stream addresses its weights from one base pointer")
+    return total, len(pool)
+
+
+def write_weight_pool(out_dir, bundle, models, pool, offsets):
+    """Shared weight pool plus per-model _weights.h that point into it."""
+    npz_names = ", ".join(m["model"]["npz_name"] for m in models)
+    h_pool = os.path.join(out_dir, f"{bundle}_weight_pool.h")
+    c_pool = os.path.join(out_dir, f"{bundle}_weight_pool.c")
+
+    with open(h_pool, "w") as f:
+        f.write(HEADER.format(npz_name=npz_names))
+        f.write(f"#pragma once\n#include <stdint.h>\n#include <stddef.h>\n\n")
+        f.write(f"#define {bundle.upper()}_WEIGHT_POOL_SIZE {len(pool)}\n")
+        f.write(f"extern const uint8_t {bundle}_weight_pool[{bundle.upper()}_WEIGHT_POOL_SIZE];\n")
+
+    with open(c_pool, "w") as f:
+        f.write(HEADER.format(npz_name=npz_names))
+        f.write(f'#include <stdint.h>\n#include "{bundle}_weight_pool.h"\n\n')
+        f.write(f"__attribute__((aligned(32)))\nconst uint8_t {bundle}_weight_pool[{bundle.upper()}_WEIGHT_POOL_SIZE] = {{\n{to_c_hex(pool)}\n}};\n")
+
+    paths = [h_pool, c_pool]
+    for m, off in zip(models, offsets):
+        prefix, model = m["prefix"], m["model"]
+        h_weights = os.path.join(out_dir, f"{prefix}_weights.h")
+        with open(h_weights, "w") as f:
+            f.write(HEADER.format(npz_name=model["npz_name"]))
+            f.write(f'#pragma once\n#include <stdint.h>\n#include <stddef.h>\n#include "{bundle}_weight_pool.h"\n\n')
+            f.write(f"// Weight region index chosen by Vela:\n#define {prefix.upper()}_WEIGHT_REGION {model['weight_region']}\n\n")
+            f.write(f"// Weights are shared through {bundle}_weight_pool\n")
+            f.write(f"#define {prefix.upper()}_WEIGHT_POOL_OFFSET {off}\n")
+            f.write(f"static const uint8_t *const {prefix}_weights = {bundle}_weight_pool + {prefix.upper()}_WEIGHT_POOL_OFFSET;\n")
+            f.write(f"static const size_t  {prefix}_weights_size = {model['weight_blob'].size};\n")
+        paths.append(h_weights)
+    return paths
+
+
+def write_bundle(out_dir, bundle, models, arena_sizes, scheduler=False):
+    """Shared arenas and the NPU driver used by every model in the bundle."""
+    npz_names = ", ".join(m["model"]["npz_name"] for m in models)
+    h_bundle = os.path.join(out_dir, f"{bundle}_bundle.h")
+    c_bundle = os.path.join(out_dir, f"{bundle}_bundle.c")
+
+    with open(h_bundle, "w") as f:
+        f.write(HEADER.format(npz_name=npz_names))
+        f.write("#pragma once\n#include <stddef.h>\n#include <stdint.h>\n\n")
+        f.write("struct ethosu_driver;\n\n")
+        f.write("// Shared region arenas, sized to the largest requirement among the bundled models.\n")
+        f.write("// Models must run one at a time; a model's tensors are only valid until the next model runs.\n")
+        for r, size in arena_sizes.items():
+            f.write(f"#define {bundle.upper()}_ARENA_{r}_SIZE {size}\n")
+            f.write(f"extern uint8_t {bundle}_arena_{r}[{bundle.upper()}_ARENA_{r}_SIZE];\n")
+        f.write(textwrap.dedent(f"""
+            // Initialize and reserve the NPU driver shared by the bundle (called on first use).
+            int  {bundle}_npu_init(void);
+
+            // Shared driver handle, or NULL if initialization failed.
+            struct ethosu_driver *{bundle}_npu_driver(void);
+
+            // Release the shared driver.
+            void {bundle}_npu_deinit(void);
+
+            // Route the NPU interrupt here from your platform's IRQ vector.
+            void {bundle}_irq_handler(void);
+            """))
+
+    with open(c_bundle, "w") as f:
+        f.write(HEADER.format(npz_name=npz_names))
+        f.write(f'#include <stddef.h>\n#include <stdint.h>\n#include "ethosu_driver.h"\n#include "{bundle}_bundle.h"\n')
+        if scheduler:
+            f.write(f'#include "{bundle}_sched.h"\n')
+        f.write("\n")
+        for r in arena_sizes:
+            f.write(f"__attribute__((aligned(32))) uint8_t {bundle}_arena_{r}[{bundle.upper()}_ARENA_{r}_SIZE];\n")
+        f.write(textwrap.dedent(f"""
+            // Provide your platform's NPU register base here.
+            extern void *ethosu_get_regs_base(void);
+
+            static struct ethosu_driver  {bundle}_driver;
+            static struct ethosu_driver *{bundle}_drv = 0;
+
+            int {bundle}_npu_init(void) {{
+                if ({bundle}_drv) return 0;
+
+                int rc = ethosu_init(&{bundle}_driver, ethosu_get_regs_base(), 0, 0, /*secure*/0, /*privileged*/1);
+                if (rc) return rc;
+
+                // The pool hands out the first free registered driver; the interrupt is
+                // routed to {bundle}_driver, so any other instance is refused.
+                {bundle}_drv = ethosu_reserve_driver();
+                if ({bundle}_drv != &{bundle}_driver) {{
+                    if ({bundle}_drv) ethosu_release_driver({bundle}_drv);
+                    {bundle}_drv = 0;
+                    ethosu_deinit(&{bundle}_driver);
+                    return -1;
+                }}
+                return 0;
+            }}
+
+            struct ethosu_driver *{bundle}_npu_driver(void) {{
+                if (!{bundle}_drv && {bundle}_npu_init()) return 0;
+                return {bundle}_drv;
+            }}
+
+            void {bundle}_npu_deinit(void) {{
+                if (!{bundle}_drv) return;
+                ethosu_release_driver({bundle}_drv);
+                ethosu_deinit(&{bundle}_driver);
+                {bundle}_drv = 0;
+            }}
+
+            void {bundle}_irq_handler(void) {{
+                ethosu_irq_handler(&{bundle}_driver);%s
+            }}
+            """) % (f"\n    {bundle}_sched_npu_done_isr();" if scheduler else ""))
+    return h_bundle, c_bundle
+
+
+SCHED_DECLS = """
+#define {bundle_upper}_SCHED_NUM_JOBS {num_jobs}
+
+// Job indices, highest priority first.
+{job_enum}
+
+// Start the scheduler: periodic jobs are first released at now_ms.
+void {bundle}_sched_init(uint32_t now_ms);
+
+// Release the periodic jobs that are due at now_ms (wrap-safe). Call it from
+// a timer or the main loop; it may run in interrupt context.
+void {bundle}_sched_tick(uint32_t now_ms);
+
+// Request one invocation of a job. A request for a job that is already pending
+// is merged with it and counted as an overrun. Returns 0, or -1 for a bad index.
+int  {bundle}_sched_post(int job);
+
+// Complete the running job and start the highest-priority pending one.
+// Returns 1 while the NPU is busy and 0 when it is idle with nothing pending.
+// Call it whenever {bundle}_sched_npu_done_isr() or a release wakes the loop.
+int  {bundle}_sched_run(void);
+
+// Releases of a job that found it still pending (periods too short for the load).
+uint32_t {bundle}_sched_overruns(int job);
+
+// ---- Hooks (weak no-ops by default) ----
+
+// Called from {bundle}_irq_handler() in interrupt context when the NPU finishes;
+// override it to wake the task that calls {bundle}_sched_run().
+void {bundle}_sched_npu_done_isr(void);
+
+// Per model: <prefix>_sched_prepare() runs right before the job starts and
+// writes its inputs; <prefix>_sched_done(status) runs right after it completes
+// and reads its outputs. The arenas are shared, so a model's tensors are only
+// valid between these two calls.
+{hook_decls}
+"""
+
+SCHED_SOURCE = """
+// Critical section around the pending mask, which {bundle}_sched_tick() and
+// {bundle}_sched_post() may update from interrupt context.
+#ifndef {bundle_upper}_SCHED_LOCK
+#ifdef CMSIS_device_header
+#include CMSIS_device_header
+#define {bundle_upper}_SCHED_LOCK()   uint32_t primask_ = __get_PRIMASK(); __disable_irq()
+#define {bundle_upper}_SCHED_UNLOCK() __set_PRIMASK(primask_)
+#else
+#define {bundle_upper}_SCHED_LOCK()
+#define {bundle_upper}_SCHED_UNLOCK()
+#endif
+#endif
+
+typedef struct {{
+    int  (*start)(void (*done)(int status, void *user_arg), void *user_arg);
+    int  (*poll)(void);
+    void (*prepare)(void);
+    void (*done)(int status);
+    uint32_t period_ms; // 0: released by {bundle}_sched_post() only
+}} {bundle}_job_t;
+
+{hook_source}
+static const {bundle}_job_t {bundle}_jobs[{bundle_upper}_SCHED_NUM_JOBS] = {{
+{job_rows}
+}};
+
+// Bit j set: job j is pending. The lowest set bit is the highest-priority job.
+static volatile uint32_t {bundle}_pending = 0;
+static int {bundle}_running = -1;
+static uint32_t {bundle}_next_release[{bundle_upper}_SCHED_NUM_JOBS];
+static uint32_t {bundle}_overrun_count[{bundle_upper}_SCHED_NUM_JOBS];
+
+__attribute__((weak)) void {bundle}_sched_npu_done_isr(void) {{
+}}
+
+static void {bundle}_release(int job) {{
+    uint32_t bit = 1u << job;
+    {bundle_upper}_SCHED_LOCK();
+    if (({bundle}_pending & bit) || {bundle}_running == job) {bundle}_overrun_count[job]++;
+    {bundle}_pending |= bit;
+    {bundle_upper}_SCHED_UNLOCK();
+}}
+
+void {bundle}_sched_init(uint32_t now_ms) {{
+    for (int j = 0; j < {bundle_upper}_SCHED_NUM_JOBS; ++j) {{
+        {bundle}_next_release[j] = now_ms;
+        {bundle}_overrun_count[j] = 0;
+    }}
+    {bundle}_pending = 0;
+}}
+
+void {bundle}_sched_tick(uint32_t now_ms) {{
+    for (int j = 0; j < {bundle_upper}_SCHED_NUM_JOBS; ++j) {{
+        uint32_t period = {bundle}_jobs[j].period_ms;
+        if (!period || (int32_t)(now_ms - {bundle}_next_release[j]) < 0) continue;
+        {bundle}_release(j);
+        {bundle}_next_release[j] += period;
+        // Skip releases missed while the tick was not called instead of bursting them
+        if ((int32_t)(now_ms - {bundle}_next_release[j]) >= 0) {bundle}_next_release[j] = now_ms + period;
+    }}
+}}
+
+int {bundle}_sched_post(int job) {{
+    if (job < 0 || job >= {bundle_upper}_SCHED_NUM_JOBS) return -1;
+    {bundle}_release(job);
+    return 0;
+}}
+
+uint32_t {bundle}_sched_overruns(int job) {{
+    if (job < 0 || job >= {bundle_upper}_SCHED_NUM_JOBS) return 0;
+    return {bundle}_overrun_count[job];
+}}
+
+static void {bundle}_job_done(int status, void *user_arg) {{
+    {bundle}_jobs[(intptr_t)user_arg].done(status);
+}}
+
+int {bundle}_sched_run(void) {{
+    if ({bundle}_running >= 0) {{
+        // Calls {bundle}_job_done() once the NPU has finished
+        if ({bundle}_jobs[{bundle}_running].poll() == 1) return 1;
+        {bundle}_running = -1;
+    }}
+
+    // Start the next job right away so the NPU does not sit idle between jobs
+    for (;;) {{
+        int job = 0;
+        {bundle_upper}_SCHED_LOCK();
+        uint32_t pending = {bundle}_pending;
+        if (pending) {{
+            while (!(pending & (1u << job))) ++job;
+            {bundle}_pending = pending & ~(1u << job);
+        }}
+        {bundle_upper}_SCHED_UNLOCK();
+        if (!pending) return 0;
+
+        {bundle}_jobs[job].prepare();
+        {bundle}_running = job;
+        int rc = {bundle}_jobs[job].start({bundle}_job_done, (void *)(intptr_t)job);
+        if (rc == 0) return 1;
+        {bundle}_running = -1;
+        {bundle}_jobs[job].done(rc);
+    }}
+}}
+"""
+
+
+def parse_schedule(specs, prefixes):
+    """
+    Turn PREFIX=PERIOD_MS[:PRIORITY] specs into jobs sorted by priority.
+
+    Lower priority numbers run first; models without a spec are event-driven
+    (period 0) and get priorities after the listed ones, in bundle order.
+    Returns a list of {"prefix", "period_ms", "priority"}.
+    """
+    jobs = {}
+    for n, spec in enumerate(specs):
+        prefix, sep, timing = spec.partition("=")
+        if not sep or prefix not in prefixes:
+            raise SystemExit(f"Bad --schedule entry '{spec}': expected PREFIX=PERIOD_MS[:PRIORITY] "
+                             f"with PREFIX one of {', '.join(prefixes)}")
+        period, _, priority = timing.partition(":")
+        try:
+            jobs[prefix] = {"prefix": prefix, "period_ms": int(period), "priority": int(priority) if priority else n}
+        except ValueError:
+            raise SystemExit(f"Bad --schedule entry '{spec}': period and priority must be integers")
+        if jobs[prefix]["period_ms"] < 0:
+            raise SystemExit(f"Bad --schedule entry '{spec}': the period must not be negative")
+    last = max((job["priority"] for job in jobs.values()), default=-1)
+    for prefix in prefixes:
+        if prefix not in jobs:
+            last += 1
+            jobs[prefix] = {"prefix": prefix, "period_ms": 0, "priority": last}
+    order = {prefix: n for n, prefix in enumerate(prefixes)}
+    return sorted(jobs.values(), key=lambda job: (job["priority"], order[job["prefix"]]))
+
+
+def schedule_report(bundle, jobs):
+    """Print the job table and the scheduler's memory footprint."""
+    periods = [f"{job['period_ms']} ms" if job["period_ms"] else "posted" for job in jobs]
+    width = _column_width("Model", [job["prefix"] for job in jobs])
+    priority_width = _column_width("Priority", [job["priority"] for job in jobs])
+    period_width = _column_width("Period", periods, 10)
+    print(f"\n{'Job':<5}{'Model':<{width + 2}}{'Priority':>{priority_width + 1}}{'Period':>{period_width + 2}}")
+    for n, (job, period) in enumerate(zip(jobs, periods)):
+        print(f"{n:<5}{job['prefix']:<{width + 2}}{job['priority']:>{priority_width + 1}}{period:>{period_width + 2}}")
+    # 4 pointers + period per descriptor; pending mask, running index, release time and overrun count per job
+    print(f"\n{bundle}_sched: {len(jobs) * 20} bytes of const job table, {8 + len(jobs) * 8} bytes of RAM (32-bit target)")
+
+
+def write_scheduler(out_dir, bundle, models, jobs):
+    """<bundle>_sched.h/.c: a cooperative priority scheduler over the bundled models."""
+    npz_names = ", ".join(m["model"]["npz_name"] for m in models)
+    bundle_upper = bundle.upper()
+    h_sched = os.path.join(out_dir, f"{bundle}_sched.h")
+    c_sched = os.path.join(out_dir, f"{bundle}_sched.c")
+
+    job_enum = "enum {\n" + "".join(
+        f"    {bundle_upper}_JOB_{job['prefix'].upper()} = {n},\n" for n, job in enumerate(jobs)
+    ) + "};"
+    hook_decls = "\n".join(
+        f"void {job['prefix']}_sched_prepare(void);\nvoid {job['prefix']}_sched_done(int status);" for job in jobs
+    )
+    hook_source = "".join(
+        f"__attribute__((weak)) void {job['prefix']}_sched_prepare(void) {{\n}}\n\n"
+        f"__attribute__((weak)) void {job['prefix']}_sched_done(int status) {{\n    (void)status;\n}}\n\n"
+        for job in jobs
+    ).rstrip("\n") + "\n"
+    job_rows = "\n".join(
+        f"    {{ {p}_invoke_async, {p}_poll, {p}_sched_prepare, {p}_sched_done, {job['period_ms']} }}, "
+        f"// priority {job['priority']}"
+        for job in jobs for p in [job["prefix"]]
+    )
+
+    with open(h_sched, "w") as f:
+        f.write(HEADER.format(npz_name=npz_names))
+        f.write(textwrap.dedent("""            #pragma once
+            #include <stdint.h>
+
+            #ifdef __cplusplus
+            extern "C" {
+            #endif
+            """))
+        f.write(SCHED_DECLS.format(
+            bundle=bundle, bundle_upper=bundle_upper, num_jobs=len(jobs), job_enum=job_enum, hook_decls=hook_decls
+        ))
+        f.write(textwrap.dedent("""
+            #ifdef __cplusplus
+            }
+            #endif
+            """))
+
+    with open(c_sched, "w") as f:
+        f.write(HEADER.format(npz_name=npz_names))
+        f.write("#include <stdint.h>\n")
+        for m in models:
+            f.write(f'#include "{m["prefix"]}_run.h"\n')
+        f.write(f'#include "{bundle}_sched.h"\n')
+        f.write(SCHED_SOURCE.format(
+            bundle=bundle, bundle_upper=bundle_upper, hook_source=hook_source, job_rows=job_rows
+        ))
+    return h_sched, c_sched
+
+
+def write_model_buffers(out_dir, bundle, m, private):
+    """Per-model region accessors pointing into the shared arenas."""
+    prefix = m["prefix"]
+    model = m["model"]
+    weight_region = model["weight_region"]
+    used_regions = [r for r, cap in m["region_caps"].items() if cap > 0]
+
+    h_buf = os.path.join(out_dir, f"{prefix}_buffers.h")
+    c_buf = os.path.join(out_dir, f"{prefix}_buffers.c")
+
+    with open(h_buf, "w") as f:
+        f.write(HEADER.format(npz_name=model["npz_name"]))
+        f.write("#pragma once\n#include <stddef.h>\n#include <stdint.h>\n\n")
+        f.write(f"extern uint8_t* {prefix}_get_region_base_ptr(int region);\n")
+        f.write(f"extern size_t   {prefix}_get_region_size(int region);\n")
+
+    with open(c_buf, "w") as f:
+        f.write(HEADER.format(npz_name=model["npz_name"]))
+        f.write('#include <stddef.h>\n#include <stdint.h>\n')
+        f.write(f'#include "{prefix}_weights.h"\n')
+        f.write(f'#include "{prefix}_meta.h"\n')
+        f.write(f'#include "{prefix}_buffers.h"\n')
+        f.write(f'#include "{bundle}_bundle.h"\n\n')
+
+        for r in used_regions:
+            if (prefix, r) in private:
+                f.write(f'__attribute__((aligned(32))) static uint8_t {prefix}_region_{r}[{m["region_caps"][r]}] = {{0}};\n')
+        f.write("\n")
+
+        f.write(f"uint8_t* {prefix}_get_region_base_ptr(int region) {{\n")
+        f.write("    switch(region) {\n")
+        for r in used_regions:
+            if (prefix, r) in private:
+                f.write(f"    case {r}: return {prefix}_region_{r}; // private (holds variables)\n")
+            else:
+                f.write(f"    case {r}: return {bundle}_arena_{r}; // shared arena\n")
+        f.write(f"    case {weight_region}: return (uint8_t*){prefix}_weights; // weights region\n")
+        f.write("    default: return (uint8_t*)0; // unused region\n")
+        f.write("    }\n}\n\n")
+
+        f.write(f"size_t {prefix}_get_region_size(int region) {{\n")
+        f.write("    switch(region) {\n")
+        for r in used_regions:
+            f.write(f"    case {r}: return {m['region_caps'][r]};\n")
+        f.write(f"    case {weight_region}: return {prefix}_weights_size;\n")
+        f.write("    default: return 0;\n")
+        f.write("    }\n}\n")
+    return h_buf, c_buf
+
+
+def generate_bundle(npz_paths, out_dir, bundle, prefixes=None, dedup_weights=False, weight_align=16,
+                    schedule=None):
+    """
+    Generate the bundle and all per-model sources. Returns the written paths.
+
+    With schedule (a list of PREFIX=PERIOD_MS[:PRIORITY] specs, possibly
+    empty), the models also get the async API and <bundle>_sched.h/.c.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    prefixes = prefixes or [default_prefix(p) for p in npz_paths]
+    if len(set(prefixes)) != len(prefixes):
+        raise SystemExit(f"Duplicate model prefixes: {prefixes} (use --prefixes)")
+
+    models = load_models(npz_paths, prefixes)
+    arena_sizes, private = plan_arena(models)
+    arena_report(models, arena_sizes, private)
+
+    scheduler = schedule is not None
+    if scheduler:
+        if len(models) > 32:
+            raise SystemExit("The scheduler supports at most 32 models")
+        jobs = parse_schedule(schedule, prefixes)
+        schedule_report(bundle, jobs)
+
+    paths = list(write_bundle(out_dir, bundle, models, arena_sizes, scheduler))
+    if dedup_weights:
+        blobs = [m["model"]["weight_blob"].tobytes() for m in models]
+        pool, offsets = build_weight_pool(blobs, weight_align)
+        weight_pool_report(models, blobs, pool, offsets)
+        paths.extend(write_weight_pool(out_dir, bundle, models, pool, offsets))
+
+    for m in models:
+        prefix, model = m["prefix"], m["model"]
+        paths.append(write_cmd_header(out_dir, prefix, model))
+        if not dedup_weights:
+            paths.append(write_weights_header(out_dir, prefix, model))
+        paths.append(write_meta_header(out_dir, prefix, model))
+        paths.extend(write_model_buffers(out_dir, bundle, m, private))
+        paths.extend(write_runner(out_dir, prefix, model, m["region_caps"], m["region_sources"],
+                                  async_api=scheduler, bundle=bundle))
+    if scheduler:
+        paths.extend(write_scheduler(out_dir, bundle, models, jobs))
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Convert several Vela raw .npz files to one C bundle with shared region arenas"
+    )
+    ap.add_argument("npz", nargs="+", help="Vela raw outputs (.npz) of the models, in any order")
+    ap.add_argument("--out-dir", default="gen", help="Output directory for generated C")
+    ap.add_argument("--bundle", default="models", help="Symbol prefix for the shared arenas and driver")
+    ap.add_argument("--prefixes", nargs="+", default=None,
+                    help="Symbol prefix per model (default: npz file name without _vela)")
+    ap.add_argument("--dedup-weights", action="store_true",
+                    help="Pack the weight blobs into one shared pool, reusing identical bytes where possible")
+    ap.add_argument("--weight-align", type=int, default=16,
+                    help="Alignment of each model's weights inside the pool (default: 16, the driver minimum)")
+    ap.add_argument("--schedule", nargs="*", default=None, metavar="PREFIX=PERIOD_MS[:PRIORITY]",
+                    help="Also generate <bundle>_sched.h/.c, a priority scheduler over the models; each entry "
+                         "gives a model's release period (0: posted only) and priority (lower runs first)")
+    args = ap.parse_args()
+
+    if args.weight_align < 16 or args.weight_align % 16:
+        ap.error("--weight-align must be a multiple of 16")
+    if args.prefixes and len(args.prefixes) != len(args.npz):
+        ap.error("--prefixes needs one prefix per .npz file")
+
+    paths = generate_bundle(
+        args.npz, args.out_dir, args.bundle, args.prefixes, args.dedup_weights, args.weight_align, args.schedule
+    )
+
+    print("\nGenerated:\n" + "\n".join(f"  {p}" for p in paths))
+
+if __name__ == "__main__":
+    main()
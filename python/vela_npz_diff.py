@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Semantic diff of two Vela raw .npz outputs
+
+Shows what changed in the compiled artifact when the System_Config, Memory_Mode
+or Vela version changes:
+
+  - scalar fields (weight/scratch/scratch_fast region and size),
+  - every input/output/variable tensor (shape, element size, region, offset),
+  - the size bound to each region and, when the memory config of each side is
+    known (summary CSV next to the npz, or --system-config/--memory-mode), the
+    memory each region lands in and the total per memory (e.g. SRAM),
+  - weight_data: size, hash and how many bytes differ,
+  - cmd_data: optimizer config and an operation-level diff of the decoded
+    command stream. Operations are aligned by their structure (kind, shapes,
+    kernel, modes); aligned operations are then checked for changed regions,
+    offsets and weight/scale/DMA lengths.
+
+Exit status is 0 when the two files are equivalent and 1 otherwise.
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from ethosu_cmd_decode import decode
+from vela_raw_to_c import (
+    MAX_REGIONS, TENSOR_KINDS, compute_regions, default_memory, load_vela_npz, region_role, region_sizes,
+    vela_memory_areas
+)
+from vela_summary import find_summary_csv, read_summary_csv
+
+SCALAR_FIELDS = ("weight_region", "scratch_region", "scratch_size", "scratch_fast_region", "scratch_fast_size")
+# Operation summary keys that describe placement rather than structure
+PLACEMENT_KEYS = ("region", "offset", "length", "src", "dst", "src_region", "dst_region", "tiles", "strides")
+
+
+def memory_config(npz_path, vela_config, system_config=None, memory_mode=None):
+    """(system_config, memory_mode, {role: linker memory}) for one npz, or Nones."""
+    if not (system_config and memory_mode):
+        stem = os.path.basename(npz_path)
+        stem = stem[:-len("_vela.npz")] if stem.endswith("_vela.npz") else os.path.splitext(stem)[0]
+        summary_csv = find_summary_csv(os.path.dirname(os.path.abspath(npz_path)), stem, system_config)
+        if summary_csv:
+            summary = read_summary_csv(summary_csv)
+            system_config = system_config or summary.get("system_config")
+            memory_mode = memory_mode or summary.get("memory_mode")
+    if not (vela_config and system_config and memory_mode):
+        return system_config, memory_mode, None
+    areas = vela_memory_areas(vela_config, system_config, memory_mode)
+    return system_config, memory_mode, {role: default_memory(mem, system_config) for role, mem in areas.items()}
+
+
+def load_side(npz_path, vela_config, system_config=None, memory_mode=None):
+    model = load_vela_npz(npz_path)
+    region_caps, _ = compute_regions(model)
+    system_config, memory_mode, memories = memory_config(npz_path, vela_config, system_config, memory_mode)
+    return {
+        "path": npz_path,
+        "model": model,
+        "sizes": region_sizes(model, region_caps),
+        "system_config": system_config,
+        "memory_mode": memory_mode,
+        "memories": memories,
+        "decoded": decode(model["cmd_data"].tobytes()),
+    }
+
+
+def _structure(value):
+    """An operation summary with the placement keys dropped, as a hashable key."""
+    if isinstance(value, dict):
+        return tuple((k, _structure(v)) for k, v in value.items() if k not in PLACEMENT_KEYS)
+    if isinstance(value, list):
+        return tuple(_structure(v) for v in value)
+    return value
+
+
+def _placement_changes(op_a, op_b, path=""):
+    """Placement fields that differ between two structurally equal operations."""
+    changes = []
+    for key in sorted(set(op_a) | set(op_b)):
+        if not path and key == "offset":
+            continue  # Position in the command stream
+        a, b = op_a.get(key), op_b.get(key)
+        name = f"{path}.{key}" if path else key
+        if isinstance(a, dict) and isinstance(b, dict):
+            changes.extend(_placement_changes(a, b, name))
+        elif key in PLACEMENT_KEYS and a != b:
+            changes.append((name, a, b))
+    return changes
+
+
+def diff_fields(a, b):
+    rows = []
+    for key in SCALAR_FIELDS:
+        rows.append((key, a["model"][key], b["model"][key]))
+    rows.append(("weight_bytes", int(a["model"]["weight_blob"].size), int(b["model"]["weight_blob"].size)))
+    rows.append(("cmd_data_bytes", int(a["model"]["cmd_data"].nbytes), int(b["model"]["cmd_data"].nbytes)))
+    return [{"field": k, "a": va, "b": vb} for k, va, vb in rows]
+
+
+def diff_tensors(a, b):
+    rows = []
+    for kind in TENSOR_KINDS:
+        ta, tb = a["model"][f"{kind}s"], b["model"][f"{kind}s"]
+        for i in range(max(len(ta), len(tb))):
+            x = ta[i] if i < len(ta) else None
+            y = tb[i] if i < len(tb) else None
+            fields = ("shape", "elem_size", "region", "offset")
+            changed = [f for f in fields if not x or not y or x[f] != y[f]]
+            if changed:
+                rows.append({
+                    "tensor": f"{kind.upper()}{i}",
+                    "changed": changed,
+                    "a": {f: list(x[f]) if f == "shape" else x[f] for f in fields} if x else None,
+                    "b": {f: list(y[f]) if f == "shape" else y[f] for f in fields} if y else None,
+                })
+    return rows
+
+
+def diff_regions(a, b):
+    """Per-region size and memory, plus totals per memory on each side."""
+    rows = []
+    totals = {"a": {}, "b": {}}
+    for r in range(MAX_REGIONS):
+        entry = {"region": r}
+        for side, data in (("a", a), ("b", b)):
+            size = data["sizes"][r]
+            memory = data["memories"][region_role(data["model"], r)] if data["memories"] and size else None
+            entry[f"{side}_size"] = size
+            entry[f"{side}_memory"] = memory
+            if memory:
+                totals[side][memory] = totals[side].get(memory, 0) + size
+        if entry["a_size"] or entry["b_size"]:
+            rows.append(entry)
+    return rows, totals
+
+
+def diff_weights(a, b):
+    wa, wb = a["model"]["weight_blob"], b["model"]["weight_blob"]
+    overlap = min(wa.size, wb.size)
+    differing = int(np.count_nonzero(wa[:overlap] != wb[:overlap]))
+    first = int(np.argmax(wa[:overlap] != wb[:overlap])) if differing else None
+    return {
+        "a_bytes": int(wa.size),
+        "b_bytes": int(wb.size),
+        "a_sha256": hashlib.sha256(wa.tobytes()).hexdigest()[:16],
+        "b_sha256": hashlib.sha256(wb.tobytes()).hexdigest()[:16],
+        "identical": wa.size == wb.size and not differing,
+        "differing_bytes": differing + abs(int(wa.size) - int(wb.size)),
+        "first_difference": first if first is not None else (overlap if wa.size != wb.size else None),
+    }
+
+
+def diff_commands(a, b):
+    """Operation-level diff of the two command streams."""
+    ops_a = [op for stream in a["decoded"]["streams"] for op in stream["operations"]]
+    ops_b = [op for stream in b["decoded"]["streams"] for op in stream["operations"]]
+    keys_a = [_structure(op) for op in ops_a]
+    keys_b = [_structure(op) for op in ops_b]
+
+    result = {
+        "a_config": a["decoded"]["header"].get("optimizer_config"),
+        "b_config": b["decoded"]["header"].get("optimizer_config"),
+        "a_words": sum(s["words"] for s in a["decoded"]["streams"]),
+        "b_words": sum(s["words"] for s in b["decoded"]["streams"]),
+        "a_operations": len(ops_a),
+        "b_operations": len(ops_b),
+        "a_counts": {},
+        "b_counts": {},
+        "structural": [],
+        "moved": [],
+        "identical_bytes": a["model"]["cmd_data"].tobytes() == b["model"]["cmd_data"].tobytes(),
+    }
+    for side, ops in (("a", ops_a), ("b", ops_b)):
+        for op in ops:
+            result[f"{side}_counts"][op["op"]] = result[f"{side}_counts"].get(op["op"], 0) + 1
+
+    matcher = difflib.SequenceMatcher(None, keys_a, keys_b, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                changes = _placement_changes(ops_a[i], ops_b[j])
+                if changes:
+                    result["moved"].append({"a_index": i, "b_index": j, "op": ops_a[i]["op"], "changes": changes})
+        else:
+            result["structural"].append({
+                "change": tag,
+                "a": [(i, ops_a[i]["op"]) for i in range(i1, i2)],
+                "b": [(j, ops_b[j]["op"]) for j in range(j1, j2)],
+            })
+    return result
+
+
+def _delta(a, b):
+    if isinstance(a, int) and isinstance(b, int) and not isinstance(a, bool):
+        return f"{b - a:+d}" if a != b else ""
+    return "" if a == b else "changed"
+
+
+def print_report(a, b, report, max_diffs):
+    def side(data):
+        config = f" ({data['system_config']}, {data['memory_mode']})" if data["system_config"] else ""
+        return f"{data['path']}{config}"
+
+    print(f"A: {side(a)}")
+    print(f"B: {side(b)}")
+
+    print(f"\n{'field':<22} {'A':>12} {'B':>12} {'delta':>10}")
+    for row in report["fields"]:
+        print(f"{row['field']:<22} {str(row['a']):>12} {str(row['b']):>12} {_delta(row['a'], row['b']):>10}")
+
+    for row in report["tensors"]:
+        print(f"{row['tensor']}: {', '.join(row['changed'])} changed: {row['a']} -> {row['b']}")
+
+    regions, totals = report["regions"]
+    print(f"\n{'region':>6} {'A size':>10} {'A memory':>9} {'B size':>10} {'B memory':>9} {'delta':>10}")
+    for row in regions:
+        print(f"{row['region']:>6} {row['a_size']:>10} {str(row['a_memory'] or '-'):>9} "
+              f"{row['b_size']:>10} {str(row['b_memory'] or '-'):>9} {_delta(row['a_size'], row['b_size']):>10}")
+    for memory in sorted(set(totals["a"]) | set(totals["b"])):
+        ta, tb = totals["a"].get(memory, 0), totals["b"].get(memory, 0)
+        print(f"{memory + ' total':>6} {ta:>10} {'':>9} {tb:>10} {'':>9} {_delta(ta, tb):>10}")
+
+    weights = report["weights"]
+    if weights["identical"]:
+        print(f"\nweight_data: identical ({weights['a_bytes']} bytes, sha256 {weights['a_sha256']})")
+    else:
+        print(f"\nweight_data: {weights['a_bytes']} -> {weights['b_bytes']} bytes, "
+              f"{weights['differing_bytes']} bytes differ (first at {weights['first_difference']}), "
+              f"sha256 {weights['a_sha256']} -> {weights['b_sha256']}")
+
+    cmds = report["commands"]
+    if cmds["a_config"] != cmds["b_config"]:
+        print(f"optimizer config: {cmds['a_config']} -> {cmds['b_config']}")
+    kinds = sorted(set(cmds["a_counts"]) | set(cmds["b_counts"]))
+    counts = ", ".join(
+        f"{k} {cmds['a_counts'].get(k, 0)}" + (f"->{cmds['b_counts'].get(k, 0)}" if cmds["a_counts"].get(k) != cmds["b_counts"].get(k) else "")
+        for k in kinds
+    )
+    print(f"cmd_data: {cmds['a_words']} -> {cmds['b_words']} words, {cmds['a_operations']} -> {cmds['b_operations']} "
+          f"operations ({counts})")
+    if not cmds["structural"] and not cmds["moved"]:
+        if cmds["identical_bytes"]:
+            print("  operations identical, command streams byte-identical")
+        else:
+            print("  operations identical; other register values differ (e.g. quantization scales), "
+                  "see ethosu_cmd_decode.py --commands")
+        return
+    print(f"  {len(cmds['structural'])} structural change(s), {len(cmds['moved'])} operation(s) with changed "
+          f"regions/offsets/lengths")
+    shown = 0
+    for change in cmds["structural"]:
+        if shown >= max_diffs:
+            break
+        a_ops = " ".join(f"{op}#{i}" for i, op in change["a"]) or "-"
+        b_ops = " ".join(f"{op}#{j}" for j, op in change["b"]) or "-"
+        print(f"  {change['change']:<7} A {a_ops}  ->  B {b_ops}")
+        shown += 1
+    for moved in cmds["moved"]:
+        if shown >= max_diffs:
+            break
+        fields = ", ".join(f"{name} {va}->{vb}" for name, va, vb in moved["changes"])
+        print(f"  moved   {moved['op']}#{moved['a_index']} -> #{moved['b_index']}: {fields}")
+        shown += 1
+    remaining = len(cmds["structural"]) + len(cmds["moved"]) - shown
+    if remaining > 0:
+        print(f"  ... {remaining} more (see --json)")
+
+
+def is_identical(report):
+    return (
+        all(row["a"] == row["b"] for row in report["fields"])
+        and not report["tensors"]
+        and report["weights"]["identical"]
+        and not report["commands"]["structural"]
+        and report["commands"]["identical_bytes"]
+    )
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Semantic diff of two Vela raw .npz outputs")
+    parser.add_argument("npz_a", help="First Vela raw .npz")
+    parser.add_argument("npz_b", help="Second Vela raw .npz")
+    parser.add_argument("--vela-config", default=os.path.join(script_dir, os.pardir, "config", "ambiq_final.ini"),
+                        help="Vela .ini used to map regions to memories")
+    parser.add_argument("--system-config", nargs="+", default=None, metavar="NAME",
+                        help="System_Config of both files, or of A and B (default: from the summary CSVs)")
+    parser.add_argument("--memory-mode", nargs="+", default=None, metavar="NAME",
+                        help="Memory_Mode of both files, or of A and B (default: from the summary CSVs)")
+    parser.add_argument("--max-diffs", type=int, default=20, help="Max number of operation changes to print")
+    parser.add_argument("--json", default=None, help="Also write the full diff as JSON")
+    args = parser.parse_args()
+
+    def pick(values, index):
+        return values[min(index, len(values) - 1)] if values else None
+
+    a = load_side(args.npz_a, args.vela_config, pick(args.system_config, 0), pick(args.memory_mode, 0))
+    b = load_side(args.npz_b, args.vela_config, pick(args.system_config, 1), pick(args.memory_mode, 1))
+
+    report = {
+        "fields": diff_fields(a, b),
+        "tensors": diff_tensors(a, b),
+        "regions": diff_regions(a, b),
+        "weights": diff_weights(a, b),
+        "commands": diff_commands(a, b),
+    }
+    print_report(a, b, report, args.max_diffs)
+
+    if args.json:
+        regions, totals = report["regions"]
+        with open(args.json, "w") as f:
+            json.dump(dict(report, regions=regions, memory_totals=totals), f, indent=1)
+        print(f"\nSaved diff: {args.json}")
+
+    sys.exit(0 if is_identical(report) else 1)
+
+
+if __name__ == "__main__":
+    main()
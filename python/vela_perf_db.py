@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Database
+
+Records the key Vela summary metrics of every model, per (accelerator, system
+config, memory mode), together with any measured PMU counters, in a local
+SQLite store tagged with the git revision. A new run can then be compared
+against a baseline run; metrics that grow beyond their threshold are
+regressions, reported as a diff table with a non-zero exit status so the
+check can gate CI.
+
+  record   scan for *_summary_*.csv (as written by run_vela_pipeline.py) and
+           PMU logs and store them as a new run
+  compare  diff two stored runs
+  check    record, then compare the new run against the baseline
+  list     show the stored runs
+
+Every gated metric is "lower is better". PMU counters are stored with an
+empty accelerator/system config/memory mode, since they describe hardware
+rather than a Vela configuration.
+"""
+
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from vela_perf_report import parse_pmu_log
+from vela_summary import read_summary_csv
+
+# Summary metrics stored per run, with their default regression threshold
+# (relative increase over the baseline).
+VELA_METRICS = {
+    "inference_time": 0.02,
+    "cycles_total": 0.02,
+    "cycles_npu": 0.02,
+    "sram_memory_used": 0.0,
+    "dram_memory_used": 0.0,
+    "on_chip_flash_memory_used": 0.0,
+    "off_chip_flash_memory_used": 0.0,
+    "sram_total_bytes": 0.05,
+    "dram_total_bytes": 0.05,
+    "off_chip_flash_total_bytes": 0.05,
+    "total_npu_encoded_weights": 0.0,
+}
+
+# Measured PMU counters that are gated; all other counters are stored only.
+PMU_METRICS = {
+    "NPU_ACTIVE": 0.02,
+    "CYCLES": 0.02,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    created  REAL NOT NULL,
+    git_rev  TEXT NOT NULL,
+    label    TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id        INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    model         TEXT NOT NULL,
+    accelerator   TEXT NOT NULL,
+    system_config TEXT NOT NULL,
+    memory_mode   TEXT NOT NULL,
+    metric        TEXT NOT NULL,
+    value         REAL NOT NULL,
+    source        TEXT NOT NULL,
+    PRIMARY KEY (run_id, model, accelerator, system_config, memory_mode, metric)
+);
+"""
+
+
+def open_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def git_revision(repo_dir):
+    """HEAD of repo_dir, with a "-dirty" suffix for uncommitted changes; "unknown" outside git."""
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"], cwd=repo_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo_dir, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{rev}-dirty" if dirty else rev
+
+
+def collect_metrics(search_dirs, perf_dir=None):
+    """
+    Return a list of (model, accelerator, system_config, memory_mode, metric,
+    value, source) rows from the summary CSVs under search_dirs and the
+    <model>_performance.txt logs in perf_dir.
+    """
+    rows = {}
+    seen = set()
+    for directory in search_dirs:
+        for path in sorted(Path(directory).rglob("*_summary_*.csv")):
+            summary = read_summary_csv(path)
+            key = (
+                str(summary.get("network", path.stem.split("_summary_")[0])),
+                str(summary.get("accelerator_configuration", "")),
+                str(summary.get("system_config", "")),
+                str(summary.get("memory_mode", "")),
+            )
+            if key in seen:
+                print(f"Warning: {path} duplicates {'/'.join(key)}; keeping the last one", file=sys.stderr)
+            seen.add(key)
+            for metric in VELA_METRICS:
+                value = summary.get(metric)
+                if isinstance(value, (int, float)):
+                    rows[key + (metric,)] = (float(value), "vela")
+
+    if perf_dir and Path(perf_dir).is_dir():
+        for log in sorted(Path(perf_dir).glob("*_performance.txt")):
+            model = log.name[:-len("_performance.txt")]
+            for event, count in parse_pmu_log(log).items():
+                rows[(model, "", "", "", event)] = (float(count), "pmu")
+
+    return [key + value for key, value in sorted(rows.items())]
+
+
+def record_run(conn, metrics, git_rev, label=None):
+    """Store metrics as a new run and return its id."""
+    with conn:
+        cur = conn.execute("INSERT INTO runs (created, git_rev, label) VALUES (?, ?, ?)", (time.time(), git_rev, label))
+        run_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO metrics (run_id, model, accelerator, system_config, memory_mode, metric, value, source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id,) + row for row in metrics],
+        )
+    return run_id
+
+
+def resolve_run(conn, spec, before=None):
+    """
+    Resolve a run spec: an id, a label (its latest run), or None for the latest
+    run (older than run id `before` if given). Returns the id or None.
+    """
+    if spec is not None and str(spec).isdigit():
+        row = conn.execute("SELECT id FROM runs WHERE id = ?", (int(spec),)).fetchone()
+    elif spec is not None:
+        row = conn.execute("SELECT id FROM runs WHERE label = ? ORDER BY id DESC LIMIT 1", (spec,)).fetchone()
+    elif before is not None:
+        row = conn.execute("SELECT id FROM runs WHERE id < ? ORDER BY id DESC LIMIT 1", (before,)).fetchone()
+    else:
+        row = conn.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def load_run(conn, run_id):
+    return {
+        row[:5]: row[5]
+        for row in conn.execute(
+            "SELECT model, accelerator, system_config, memory_mode, metric, value FROM metrics WHERE run_id = ?",
+            (run_id,),
+        )
+    }
+
+
+def compare_runs(conn, baseline_id, new_id, thresholds):
+    """
+    Diff two runs on the gated metrics. Returns (rows, missing), where rows are
+    dicts with the relative change and a status of "ok", "improved" or
+    "REGRESSION", and missing lists keys present only in the baseline.
+    """
+    baseline = load_run(conn, baseline_id)
+    new = load_run(conn, new_id)
+    rows = []
+    for key, old in sorted(baseline.items()):
+        metric = key[4]
+        if metric not in thresholds or key not in new:
+            continue
+        value = new[key]
+        change = (value - old) / old if old else (0.0 if value == old else float("inf"))
+        threshold = thresholds[metric]
+        if change > threshold:
+            status = "REGRESSION"
+        elif change < 0:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({
+            "model": key[0],
+            "config": "/".join(k for k in key[1:4] if k) or "measured",
+            "metric": metric,
+            "baseline": old,
+            "new": value,
+            "change": change,
+            "threshold": threshold,
+            "status": status,
+        })
+    missing = sorted({key[:4] for key in baseline} - {key[:4] for key in new})
+    return rows, missing
+
+
+def print_diff(rows, missing, baseline_id, new_id, show_all=False):
+    regressions = [r for r in rows if r["status"] == "REGRESSION"]
+    shown = rows if show_all else [r for r in rows if r["status"] != "ok"]
+    print(f"\nRun {new_id} vs baseline run {baseline_id}: {len(rows)} metric(s), {len(regressions)} regression(s)")
+    if shown:
+        print(f"{'model':<28}  {'config':<48}  {'metric':<26}  {'baseline':>14}  {'new':>14}  {'change':>8}  {'limit':>6}  status")
+        for r in shown:
+            print(
+                f"{r['model']:<28}  {r['config']:<48}  {r['metric']:<26}  "
+                f"{r['baseline']:>14.6g}  {r['new']:>14.6g}  {100 * r['change']:>+7.2f}%  "
+                f"{100 * r['threshold']:>5.1f}%  {r['status']}"
+            )
+    for key in missing:
+        name = "/".join(k for k in key[1:] if k) or "measured"
+        print(f"Warning: {key[0]} ({name}) is in the baseline but not in run {new_id}", file=sys.stderr)
+    return regressions
+
+
+def list_runs(conn):
+    print(f"{'id':>4}  {'created':<19}  {'git_rev':<18}  {'metrics':>7}  label")
+    for run_id, created, git_rev, label, count in conn.execute(
+        "SELECT r.id, r.created, r.git_rev, r.label, COUNT(m.metric) FROM runs r "
+        "LEFT JOIN metrics m ON m.run_id = r.id GROUP BY r.id ORDER BY r.id"
+    ):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))
+        print(f"{run_id:>4}  {stamp:<19}  {git_rev:<18}  {count:>7}  {label or ''}")
+
+
+def parse_thresholds(items):
+    """Default thresholds updated with METRIC=FRACTION overrides."""
+    thresholds = {**VELA_METRICS, **PMU_METRICS}
+    for item in items or []:
+        metric, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"Invalid --threshold (expected METRIC=FRACTION): {item}")
+        thresholds[metric] = float(value)
+    return thresholds
+
+
+def main():
+    repo_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Record Vela/PMU metrics per run and gate on regressions")
+    parser.add_argument("--db", default=os.environ.get("VELA_PERF_DB", str(repo_dir / "perf_history.sqlite")),
+                        help="SQLite database (default: $VELA_PERF_DB or perf_history.sqlite in the repo root)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_record_args(p):
+        p.add_argument("dirs", nargs="*", default=[str(repo_dir / "example_models")],
+                       help="Directories searched recursively for *_summary_*.csv (default: example_models)")
+        p.add_argument("--perf-dir", default=str(repo_dir / "example_models" / "performance"),
+                       help="Directory of <model>_performance.txt PMU logs")
+        p.add_argument("--label", default=None, help="Label for the new run, e.g. baseline or vela-4.5")
+
+    def add_compare_args(p):
+        p.add_argument("--baseline", default=None,
+                       help="Baseline run id or label (default: the run before the new one)")
+        p.add_argument("--threshold", action="append", default=None, metavar="METRIC=FRACTION",
+                       help="Allowed relative increase per metric, e.g. inference_time=0.05 (repeatable)")
+        p.add_argument("--all", action="store_true", help="Show unchanged metrics in the diff table too")
+
+    add_record_args(sub.add_parser("record", help="Store the current summaries and PMU logs as a new run"))
+    p_compare = sub.add_parser("compare", help="Compare a run against a baseline")
+    p_compare.add_argument("--run", default=None, help="Run id or label to check (default: latest run)")
+    add_compare_args(p_compare)
+    p_check = sub.add_parser("check", help="Record a new run and compare it against the baseline")
+    add_record_args(p_check)
+    add_compare_args(p_check)
+    sub.add_parser("list", help="List stored runs")
+    args = parser.parse_args()
+
+    conn = open_db(args.db)
+
+    if args.command == "list":
+        list_runs(conn)
+        return
+
+    if args.command in ("record", "check"):
+        metrics = collect_metrics(args.dirs, args.perf_dir)
+        if not metrics:
+            print("Error: no Vela summary CSVs or PMU logs found", file=sys.stderr)
+            sys.exit(1)
+        # Resolve the baseline among the stored runs, so that a label shared
+        # with the new run (check --label X --baseline X) cannot pick the new run.
+        baseline_id = resolve_run(conn, args.baseline) if args.command == "check" else None
+        git_rev = git_revision(repo_dir)
+        new_id = record_run(conn, metrics, git_rev, args.label)
+        print(f"Recorded run {new_id}: {len(metrics)} metric(s) at {git_rev}")
+        if args.command == "record":
+            return
+    else:
+        new_id = resolve_run(conn, args.run)
+        if new_id is None:
+            print(f"Error: run not found: {args.run or 'latest'}", file=sys.stderr)
+            sys.exit(1)
+        baseline_id = resolve_run(conn, args.baseline, before=new_id)
+
+    if baseline_id is None or baseline_id == new_id:
+        if args.command == "check":
+            # A gate that compared nothing must not pass; record a baseline run first.
+            print(f"Error: no baseline run to compare against: {args.baseline or 'previous run'}", file=sys.stderr)
+            sys.exit(1)
+        print("No baseline run to compare against; nothing to check")
+        return
+
+    rows, missing = compare_runs(conn, baseline_id, new_id, parse_thresholds(args.threshold))
+    regressions = print_diff(rows, missing, baseline_id, new_id, args.all)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
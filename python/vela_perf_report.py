@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Measured vs Estimated Performance Report
+
+Joins the PMU logs measured on hardware (example_models/performance/
+<model>_performance.txt, or the PMU,<prefix>,<EVENT>,<count> lines printed by
+<prefix>_invoke_profiled()) with the Vela summary CSVs of every model in the
+zoo. One row is reported per (model, summary CSV), so a model compiled for
+several system configs is compared against the same measurement each time.
+
+Per row:
+  - estimated (Vela cycles_total) vs measured (NPU_ACTIVE) NPU cycles and the
+    relative estimate error,
+  - MAC utilization (MAC_ACTIVE / NPU_ACTIVE) and MACs per active cycle,
+  - achieved bytes per cycle on the external (AXI1) and SRAM (AXI0) ports,
+    from the transaction counters times the port's burst length in the ini,
+    next to the bytes per cycle Vela assumed for the same memory.
+
+Errors are then aggregated per system config: the mean signed error shows a
+systematic bias, and configs whose mean absolute error exceeds the tolerance
+are flagged as miscalibrated for the measured hardware.
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from vela_raw_to_c import load_vela_ini, vela_ini_section
+from vela_summary import read_summary_csv
+
+# "INFO - NPU MAC_ACTIVE: 357636 cycles" (hand-written PMU code) and
+# "PMU,kws,MAC_ACTIVE,357636" (<prefix>_invoke_profiled()).
+_INFO_LINE = re.compile(r"NPU\s+(\w+):\s*(\d+)")
+_PMU_LINE = re.compile(r"^PMU,[^,]*,(\w+),(\d+)")
+
+# Counter names in the INFO format that differ from the pmu_ethosu.h names
+_INFO_ALIASES = {"ACTIVE": "NPU_ACTIVE", "IDLE": "NPU_IDLE", "TOTAL": "CYCLES"}
+
+# Summary CSV column prefix per Vela memory type
+_SUMMARY_AREAS = {"Sram": "sram", "Dram": "dram", "OnChipFlash": "on_chip_flash", "OffChipFlash": "off_chip_flash"}
+
+# Burst length Vela uses when the ini does not set <mem>_burst_length
+_DEFAULT_BURST = {"Sram": 32}
+_DEFAULT_BURST_OTHER = 128
+
+
+def parse_pmu_log(path):
+    """Return {event: count} from a PMU log in either supported format."""
+    counters = {}
+    with open(path) as f:
+        for line in f:
+            match = _PMU_LINE.match(line.strip())
+            if match:
+                counters[match.group(1)] = int(match.group(2))
+                continue
+            match = _INFO_LINE.search(line)
+            if match:
+                name = match.group(1)
+                counters[_INFO_ALIASES.get(name, name)] = int(match.group(2))
+    if "CYCLES" not in counters and "NPU_ACTIVE" in counters:
+        counters["CYCLES"] = counters["NPU_ACTIVE"] + counters.get("NPU_IDLE", 0)
+    return counters
+
+
+def port_config(cfg, system_config):
+    """
+    Return {"axi0": (memory_type, burst_bytes), "axi1": (...)} for a
+    System_Config, or None if the ini does not define it.
+    """
+    try:
+        system = vela_ini_section(cfg, f"System_Config.{system_config}")
+    except SystemExit:
+        return None
+    ports = {}
+    for port, default in (("axi0", "Sram"), ("axi1", "OffChipFlash")):
+        mem = system.get(f"{port}_port", default)
+        burst = system.get(f"{mem.lower()}_burst_length", _DEFAULT_BURST.get(mem, _DEFAULT_BURST_OTHER))
+        ports[port] = (mem, int(float(burst)))
+    return ports
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else None
+
+
+def compare(model, summary, counters, ports):
+    """One report row for a model's summary and its measured counters."""
+    estimated = summary.get("cycles_total", 0) or 0
+    active = counters.get("NPU_ACTIVE", 0)
+    row = {
+        "model": model,
+        "system_config": summary.get("system_config"),
+        "memory_mode": summary.get("memory_mode"),
+        "accelerator": summary.get("accelerator_configuration"),
+        "estimated_cycles": estimated,
+        "measured_cycles": active,
+        "measured_total_cycles": counters.get("CYCLES"),
+        "cycle_error": _ratio(estimated - active, active),
+        "nn_macs": summary.get("nn_macs"),
+        "mac_utilization": _ratio(counters.get("MAC_ACTIVE", 0), active),
+        "estimated_macs_per_cycle": _ratio(summary.get("nn_macs", 0), estimated),
+        "measured_macs_per_cycle": _ratio(summary.get("nn_macs", 0), active),
+    }
+
+    # On Ethos-U85 the SRAM_* counters are AXI0 and the EXT_* counters AXI1.
+    for port, counter in (("axi1", "EXT"), ("axi0", "SRAM")):
+        label = "ext" if port == "axi1" else "sram"
+        transactions = counters.get(f"{counter}_RD_TRANS_COMPLETED", 0) + counters.get(f"{counter}_WR_TRANS_COMPLETED_M", 0)
+        if ports is None:
+            row[f"{label}_memory"] = None
+            row[f"measured_{label}_bytes_per_cycle"] = None
+            row[f"estimated_{label}_bytes_per_cycle"] = None
+            continue
+        mem, burst = ports[port]
+        area = _SUMMARY_AREAS.get(mem, mem.lower())
+        row[f"{label}_memory"] = mem
+        row[f"measured_{label}_bytes_per_cycle"] = _ratio(transactions * burst, active)
+        row[f"estimated_{label}_bytes_per_cycle"] = _ratio(summary.get(f"{area}_total_bytes", 0), estimated)
+    return row
+
+
+def find_pairs(zoo_dir, perf_dir, models=None):
+    """Yield (model, pmu_log, summary_csv) for every model with both files."""
+    for log in sorted(Path(perf_dir).glob("*_performance.txt")):
+        model = log.name[:-len("_performance.txt")]
+        if models and model not in models:
+            continue
+        summaries = sorted(Path(zoo_dir).rglob(f"{model}_summary_*.csv"))
+        if not summaries:
+            print(f"Warning: no Vela summary CSV for {model}, skipping", file=sys.stderr)
+        for summary in summaries:
+            yield model, log, summary
+
+
+def calibration(rows, tolerance):
+    """Aggregate the estimate error per system config."""
+    configs = {}
+    for row in rows:
+        if row["cycle_error"] is not None:
+            configs.setdefault(row["system_config"], []).append(row["cycle_error"])
+    result = []
+    for name, errors in sorted(configs.items()):
+        mean_abs = sum(abs(e) for e in errors) / len(errors)
+        result.append({
+            "system_config": name,
+            "models": len(errors),
+            "mean_error": sum(errors) / len(errors),
+            "mean_abs_error": mean_abs,
+            "min_error": min(errors),
+            "max_error": max(errors),
+            "miscalibrated": mean_abs > tolerance,
+        })
+    return result
+
+
+def _fmt(value, spec, scale=1.0):
+    return format(value * scale, spec) if value is not None else "-"
+
+
+def print_report(rows, configs, tolerance):
+    print(f"\n{'='*60}")
+    print("Measured vs Estimated NPU Performance")
+    print(f"{'='*60}")
+    print(f"{'model':<28}  {'system_config':<16}  {'est_cycles':>10}  {'meas_cycles':>11}  {'error':>7}  "
+          f"{'mac_util':>8}  {'ext_B/c':>7}  {'est':>6}  {'sram_B/c':>8}  {'est':>6}")
+    for row in rows:
+        print(
+            f"{row['model']:<28}  {str(row['system_config']):<16}  "
+            f"{row['estimated_cycles']:>10}  {row['measured_cycles']:>11}  "
+            f"{_fmt(row['cycle_error'], '>+6.1f', 100)}%  "
+            f"{_fmt(row['mac_utilization'], '>7.1f', 100)}%  "
+            f"{_fmt(row['measured_ext_bytes_per_cycle'], '>7.2f')}  {_fmt(row['estimated_ext_bytes_per_cycle'], '>6.2f')}  "
+            f"{_fmt(row['measured_sram_bytes_per_cycle'], '>8.2f')}  {_fmt(row['estimated_sram_bytes_per_cycle'], '>6.2f')}"
+        )
+
+    print(f"\nEstimate error per system config (tolerance {100 * tolerance:.0f}%):")
+    for config in configs:
+        flag = "  <- miscalibrated" if config["miscalibrated"] else ""
+        print(
+            f"  {config['system_config']:<20} {config['models']} model(s)  "
+            f"bias {100 * config['mean_error']:+.1f}%  mean |error| {100 * config['mean_abs_error']:.1f}%  "
+            f"range [{100 * config['min_error']:+.1f}%, {100 * config['max_error']:+.1f}%]{flag}"
+        )
+
+
+def main():
+    script_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(
+        description="Compare measured PMU cycles against Vela summary estimates for every model in the zoo"
+    )
+    parser.add_argument("--zoo", default=str(script_dir / "example_models"),
+                        help="Directory searched (recursively) for <model>_summary_<SystemConfig>.csv")
+    parser.add_argument("--perf-dir", default=None,
+                        help="Directory of <model>_performance.txt PMU logs (default: <zoo>/performance)")
+    parser.add_argument("--vela-config", default=str(script_dir / "config" / "ambiq_final.ini"),
+                        help="Vela .ini providing the AXI port memories and burst lengths")
+    parser.add_argument("--models", nargs="+", default=None, help="Only report these models")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Mean absolute relative cycle error above which a system config is flagged (default: 0.10)")
+    parser.add_argument("--json", default=None, help="Also write the rows and per-config summary as JSON")
+    args = parser.parse_args()
+
+    perf_dir = args.perf_dir or str(Path(args.zoo) / "performance")
+    cfg = load_vela_ini(args.vela_config)
+
+    rows = []
+    for model, log, summary_path in find_pairs(args.zoo, perf_dir, args.models):
+        summary = read_summary_csv(summary_path)
+        counters = parse_pmu_log(log)
+        if "NPU_ACTIVE" not in counters:
+            print(f"Warning: no NPU ACTIVE counter in {log}, skipping", file=sys.stderr)
+            continue
+        row = compare(model, summary, counters, port_config(cfg, summary.get("system_config")))
+        row["summary_csv"] = str(summary_path)
+        row["pmu_log"] = str(log)
+        rows.append(row)
+
+    if not rows:
+        print("Error: no model has both a PMU log and a Vela summary CSV", file=sys.stderr)
+        sys.exit(1)
+
+    configs = calibration(rows, args.tolerance)
+    print_report(rows, configs, args.tolerance)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"models": rows, "system_configs": configs}, f, indent=2)
+        print(f"\nSaved report: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
-import argparse, os, textwrap
+import argparse, configparser, os, re, textwrap
 import numpy as np
 
+from tflite_backend import BACKEND_CHOICES, load_interpreter
+from vela_summary import find_summary_csv, read_summary_csv
+
 HEADER = """\
 /*
  * Auto-generated from: {npz_name}
@@ -85,225 +88,1824 @@ def prod(shape):
         p *= int(s)
     return p
 
-def main():
-    ap = argparse.ArgumentParser(description="Convert Vela raw .npz to C for Ethos-U driver")
-    ap.add_argument("npz", help="Vela raw output (.npz) produced with --output-format raw")
-    ap.add_argument("--out-dir", default="gen", help="Output directory for generated C")
-    ap.add_argument("--prefix", default="model", help="Symbol prefix for generated arrays")
-    args = ap.parse_args()
+MAX_REGIONS = 8
+
+TENSOR_KINDS = ("input", "output", "variable")
 
-    os.makedirs(args.out_dir, exist_ok=True)
 
-    with np.load(args.npz, allow_pickle=False) as z:
+def load_vela_npz(npz_path):
+    """
+    Load a Vela raw .npz into a plain dict describing the command stream,
+    weights, scratch areas and per-tensor region layout.
+    """
+    with np.load(npz_path, allow_pickle=False) as z:
         # Required keys per Vela raw format
         required_any = ["cmd_data", "weight_data", "weight_region"]
         for k in required_any:
             if k not in z.files:
-                raise SystemExit(f"Missing '{k}' in {args.npz} (is this Vela --output-format raw?)")
+                raise SystemExit(f"Missing '{k}' in {npz_path} (is this Vela --output-format raw?)")
 
-        cmd_data = z["cmd_data"]               # Driver payload (header + command stream)
-        weight_data = z["weight_data"]
-        weight_region = int(np.array(z["weight_region"]).item())
+        model = {
+            "npz_name": os.path.basename(npz_path),
+            "cmd_data": z["cmd_data"],               # Driver payload (header + command stream)
+            "weight_data": z["weight_data"],
+            "weight_region": int(np.array(z["weight_region"]).item()),
+            # Optional scratch info
+            "scratch_size": int(np.array(z["scratch_size"]).item()) if "scratch_size" in z.files else 0,
+            "scratch_region": int(np.array(z["scratch_region"]).item()) if "scratch_region" in z.files else None,
+            "scratch_fast_size": int(np.array(z["scratch_fast_size"]).item()) if "scratch_fast_size" in z.files else 0,
+            "scratch_fast_region": int(np.array(z["scratch_fast_region"]).item()) if "scratch_fast_region" in z.files else None,
+        }
 
-        # Optional scratch info
-        scratch_size = int(np.array(z["scratch_size"]).item()) if "scratch_size" in z.files else 0
-        scratch_region = int(np.array(z["scratch_region"]).item()) if "scratch_region" in z.files else None
+        # Per-tensor layout (may be absent for older Vela versions)
+        for kind in TENSOR_KINDS:
+            shapes     = [tuple(s) for s in ensure_list(z.get(f"{kind}_shape"))]
+            elem_sizes = [int(e) for e in ensure_list(z.get(f"{kind}_elem_size"))]
+            regions    = [int(r) for r in ensure_list(z.get(f"{kind}_region"))]
+            offsets    = [int(o) for o in ensure_list(z.get(f"{kind}_offset"))]
+            model[f"{kind}s"] = [
+                {"shape": sh, "elem_size": es, "region": reg, "offset": off, "size": prod(sh) * es}
+                for sh, es, reg, off in zip(shapes, elem_sizes, regions, offsets)
+            ]
 
-        scratch_fast_size = int(np.array(z["scratch_fast_size"]).item()) if "scratch_fast_size" in z.files else 0
-        scratch_fast_region = int(np.array(z["scratch_fast_region"]).item()) if "scratch_fast_region" in z.files else None
+    model["weight_blob"] = _to_u8_blob(model["weight_data"])
+    return model
 
-        # Per-tensor layout (may be absent for older Vela versions)
-        input_shape      = [tuple(s) for s in ensure_list(z.get("input_shape"))]
-        input_elem_size  = [int(e) for e in ensure_list(z.get("input_elem_size"))]
-        input_region     = [int(r) for r in ensure_list(z.get("input_region"))]
-        input_offset     = [int(o) for o in ensure_list(z.get("input_offset"))]
-
-        output_shape     = [tuple(s) for s in ensure_list(z.get("output_shape"))]
-        output_elem_size = [int(e) for e in ensure_list(z.get("output_elem_size"))]
-        output_region    = [int(r) for r in ensure_list(z.get("output_region"))]
-        output_offset    = [int(o) for o in ensure_list(z.get("output_offset"))]
-
-        variable_shape     = [tuple(s) for s in ensure_list(z.get("variable_shape"))]
-        variable_elem_size = [int(e) for e in ensure_list(z.get("variable_elem_size"))]
-        variable_region    = [int(r) for r in ensure_list(z.get("variable_region"))]
-        variable_offset    = [int(o) for o in ensure_list(z.get("variable_offset"))]
-
-    # ---- Compute region allocations (excluding weights region, which points directly at g_weights) ----
+
+def compute_regions(model):
+    """
+    Compute the bytes required per region and which tensors live in it.
+
+    Returns (region_caps, region_sources). The weights region is excluded from
+    region_caps (it points directly at the weights array).
+    """
     # There are up to 8 regions; we allocate only those used by inputs/outputs/variables/scratch.
-    MAX_REGIONS = 8
     region_caps = {i: 0 for i in range(MAX_REGIONS)}  # required bytes per region
     region_sources = {i: [] for i in range(MAX_REGIONS)}
 
-    # Inputs
-    for idx, (sh, es, reg, off) in enumerate(zip(input_shape, input_elem_size, input_region, input_offset)):
-        size = prod(sh) * es
-        region_caps[reg] = max(region_caps[reg], off + size)
-        region_sources[reg].append(("INPUT", idx, off, size))
-    # Outputs
-    for idx, (sh, es, reg, off) in enumerate(zip(output_shape, output_elem_size, output_region, output_offset)):
-        size = prod(sh) * es
-        region_caps[reg] = max(region_caps[reg], off + size)
-        region_sources[reg].append(("OUTPUT", idx, off, size))
-    # Variables
-    for idx, (sh, es, reg, off) in enumerate(zip(variable_shape, variable_elem_size, variable_region, variable_offset)):
-        size = prod(sh) * es
-        region_caps[reg] = max(region_caps[reg], off + size)
-        region_sources[reg].append(("VARIABLE", idx, off, size))
+    for kind in TENSOR_KINDS:
+        for idx, t in enumerate(model[f"{kind}s"]):
+            reg = t["region"]
+            region_caps[reg] = max(region_caps[reg], t["offset"] + t["size"])
+            region_sources[reg].append((kind.upper(), idx, t["offset"], t["size"]))
 
     # Scratch
-    if scratch_region is not None and scratch_size > 0:
-        region_caps[scratch_region] = max(region_caps[scratch_region], scratch_size)
-        region_sources[scratch_region].append(("SCRATCH", 0, 0, scratch_size))
-    if scratch_fast_region is not None and scratch_fast_size > 0:
-        region_caps[scratch_fast_region] = max(region_caps[scratch_fast_region], scratch_fast_size)
-        region_sources[scratch_fast_region].append(("SCRATCH_FAST", 0, 0, scratch_fast_size))
+    for name, key in (("SCRATCH", "scratch"), ("SCRATCH_FAST", "scratch_fast")):
+        reg = model[f"{key}_region"]
+        size = model[f"{key}_size"]
+        if reg is not None and size > 0:
+            region_caps[reg] = max(region_caps[reg], size)
+            region_sources[reg].append((name, 0, 0, size))
 
     # Never try to allocate the weight region buffer; we will bind it to g_weights[]
-    region_caps[weight_region] = 0
+    region_caps[model["weight_region"]] = 0
+
+    return region_caps, region_sources
+
+
+def region_sizes(model, region_caps):
+    """Return the size in bytes bound to each of the MAX_REGIONS base pointers."""
+    sizes = [region_caps[r] for r in range(MAX_REGIONS)]
+    sizes[model["weight_region"]] = int(model["weight_blob"].size)
+    return sizes
+
+
+def region_comment(model, region_sources, r):
+    """Describe what a region holds, e.g. "INPUT0, OUTPUT0, SCRATCH"."""
+    if r == model["weight_region"]:
+        return "weights"
+    names = [name if name.startswith("SCRATCH") else f"{name}{idx}" for name, idx, _, _ in region_sources[r]]
+    return ", ".join(names) if names else "unused"
+
+
+# D-cache line size of the Cortex-M cores the SCB_*DCache_by_Addr() calls work on
+CACHE_LINE = 32
+
+
+def cache_ranges(model):
+    """
+    Byte ranges that need D-cache maintenance around an inference.
+
+    Returns (flush, invalidate) lists of (region, offset, size, label): the CPU
+    writes inputs and variables before the NPU reads them (clean), and the NPU
+    writes outputs, variables and scratch before the CPU reads them
+    (invalidate). The read-only weights region needs neither.
+    """
+    flush = []
+    invalidate = []
+    for kind in TENSOR_KINDS:
+        for idx, t in enumerate(model[f"{kind}s"]):
+            entry = (t["region"], t["offset"], t["size"], f"{kind.upper()}{idx}")
+            if kind in ("input", "variable"):
+                flush.append(entry)
+            if kind in ("output", "variable"):
+                invalidate.append(entry)
+    for name, key in (("SCRATCH", "scratch"), ("SCRATCH_FAST", "scratch_fast")):
+        if model[f"{key}_region"] is not None and model[f"{key}_size"] > 0:
+            invalidate.append((model[f"{key}_region"], 0, model[f"{key}_size"], name))
+    return flush, invalidate
+
+
+def merge_ranges(ranges):
+    """Merge overlapping or adjacent (region, offset, size, label) ranges per region."""
+    merged = []
+    for region, offset, size, label in sorted(r for r in ranges if r[2] > 0):
+        if merged and merged[-1][0] == region and offset <= merged[-1][1] + merged[-1][2]:
+            last_region, last_offset, last_size, last_label = merged[-1]
+            end = max(last_offset + last_size, offset + size)
+            merged[-1] = (region, last_offset, end - last_offset, f"{last_label}, {label}")
+        else:
+            merged.append((region, offset, size, label))
+    return merged
+
+
+def cache_masks(model):
+    """Return (flush_mask, invalidate_mask): one bit per base-pointer region."""
+    flush, invalidate = cache_ranges(model)
+    flush_mask = 0
+    for region, _, size, _ in flush:
+        flush_mask |= (1 << region) if size else 0
+    invalidate_mask = 0
+    for region, _, size, _ in invalidate:
+        invalidate_mask |= (1 << region) if size else 0
+    return flush_mask, invalidate_mask
+
+
+# Vela memory types an AXI port can be connected to, and the linker MEMORY
+# region each one is placed in unless overridden.
+VELA_MEM_TYPES = ("Sram", "Dram", "OffChipFlash")
+DEFAULT_MEMORIES = {"Sram": "SRAM", "Dram": "PSRAM", "OffChipFlash": "MRAM"}
+# Memories that hold their contents from boot; weights elsewhere need a copy at startup.
+NONVOLATILE_MEMORIES = ("MRAM", "FLASH")
+# Which Memory_Mode area each kind of region is allocated from.
+PLACEMENT_ROLES = {"weights": "const_mem_area", "scratch": "arena_mem_area", "scratch_fast": "cache_mem_area"}
+
+
+def load_vela_ini(ini_path):
+    """Parse a Vela .ini configuration file."""
+    cfg = configparser.ConfigParser(inline_comment_prefixes=(";",), interpolation=None)
+    if not cfg.read(ini_path):
+        raise SystemExit(f"Cannot read Vela config: {ini_path}")
+    return cfg
+
+
+def vela_ini_section(cfg, name):
+    """Flatten a Vela ini section, following its inherit= chain."""
+    if not cfg.has_section(name):
+        raise SystemExit(f"[{name}] not found in Vela config")
+    values = {}
+    parent = cfg[name].get("inherit")
+    if parent:
+        values.update(vela_ini_section(cfg, parent.strip()))
+    values.update({k: v for k, v in cfg[name].items() if k != "inherit"})
+    return values
+
+
+def vela_memory_areas(ini_path, system_config, memory_mode):
+    """
+    Resolve a System_Config/Memory_Mode pair from a Vela ini file to the
+    memory type backing each role, e.g. {"weights": "Dram", "scratch": "Sram",
+    "scratch_fast": "Sram"}. Missing keys take Vela's defaults.
+    """
+    cfg = load_vela_ini(ini_path)
+    system = vela_ini_section(cfg, f"System_Config.{system_config}")
+    mode = vela_ini_section(cfg, f"Memory_Mode.{memory_mode}")
+    ports = {"Axi0": system.get("axi0_port", "Sram"), "Axi1": system.get("axi1_port", "OffChipFlash")}
+    defaults = {"const_mem_area": "Axi1", "arena_mem_area": "Axi0", "cache_mem_area": "Axi0"}
+    return {role: ports[mode.get(key, defaults[key])] for role, key in PLACEMENT_ROLES.items()}
 
-    # ---- Write headers/sources ----
-    npz_name = os.path.basename(args.npz)
 
-    # 1) Command stream (driver payload) header
-    h_cmd = os.path.join(args.out_dir, f"{args.prefix}_cmd_data.h")
+def default_memory(mem_type, system_config=None):
+    """
+    Linker memory for a Vela memory type. Dram takes its name from the
+    System_Config suffix when there is one (AmbiqLP_HBLRAM -> HBLRAM,
+    AmbiqLP_SRAM -> SRAM, since that config models SRAM as slow "Dram").
+    """
+    if mem_type == "Dram" and system_config:
+        for name in ("HBLRAM", "PSRAM", "SRAM"):
+            if system_config.upper().endswith(f"_{name}"):
+                return name
+    return DEFAULT_MEMORIES[mem_type]
+
+
+def region_role(model, r):
+    """The Memory_Mode role ("weights", "scratch" or "scratch_fast") of a region."""
+    if r == model["weight_region"]:
+        return "weights"
+    if r == model["scratch_fast_region"] and model["scratch_fast_size"] > 0 and r != model["scratch_region"]:
+        return "scratch_fast"
+    return "scratch"
+
+
+def resolve_placement(model, region_caps, areas=None, overrides=None, system_config=None):
+    """
+    Map each allocated region (and the weights region) to a linker memory.
+
+    areas is the output of vela_memory_areas() or None. overrides maps a role
+    ("weights"/"scratch"/"scratch_fast"), a Vela memory type ("Dram"...) or a
+    region index to a memory name; region indices win over roles, roles over
+    memory types. Regions with no resolvable memory are left unplaced.
+    """
+    overrides = overrides or {}
+    type_memory = {t: overrides.get(t, default_memory(t, system_config)) for t in VELA_MEM_TYPES}
+    role_memory = {role: type_memory[areas[role]] for role in PLACEMENT_ROLES} if areas else {}
+    role_memory.update({k: v for k, v in overrides.items() if k in PLACEMENT_ROLES})
+
+    placement = {}
+    regions = [r for r, cap in region_caps.items() if cap > 0] + [model["weight_region"]]
+    for r in sorted(regions):
+        memory = overrides.get(str(r), role_memory.get(region_role(model, r)))
+        if memory:
+            placement[r] = memory
+    return placement
+
+
+def placement_section(prefix, memory, const=False):
+    """Input/output section name for a prefix's buffers (or weights) in one memory."""
+    return f".{prefix}_{memory.lower()}_{'rodata' if const else 'bss'}"
+
+
+def buffer_attrs(prefix, placement, r, const=False):
+    """__attribute__ list for a region buffer or the weights array."""
+    if placement and r in placement:
+        return f'aligned(32), section("{placement_section(prefix, placement[r], const)}")'
+    return "aligned(32)"
+
+
+def write_cmd_header(out_dir, prefix, model):
+    """Command stream (driver payload) header."""
+    h_cmd = os.path.join(out_dir, f"{prefix}_cmd_data.h")
     with open(h_cmd, "w") as f:
-        f.write(HEADER.format(npz_name=npz_name))
+        f.write(HEADER.format(npz_name=model["npz_name"]))
         f.write(f"#pragma once\n#include <stdint.h>\n#include <stddef.h>\n\n")
-        f.write(f"static const uint8_t {args.prefix}_cmd_data[] = {{\n{to_c_hex(cmd_data)}\n}};\n")
-        f.write(f"static const size_t  {args.prefix}_cmd_size = sizeof({args.prefix}_cmd_data);\n")
+        f.write(f"static const uint8_t {prefix}_cmd_data[] = {{\n{to_c_hex(model['cmd_data'])}\n}};\n")
+        f.write(f"static const size_t  {prefix}_cmd_size = sizeof({prefix}_cmd_data);\n")
+    return h_cmd
 
-    # 2) Weights header
-    h_weights = os.path.join(args.out_dir, f"{args.prefix}_weights.h")
+
+def write_weights_header(out_dir, prefix, model, placement=None):
+    """Weights header."""
+    h_weights = os.path.join(out_dir, f"{prefix}_weights.h")
     with open(h_weights, "w") as f:
-        f.write(HEADER.format(npz_name=npz_name))
+        f.write(HEADER.format(npz_name=model["npz_name"]))
         f.write(f"#pragma once\n#include <stdint.h>\n#include <stddef.h>\n\n")
-        f.write(f"// Weight region index chosen by Vela:\n#define {args.prefix.upper()}_WEIGHT_REGION {weight_region}\n\n")
-        f.write(f"__attribute__((aligned(32)))\nstatic const uint8_t {args.prefix}_weights[] = {{\n{to_c_hex(weight_data)}\n}};\n")
-        f.write(f"static const size_t  {args.prefix}_weights_size = sizeof({args.prefix}_weights);\n")
+        f.write(f"// Weight region index chosen by Vela:\n#define {prefix.upper()}_WEIGHT_REGION {model['weight_region']}\n\n")
+        attrs = buffer_attrs(prefix, placement, model["weight_region"], const=True)
+        f.write(f"__attribute__(({attrs}))\nstatic const uint8_t {prefix}_weights[] = {{\n{to_c_hex(model['weight_blob'])}\n}};\n")
+        f.write(f"static const size_t  {prefix}_weights_size = sizeof({prefix}_weights);\n")
+    return h_weights
+
 
-    # 3) Metadata header (offsets/sizes per tensor)
-    h_meta = os.path.join(args.out_dir, f"{args.prefix}_meta.h")
+def write_meta_header(out_dir, prefix, model):
+    """Metadata header (offsets/sizes per tensor)."""
+    h_meta = os.path.join(out_dir, f"{prefix}_meta.h")
     with open(h_meta, "w") as f:
-        f.write(HEADER.format(npz_name=npz_name))
+        f.write(HEADER.format(npz_name=model["npz_name"]))
         f.write("#pragma once\n#include <stddef.h>\n#include <stdint.h>\n\n")
         f.write("// Base-pointer array length for Ethos-U\n#define ETHOSU_MAX_REGIONS 8\n\n")
 
         # Input/output/variable macros
         f.write(f"// ---- Inputs ----\n")
-        for i, (sh, es, reg, off) in enumerate(zip(input_shape, input_elem_size, input_region, input_offset)):
-            sz = prod(sh) * es
-            f.write(f"#define {args.prefix.upper()}_INPUT{ i }_REGION  {reg}\n")
-            f.write(f"#define {args.prefix.upper()}_INPUT{ i }_OFFSET  {off}\n")
-            f.write(f"#define {args.prefix.upper()}_INPUT{ i }_SIZE    {sz}\n")
+        for i, t in enumerate(model["inputs"]):
+            f.write(f"#define {prefix.upper()}_INPUT{ i }_REGION  {t['region']}\n")
+            f.write(f"#define {prefix.upper()}_INPUT{ i }_OFFSET  {t['offset']}\n")
+            f.write(f"#define {prefix.upper()}_INPUT{ i }_SIZE    {t['size']}\n")
         f.write(f"\n// ---- Outputs ----\n")
-        for i, (sh, es, reg, off) in enumerate(zip(output_shape, output_elem_size, output_region, output_offset)):
-            sz = prod(sh) * es
-            f.write(f"#define {args.prefix.upper()}_OUTPUT{ i }_REGION {reg}\n")
-            f.write(f"#define {args.prefix.upper()}_OUTPUT{ i }_OFFSET {off}\n")
-            f.write(f"#define {args.prefix.upper()}_OUTPUT{ i }_SIZE   {sz}\n")
+        for i, t in enumerate(model["outputs"]):
+            f.write(f"#define {prefix.upper()}_OUTPUT{ i }_REGION {t['region']}\n")
+            f.write(f"#define {prefix.upper()}_OUTPUT{ i }_OFFSET {t['offset']}\n")
+            f.write(f"#define {prefix.upper()}_OUTPUT{ i }_SIZE   {t['size']}\n")
         f.write(f"\n// ---- Variables ----\n")
-        for i, (sh, es, reg, off) in enumerate(zip(variable_shape, variable_elem_size, variable_region, variable_offset)):
-            sz = prod(sh) * es
-            f.write(f"#define {args.prefix.upper()}_VARIABLE{ i }_REGION {reg}\n")
-            f.write(f"#define {args.prefix.upper()}_VARIABLE{ i }_OFFSET {off}\n")
-            f.write(f"#define {args.prefix.upper()}_VARIABLE{ i }_SIZE   {sz}\n")
-
-        if scratch_region is not None:
-            f.write(f"\n#define {args.prefix.upper()}_SCRATCH_REGION {scratch_region}\n")
-            f.write(f"#define {args.prefix.upper()}_SCRATCH_SIZE   {scratch_size}\n")
-        if scratch_fast_region is not None:
-            f.write(f"#define {args.prefix.upper()}_SCRATCH_FAST_REGION {scratch_fast_region}\n")
-            f.write(f"#define {args.prefix.upper()}_SCRATCH_FAST_SIZE   {scratch_fast_size}\n")
-
-    # 4) Region buffers (excluding weights)
-    h_buf = os.path.join(args.out_dir, f"{args.prefix}_buffers.h")
-    c_buf = os.path.join(args.out_dir, f"{args.prefix}_buffers.c")
+        for i, t in enumerate(model["variables"]):
+            f.write(f"#define {prefix.upper()}_VARIABLE{ i }_REGION {t['region']}\n")
+            f.write(f"#define {prefix.upper()}_VARIABLE{ i }_OFFSET {t['offset']}\n")
+            f.write(f"#define {prefix.upper()}_VARIABLE{ i }_SIZE   {t['size']}\n")
+
+        if model["scratch_region"] is not None:
+            f.write(f"\n#define {prefix.upper()}_SCRATCH_REGION {model['scratch_region']}\n")
+            f.write(f"#define {prefix.upper()}_SCRATCH_SIZE   {model['scratch_size']}\n")
+        if model["scratch_fast_region"] is not None:
+            f.write(f"#define {prefix.upper()}_SCRATCH_FAST_REGION {model['scratch_fast_region']}\n")
+            f.write(f"#define {prefix.upper()}_SCRATCH_FAST_SIZE   {model['scratch_fast_size']}\n")
+
+        flush_mask, invalidate_mask = cache_masks(model)
+        f.write("\n// ---- D-cache maintenance (bit n = base-pointer region n) ----\n")
+        f.write("// Clean before invoke: regions the CPU writes (inputs, variables)\n")
+        f.write(f"#define {prefix.upper()}_CACHE_FLUSH_MASK      0x{flush_mask:02X}u\n")
+        f.write("// Invalidate after invoke: regions the NPU writes (outputs, variables, scratch)\n")
+        f.write(f"#define {prefix.upper()}_CACHE_INVALIDATE_MASK 0x{invalidate_mask:02X}u\n")
+    return h_meta
+
+
+def ring_regions(model, region_sources):
+    """Regions holding an input or output; these are replicated per I/O buffer slot."""
+    return sorted({
+        r for r, sources in region_sources.items()
+        if r != model["weight_region"] and any(name in ("INPUT", "OUTPUT") for name, _, _, _ in sources)
+    })
+
+
+def write_buffers(out_dir, prefix, model, region_caps, region_sources=None, io_buffers=1, placement=None,
+                  num_npus=1, cache_line=0):
+    """
+    Region buffers (excluding weights) and their accessors.
+
+    With io_buffers > 1, regions holding inputs/outputs get io_buffers copies
+    (slot 0 is what get_region_base_ptr() returns); all other regions and the
+    weights stay shared. With num_npus > 1, every region except the weights
+    gets one copy per NPU instead. placement (see resolve_placement()) puts
+    each region buffer in a per-memory section. With cache_line > 0 every
+    buffer (and every copy) is padded to whole cache lines, so the cache
+    maintenance hooks never clean or invalidate a line shared with other data.
+    """
+    weight_region = model["weight_region"]
+    ring = ring_regions(model, region_sources) if io_buffers > 1 else []
+    copies = io_buffers
+    if num_npus > 1:
+        ring = [r for r, cap in region_caps.items() if cap > 0]
+        copies = num_npus
+    h_buf = os.path.join(out_dir, f"{prefix}_buffers.h")
+    c_buf = os.path.join(out_dir, f"{prefix}_buffers.c")
 
     with open(h_buf, "w") as f:
-        f.write(HEADER.format(npz_name=npz_name))
+        f.write(HEADER.format(npz_name=model["npz_name"]))
         f.write("#pragma once\n#include <stddef.h>\n#include <stdint.h>\n\n")
         f.write("extern uint8_t* get_region_base_ptr(int region);\n")
         f.write("extern size_t   get_region_size(int region);\n")
+        if ring:
+            kind = "one per NPU" if num_npus > 1 else "I/O buffer slots"
+            f.write(f"\n// Regions {', '.join(map(str, ring))} have {copies} copies ({kind}); other regions are shared.\n")
+            f.write("extern uint8_t* get_region_slot_base_ptr(int region, int slot);\n")
 
     with open(c_buf, "w") as f:
-        f.write(HEADER.format(npz_name=npz_name))
+        f.write(HEADER.format(npz_name=model["npz_name"]))
         f.write('#include <stddef.h>\n#include <stdint.h>\n')
-        f.write(f'#include "{args.prefix}_weights.h"\n')
-        f.write(f'#include "{args.prefix}_meta.h"\n\n')
+        f.write(f'#include "{prefix}_weights.h"\n')
+        f.write(f'#include "{prefix}_meta.h"\n\n')
 
         # Emit arrays for used regions
         used_regions = [r for r, cap in region_caps.items() if cap > 0]
         for r in used_regions:
-            f.write(f'__attribute__((aligned(32))) static uint8_t {args.prefix}_region_{r}[{region_caps[r]}] = {{0}};\n')
+            attrs = buffer_attrs(prefix, placement, r)
+            size = -(-region_caps[r] // cache_line) * cache_line if cache_line else region_caps[r]
+            if r in ring:
+                f.write(f'__attribute__(({attrs})) static uint8_t {prefix}_region_{r}[{copies}][{size}] = {{{{0}}}};\n')
+            else:
+                f.write(f'__attribute__(({attrs})) static uint8_t {prefix}_region_{r}[{size}] = {{0}};\n')
         f.write("\n")
 
         # Accessors
         f.write("uint8_t* get_region_base_ptr(int region) {\n")
         f.write("    switch(region) {\n")
         for r in used_regions:
-            f.write(f"    case {r}: return {args.prefix}_region_{r};\n")
-        f.write(f"    case {weight_region}: return (uint8_t*){args.prefix}_weights; // weights region\n")
+            f.write(f"    case {r}: return {prefix}_region_{r}{'[0]' if r in ring else ''};\n")
+        f.write(f"    case {weight_region}: return (uint8_t*){prefix}_weights; // weights region\n")
         f.write("    default: return (uint8_t*)0; // unused region\n")
         f.write("    }\n}\n\n")
 
         f.write("size_t get_region_size(int region) {\n")
         f.write("    switch(region) {\n")
         for r in used_regions:
-            f.write(f"    case {r}: return sizeof({args.prefix}_region_{r});\n")
-        f.write(f"    case {weight_region}: return {args.prefix}_weights_size;\n")
+            f.write(f"    case {r}: return sizeof({prefix}_region_{r}{'[0]' if r in ring else ''});\n")
+        f.write(f"    case {weight_region}: return {prefix}_weights_size;\n")
         f.write("    default: return 0;\n")
         f.write("    }\n}\n")
 
-    # 5) Minimal runner (shows how to invoke the stream)
-    c_run = os.path.join(args.out_dir, f"{args.prefix}_run.c")
-    with open(c_run, "w") as f:
-        f.write(HEADER.format(npz_name=npz_name))
-        f.write(textwrap.dedent(f"""\
-            #include <stdint.h>
+        if ring:
+            f.write("\nuint8_t* get_region_slot_base_ptr(int region, int slot) {\n")
+            f.write("    switch(region) {\n")
+            for r in ring:
+                f.write(f"    case {r}: return {prefix}_region_{r}[slot];\n")
+            f.write("    default: return get_region_base_ptr(region); // shared region\n")
+            f.write("    }\n}\n")
+    return h_buf, c_buf
+
+
+def write_placement_ld(out_dir, prefix, model, region_sources, placement, description="", load_memory="MRAM",
+                       stage_memory=None):
+    """
+    Linker-script fragment placing the sections named by buffer_attrs().
+
+    Region buffers (and the staged weight copy, if any) go in NOLOAD sections;
+    weights in a volatile memory get a load address in load_memory plus
+    start/end/load symbols for the startup copy.
+    """
+    ld_path = os.path.join(out_dir, f"{prefix}_placement.ld")
+    weight_region = model["weight_region"]
+    buffer_memories = {m for r, m in placement.items() if r != weight_region}
+    if stage_memory:
+        buffer_memories.add(stage_memory)
+    buffer_memories = sorted(buffer_memories)
+
+    with open(ld_path, "w") as f:
+        f.write(HEADER.format(npz_name=model["npz_name"]))
+        f.write("/*\n")
+        f.write(f" * Region placement{f' ({description})' if description else ''}:\n")
+        for r, memory in sorted(placement.items()):
+            f.write(f" *   region {r} ({region_comment(model, region_sources, r)}) -> {memory}\n")
+        if stage_memory:
+            f.write(f" *   region {weight_region} staged copy ({prefix}_weights_staged) -> {stage_memory}\n")
+        f.write(" *\n")
+        f.write(" * INCLUDE this file inside the SECTIONS { } block of the application linker\n")
+        f.write(" * script, ahead of the generic .bss/.data rules. Memory names must match its\n")
+        f.write(" * MEMORY { } regions. NOLOAD buffers are not zeroed by the C runtime; clear\n")
+        f.write(" * __<section>_start__.._end__ at startup if the model has variables.\n")
+        f.write(" */\n")
+
+        if weight_region in placement:
+            memory = placement[weight_region]
+            sec = placement_section(prefix, memory, const=True)
+            f.write(f"\n{sec} : ALIGN(32)\n{{\n")
+            f.write(f"    __{sec[1:]}_start__ = .;\n")
+            f.write(f"    KEEP(*({sec}))\n")
+            f.write(f"    __{sec[1:]}_end__ = .;\n")
+            if memory.upper() in NONVOLATILE_MEMORIES:
+                f.write(f"}} > {memory}\n")
+            else:
+                f.write(f"}} > {memory} AT> {load_memory}\n")
+                f.write(f"/* Weights run from {memory}: copy them from the load address before the first invoke */\n")
+                f.write(f"__{sec[1:]}_load__ = LOADADDR({sec});\n")
+
+        for memory in buffer_memories:
+            sec = placement_section(prefix, memory)
+            f.write(f"\n{sec} (NOLOAD) : ALIGN(32)\n{{\n")
+            f.write(f"    __{sec[1:]}_start__ = .;\n")
+            f.write(f"    *({sec})\n")
+            f.write(f"    __{sec[1:]}_end__ = .;\n")
+            f.write(f"}} > {memory}\n")
+    return ld_path
+
+
+ASYNC_API_DECLS = """
+// ---- Asynchronous API ----
+
+// Completion callback, called from {prefix}_poll()/{prefix}_wait() (thread context)
+// with the inference status (0 on success, negative on error).
+typedef void (*{prefix}_done_fn)(int status, void *user_arg);
+
+// Start an inference and return immediately. Finish it with {prefix}_poll() or {prefix}_wait().
+int  {prefix}_invoke_async({prefix}_done_fn done, void *user_arg);
+
+// Non-blocking completion check: returns 1 while the NPU is running, else the inference status.
+int  {prefix}_poll(void);
+
+// Block until the running inference completes. Returns the inference status.
+int  {prefix}_wait(void);
+
+// Called from {prefix}_irq_handler() in interrupt context when the NPU finishes.
+// Weak no-op by default; override it to give an RTOS semaphore (or set a flag)
+// that wakes the task which then calls {prefix}_wait().
+void {prefix}_npu_done_isr(void);
+"""
+
+ASYNC_API_SOURCE = """
+// ---- Asynchronous API ----
+
+static {prefix}_done_fn {prefix}_done = 0;
+static void *{prefix}_done_arg = 0;
+
+__attribute__((weak)) void {prefix}_npu_done_isr(void) {{
+}}
+
+int {prefix}_invoke_async({prefix}_done_fn done, void *user_arg) {{
+    if (!{prefix}_drv) {{
+        int rc = {prefix}_init();
+        if (rc) return rc;
+    }}
+    {prefix}_done = done;
+    {prefix}_done_arg = user_arg;
+    int rc = ethosu_invoke_async({prefix}_drv,
+                                 {prefix}_cmd_data, (int){prefix}_cmd_size,
+                                 {prefix}_base_addr, {prefix}_base_size, ETHOSU_MAX_REGIONS,
+                                 /*user_arg*/0);
+    if (rc) {prefix}_done = 0;
+    return rc;
+}}
+
+static int {prefix}_finish(int rc) {{
+    {prefix}_done_fn done = {prefix}_done;
+    {prefix}_done = 0;
+    if (done) done(rc, {prefix}_done_arg);
+    return rc;
+}}
+
+int {prefix}_poll(void) {{
+    if (!{prefix}_drv) return -2;
+    int rc = ethosu_wait({prefix}_drv, false);
+    if (rc == 1) return 1; // Still running
+    return {prefix}_finish(rc);
+}}
+
+int {prefix}_wait(void) {{
+    if (!{prefix}_drv) return -2;
+    return {prefix}_finish(ethosu_wait({prefix}_drv, true));
+}}
+"""
+
+
+# Vela's raw output only records element sizes, so I/O pointers use the signed type of that width
+ELEM_C_TYPES = {1: "int8_t", 2: "int16_t", 4: "int32_t", 8: "int64_t"}
+
+
+def io_tensors(model, region_sources):
+    """
+    Yield (name, index, tensor, c_type, bindable) for every input and output.
+    A tensor is bindable when Vela placed it alone in its region, so the
+    region base pointer can be redirected to a caller-owned buffer.
+    """
+    for kind in ("input", "output"):
+        for idx, t in enumerate(model[f"{kind}s"]):
+            bindable = t["region"] != model["weight_region"] and len(region_sources[t["region"]]) == 1
+            yield kind, idx, t, ELEM_C_TYPES.get(t["elem_size"], "uint8_t"), bindable
+
+
+def io_api_decls(prefix, model, region_sources, bind_io):
+    """Declarations of the typed I/O accessors (and bind functions) for <prefix>_run.h."""
+    lines = ["", "// ---- Tensor accessors (typed pointers straight into the NPU tensors) ----", ""]
+    for kind, idx, t, c_type, _ in io_tensors(model, region_sources):
+        lines.append(f"{c_type} *{prefix}_{kind}{idx}(void); // {prefix.upper()}_{kind.upper()}{idx}_SIZE bytes")
+
+    bindable = [(kind, idx, t, c_type) for kind, idx, t, c_type, ok in io_tensors(model, region_sources) if ok]
+    if bind_io:
+        lines += [
+            "",
+            "// ---- Zero-copy I/O binding ----",
+            "// These tensors are alone in their region, so a caller-owned buffer (16-byte aligned)",
+            "// can be used directly as the region base pointer, e.g. a sensor DMA target.",
+            "// Takes effect from the next invoke; pass NULL to restore the generated buffer.",
+            "",
+        ]
+        for kind, idx, t, c_type in bindable:
+            lines.append(f"int  {prefix}_bind_{kind}{idx}({c_type} *buf); // region {t['region']}")
+        if not bindable:
+            lines.append(f"// (Vela shares every input/output region with other tensors; nothing can be bound.)")
+    return "\n".join(lines) + "\n"
+
+
+def io_api_source(prefix, model, region_sources, bind_io, region_fn="get_region_base_ptr"):
+    """Definitions of the typed I/O accessors (and bind functions) for <prefix>_run.c."""
+    out = [textwrap.dedent(f"""
+        // ---- Tensor accessors ----
+
+        static uint64_t {prefix}_region_base(int region) {{
+            if ({prefix}_base_addr[region]) return {prefix}_base_addr[region];
+            return (uint64_t)(uintptr_t){region_fn}(region);
+        }}
+        """)]
+    for kind, idx, t, c_type, _ in io_tensors(model, region_sources):
+        macro = f"{prefix.upper()}_{kind.upper()}{idx}"
+        out.append(textwrap.dedent(f"""
+            {c_type} *{prefix}_{kind}{idx}(void) {{
+                return ({c_type} *)(uintptr_t)({prefix}_region_base({macro}_REGION) + {macro}_OFFSET);
+            }}
+            """))
+
+    if bind_io:
+        for kind, idx, t, c_type, ok in io_tensors(model, region_sources):
+            if not ok:
+                continue
+            macro = f"{prefix.upper()}_{kind.upper()}{idx}"
+            out.append(textwrap.dedent(f"""
+                int {prefix}_bind_{kind}{idx}({c_type} *buf) {{
+                    uint64_t base = buf ? (uint64_t)(uintptr_t)buf - {macro}_OFFSET
+                                        : (uint64_t)(uintptr_t){region_fn}({macro}_REGION);
+                    if (base & 0xF) return -1; // The driver requires 16-byte aligned base pointers
+                    {prefix}_base_addr[{macro}_REGION] = base;
+                    return 0;
+                }}
+                """))
+    return "".join(out)
+
+
+RING_API_DECLS = """
+// ---- Pipelined I/O buffer ring ----
+// Regions holding inputs/outputs have {prefix_upper}_IO_BUFFERS copies, so the CPU can fill
+// the next frame and read the previous result while the NPU runs the current one:
+//
+//   <fill inputs of slot {prefix}_ring_slot()>
+//   {prefix}_ring_start();
+//   for (;;) {{
+//       <fill inputs of slot {prefix}_ring_slot()>  (overlaps with the NPU)
+//       int done;
+//       {prefix}_ring_wait(&done);
+//       {prefix}_ring_start();  (the NPU runs the slot just filled)
+//       <read outputs of slot done>  (overlaps with the NPU)
+//   }}
+#define {prefix_upper}_IO_BUFFERS {io_buffers}
+
+// Slot the next {prefix}_ring_start() will run (the one to fill).
+int  {prefix}_ring_slot(void);
+
+// Start the NPU on that slot and advance to the next one; returns immediately.
+int  {prefix}_ring_start(void);
+
+// Wait for the running slot to complete and store its index in *slot. Returns the inference status.
+int  {prefix}_ring_wait(int *slot);
+
+{accessors}
+"""
+
+RING_API_SOURCE = """
+// ---- Pipelined I/O buffer ring ----
+
+// One base-pointer table per slot: I/O regions point at that slot's copy, the
+// weights and all other regions are shared.
+static uint64_t {prefix}_ring_base_addr[{prefix_upper}_IO_BUFFERS][ETHOSU_MAX_REGIONS];
+static int {prefix}_ring_ready = 0;
+static int {prefix}_ring_next = 0;
+static int {prefix}_ring_running = -1;
+
+int {prefix}_ring_slot(void) {{
+    return {prefix}_ring_next;
+}}
+
+int {prefix}_ring_start(void) {{
+    if (!{prefix}_drv) {{
+        int rc = {prefix}_init();
+        if (rc) return rc;
+    }}
+    if ({prefix}_ring_running >= 0) return -1; // Previous slot not waited for
+    if (!{prefix}_ring_ready) {{
+        for (int s = 0; s < {prefix_upper}_IO_BUFFERS; ++s) {{
+            for (int r = 0; r < ETHOSU_MAX_REGIONS; ++r) {{
+                {prefix}_ring_base_addr[s][r] = (uint64_t)(uintptr_t)get_region_slot_base_ptr(r, s);
+            }}
+        }}
+        {prefix}_ring_ready = 1;
+    }}
+
+    int rc = ethosu_invoke_async({prefix}_drv,
+                                 {prefix}_cmd_data, (int){prefix}_cmd_size,
+                                 {prefix}_ring_base_addr[{prefix}_ring_next], {prefix}_base_size, ETHOSU_MAX_REGIONS,
+                                 /*user_arg*/0);
+    if (rc) return rc;
+    {prefix}_ring_running = {prefix}_ring_next;
+    {prefix}_ring_next = ({prefix}_ring_next + 1) % {prefix_upper}_IO_BUFFERS;
+    return 0;
+}}
+
+int {prefix}_ring_wait(int *slot) {{
+    if ({prefix}_ring_running < 0) return -2; // Nothing started
+    int rc = ethosu_wait({prefix}_drv, true);
+    if (slot) *slot = {prefix}_ring_running;
+    {prefix}_ring_running = -1;
+    return rc;
+}}
+"""
+
+
+def slot_accessor_decls(prefix, model, region_sources):
+    return "\n".join(
+        f"{c_type} *{prefix}_{kind}{idx}_slot(int slot);"
+        for kind, idx, _, c_type, _ in io_tensors(model, region_sources)
+    )
+
+
+def slot_accessor_source(prefix, model, region_sources):
+    out = []
+    for kind, idx, _, c_type, _ in io_tensors(model, region_sources):
+        macro = f"{prefix.upper()}_{kind.upper()}{idx}"
+        out.append(textwrap.dedent(f"""
+            {c_type} *{prefix}_{kind}{idx}_slot(int slot) {{
+                return ({c_type} *)(get_region_slot_base_ptr({macro}_REGION, slot) + {macro}_OFFSET);
+            }}
+            """))
+    return "".join(out)
+
+
+def ring_api_decls(prefix, model, region_sources, io_buffers):
+    return RING_API_DECLS.format(
+        prefix=prefix, prefix_upper=prefix.upper(), io_buffers=io_buffers,
+        accessors=slot_accessor_decls(prefix, model, region_sources)
+    )
+
+
+def ring_api_source(prefix, model, region_sources, stage_weights=False):
+    source = RING_API_SOURCE.format(prefix=prefix, prefix_upper=prefix.upper())
+    if stage_weights:
+        # get_region_slot_base_ptr() returns the unstaged weights; use the rebound entry instead
+        fill = "get_region_slot_base_ptr(r, s);\n            }\n"
+        source = source.replace(fill, fill + (
+            f"            {prefix}_ring_base_addr[s][{model['weight_region']}] = "
+            f"{prefix}_base_addr[{model['weight_region']}]; // staged weights\n"
+        ))
+    return source + slot_accessor_source(prefix, model, region_sources)
+
+
+QUANT_C_TYPES = {"int8": "int8_t", "uint8": "uint8_t", "int16": "int16_t"}
+
+
+def io_quantization(tflite_path, model, backend="auto"):
+    """
+    Per-tensor quantization of the model inputs/outputs, read from the .tflite
+    Vela compiled (the raw .npz only records element sizes).
+
+    Returns {(kind, idx): {"scale", "zero_point", "dtype"}} for every quantized
+    int8/uint8/int16 tensor; other tensors are skipped with a note.
+    """
+    interpreter = load_interpreter(tflite_path, backend)
+    details = {"input": interpreter.get_input_details(), "output": interpreter.get_output_details()}
+    quant = {}
+    for kind in ("input", "output"):
+        tensors = model[f"{kind}s"]
+        if len(details[kind]) != len(tensors):
+            raise SystemExit(f"{tflite_path} has {len(details[kind])} {kind}(s) but the .npz has {len(tensors)}")
+        for idx, (d, t) in enumerate(zip(details[kind], tensors)):
+            dtype = np.dtype(d["dtype"])
+            if int(np.prod(d["shape"])) * dtype.itemsize != t["size"]:
+                raise SystemExit(f"{tflite_path} {kind} {idx} ({list(d['shape'])} {dtype}) does not match "
+                                 f"the .npz tensor ({t['size']} bytes)")
+            params = d.get("quantization_parameters", {})
+            scales = np.atleast_1d(params.get("scales", d["quantization"][0]))
+            zero_points = np.atleast_1d(params.get("zero_points", d["quantization"][1]))
+            if dtype.name not in QUANT_C_TYPES or scales.size != 1 or not scales[0]:
+                print(f"Note: {kind} {idx} ({dtype}) is not per-tensor quantized; no helpers generated for it")
+                continue
+            quant[(kind, idx)] = {
+                "scale": float(scales[0]), "zero_point": int(zero_points[0]), "dtype": dtype.name,
+            }
+    return quant
+
+
+def q15_multiplier(scale):
+    """(multiplier, shift) with x * M >> shift ~= x / (32768 * scale), M a Q31 value in [2^30, 2^31)."""
+    mantissa, exponent = np.frexp(1.0 / (32768.0 * scale))
+    multiplier = int(round(float(mantissa) * (1 << 31)))
+    if multiplier == 1 << 31:
+        multiplier //= 2
+        exponent += 1
+    shift = 31 - int(exponent)
+    if shift > 62:
+        return 0, 1  # Every Q15 value quantizes to the zero point
+    if shift < 1:
+        raise SystemExit(f"Input scale {scale} is too small for Q15 quantization")
+    return multiplier, shift
+
+
+QUANT_API_PRELUDE = """
+// ---- Quantization helpers ----
+
+// CMSIS-DSP kernels are used when arm_math.h is found; define {prefix_upper}_USE_CMSIS_DSP=0 to opt out.
+#ifndef {prefix_upper}_USE_CMSIS_DSP
+#if defined(__has_include)
+#if __has_include("arm_math.h")
+#define {prefix_upper}_USE_CMSIS_DSP 1
+#endif
+#endif
+#endif
+#if defined({prefix_upper}_USE_CMSIS_DSP) && {prefix_upper}_USE_CMSIS_DSP
+#include "arm_math.h"
+#endif
+"""
+
+QUANTIZE_SOURCE = """
+void {name}_quantize({slot_param}const float *src) {{
+    {c_type} *dst = {tensor};
+    for (uint32_t i = 0; i < {macro}_COUNT; ++i) {{
+        float v = src[i] * {inv_scale}f;
+        if (v < {lo}.0f) v = {lo}.0f;
+        if (v > {hi}.0f) v = {hi}.0f;
+        dst[i] = ({c_type})((int32_t)(v + (v >= 0.0f ? 0.5f : -0.5f)) + ({zero_point}));
+    }}
+}}
+
+void {name}_quantize_q15({slot_param}const int16_t *src) {{
+    {c_type} *dst = {tensor};
+    for (uint32_t i = 0; i < {macro}_COUNT; ++i) {{
+        int32_t q = (int32_t)(((int64_t)src[i] * {multiplier} + {rounding}) >> {shift}) + ({zero_point});
+        dst[i] = ({c_type})(q < {qmin} ? {qmin} : (q > {qmax} ? {qmax} : q));
+    }}
+}}
+"""
+
+DEQUANTIZE_SOURCE = """
+void {name}_dequantize({slot_param}float *dst) {{
+    const {c_type} *src = {tensor};
+{cmsis_dequantize}    for (uint32_t i = 0; i < {macro}_COUNT; ++i) {{
+        dst[i] = (float)((int32_t)src[i] - ({zero_point})) * {scale}f;
+    }}
+{cmsis_end}}}
+
+int {name}_argmax({slot_arg_decl}) {{
+    const {c_type} *src = {tensor};
+{cmsis_argmax}    int best = 0;
+    for (uint32_t i = 1; i < {macro}_COUNT; ++i) {{
+        if (src[i] > src[best]) best = (int)i;
+    }}
+    return best;
+{cmsis_end}}}
+
+int {name}_topk({slot_param}int k, int *indices, float *scores) {{
+    const {c_type} *src = {tensor};
+    if (k > (int){macro}_COUNT) k = (int){macro}_COUNT;
+    int n = 0;
+    for (uint32_t i = 0; i < {macro}_COUNT; ++i) {{
+        // Insertion into the k best so far, kept in descending order
+        int pos = n < k ? n : k;
+        while (pos > 0 && src[i] > src[indices[pos - 1]]) --pos;
+        if (pos >= k) continue;
+        for (int j = (n < k ? n : k - 1); j > pos; --j) indices[j] = indices[j - 1];
+        indices[pos] = (int)i;
+        if (n < k) ++n;
+    }}
+    if (scores) {{
+        for (int j = 0; j < n; ++j) scores[j] = (float)((int32_t)src[indices[j]] - ({zero_point})) * {scale}f;
+    }}
+    return n;
+}}
+"""
+
+# CMSIS-DSP converts q7/q15 to float as q / 2^(bits-1), so the scale absorbs that factor
+CMSIS_TYPES = {"int8_t": ("q7", 128), "int16_t": ("q15", 32768)}
+
+
+def _quant_tensors(prefix, model, region_sources, quant, slotted):
+    """Yield (kind, name, macro, c_type, tensor expression, params) for every quantized tensor."""
+    for kind, idx, t, _, _ in io_tensors(model, region_sources):
+        q = quant.get((kind, idx))
+        if not q:
+            continue
+        c_type = QUANT_C_TYPES[q["dtype"]]
+        accessor = f"{prefix}_{kind}{idx}_slot(slot)" if slotted else f"{prefix}_{kind}{idx}()"
+        yield (kind, f"{prefix}_{kind}{idx}", f"{prefix.upper()}_{kind.upper()}{idx}", c_type,
+               f"({c_type} *){accessor}", q, t)
+
+
+def quant_api_decls(prefix, model, region_sources, quant, slotted=False):
+    """Declarations of the quantize/dequantize/argmax/top-k helpers for <prefix>_run.h."""
+    slot_param = "int slot, " if slotted else ""
+    lines = [
+        "", "// ---- Quantization helpers (scale and zero point from the .tflite) ----",
+        "// They read and write the NPU tensors in place, so no staging buffer or copy is needed.",
+    ]
+    if slotted:
+        lines.append("// Each helper works on the tensor of one slot (see the <tensor>_slot() accessors).")
+    for kind, name, macro, c_type, _, q, t in _quant_tensors(prefix, model, region_sources, quant, slotted):
+        lines += [
+            "",
+            f"#define {macro}_COUNT      {t['size'] // np.dtype(q['dtype']).itemsize}",
+            f"#define {macro}_SCALE      {q['scale']!r}f",
+            f"#define {macro}_ZERO_POINT {q['zero_point']}",
+        ]
+        if kind == "input":
+            lines += [
+                f"// Quantize {macro}_COUNT floats into the input tensor (rounded to nearest, saturated).",
+                f"void {name}_quantize({slot_param}const float *src);",
+                f"// Same from Q15 data (e.g. CMSIS-DSP features) with integer math only.",
+                f"void {name}_quantize_q15({slot_param}const int16_t *src);",
+            ]
+        else:
+            lines += [
+                f"// Dequantize the output tensor into {macro}_COUNT floats.",
+                f"void {name}_dequantize({slot_param}float *dst);",
+                f"// Index of the largest element, computed on the quantized values.",
+                f"int  {name}_argmax({'int slot' if slotted else 'void'});",
+                f"// The k largest elements in descending order; scores (dequantized) may be NULL.",
+                f"// Returns the number of entries written (min(k, {macro}_COUNT)).",
+                f"int  {name}_topk({slot_param}int k, int *indices, float *scores);",
+            ]
+    return "\n".join(lines) + "\n"
+
+
+def quant_api_source(prefix, model, region_sources, quant, slotted=False):
+    """Definitions of the quantization helpers for <prefix>_run.c."""
+    prefix_upper = prefix.upper()
+    out = [QUANT_API_PRELUDE.format(prefix_upper=prefix_upper)]
+    slot_param = "int slot, " if slotted else ""
+    for kind, name, macro, c_type, tensor, q, _ in _quant_tensors(prefix, model, region_sources, quant, slotted):
+        info = np.iinfo(q["dtype"])
+        params = dict(name=name, macro=macro, c_type=c_type, tensor=tensor, slot_param=slot_param,
+                      zero_point=q["zero_point"], scale=repr(q["scale"]))
+        if kind == "input":
+            multiplier, shift = q15_multiplier(q["scale"])
+            out.append(QUANTIZE_SOURCE.format(
+                **params, inv_scale=repr(float(np.float32(1.0 / q["scale"]))),
+                lo=int(info.min) - q["zero_point"], hi=int(info.max) - q["zero_point"],
+                qmin=int(info.min), qmax=int(info.max),
+                multiplier=f"{multiplier}LL", rounding=f"{1 << (shift - 1)}LL", shift=shift,
+            ))
+            continue
+
+        cmsis_dequantize = cmsis_argmax = cmsis_end = ""
+        if c_type in CMSIS_TYPES:
+            q_type, unit = CMSIS_TYPES[c_type]
+            cmsis_dequantize = (
+                f"#if defined({prefix_upper}_USE_CMSIS_DSP) && {prefix_upper}_USE_CMSIS_DSP\n"
+                f"    arm_{q_type}_to_float((const {q_type}_t *)src, dst, {macro}_COUNT);\n"
+                f"    arm_scale_f32(dst, {q['scale'] * unit!r}f, dst, {macro}_COUNT);\n"
+                f"    arm_offset_f32(dst, {-q['zero_point'] * q['scale']!r}f, dst, {macro}_COUNT);\n"
+                f"#else\n"
+            )
+            cmsis_argmax = (
+                f"#if defined({prefix_upper}_USE_CMSIS_DSP) && {prefix_upper}_USE_CMSIS_DSP\n"
+                f"    {q_type}_t max_value;\n"
+                f"    uint32_t best;\n"
+                f"    arm_max_{q_type}((const {q_type}_t *)src, {macro}_COUNT, &max_value, &best);\n"
+                f"    return (int)best;\n"
+                f"#else\n"
+            )
+            cmsis_end = "#endif\n"
+        out.append(DEQUANTIZE_SOURCE.format(
+            **params, slot_arg_decl="int slot" if slotted else "void",
+            cmsis_dequantize=cmsis_dequantize, cmsis_argmax=cmsis_argmax, cmsis_end=cmsis_end,
+        ))
+    return "".join(out)
+
+
+MULTI_NPU_DECLS = """
+// ---- Multi-NPU dispatcher ----
+// {prefix}_init() initializes {prefix_upper}_NUM_NPUS NPU drivers once (register bases from
+// ethosu_get_regs_base_n()). Each NPU has its own copy of every region except the
+// weights (its slot), so independent inferences (e.g. one per audio channel) run in
+// parallel, each on the next free NPU:
+//
+//   int slot = {prefix}_npu_acquire();  (blocks until an NPU is free)
+//   <fill inputs via {prefix}_input<i>_slot(slot)>
+//   {prefix}_npu_start(slot);           (returns immediately)
+//   {prefix}_npu_wait(slot);
+//   <read outputs via {prefix}_output<i>_slot(slot)>
+//   {prefix}_npu_release(slot);
+//
+// {prefix}_input<i>()/{prefix}_output<i>() are the slot 0 tensors.
+#define {prefix_upper}_NUM_NPUS {num_npus}
+
+// Initialize all NPU drivers and bind the per-slot region tables. Call once at startup.
+int  {prefix}_init(void);
+
+// Deinitialize the NPU drivers. No slot may be acquired.
+void {prefix}_deinit(void);
+
+// Reserve the next free NPU (the driver's reserve pool); returns its slot, or negative on error.
+int  {prefix}_npu_acquire(void);
+
+// Start an inference on an acquired slot and return immediately.
+int  {prefix}_npu_start(int slot);
+
+// Non-blocking completion check: returns 1 while the NPU is running, else the inference status.
+int  {prefix}_npu_poll(int slot);
+
+// Block until the slot's inference completes. Returns the inference status.
+int  {prefix}_npu_wait(int slot);
+
+// Run one inference on an acquired slot ({prefix}_npu_start() + {prefix}_npu_wait()).
+int  {prefix}_invoke_slot(int slot);
+
+// Return the slot's NPU to the pool once its outputs have been read.
+void {prefix}_npu_release(int slot);
+
+// Route NPU <npu>'s interrupt here from your platform's IRQ vector.
+void {prefix}_irq_handler(int npu);
+
+{accessors}
+"""
+
+MULTI_NPU_SOURCE = """
+static struct ethosu_driver {prefix}_drivers[{prefix_upper}_NUM_NPUS];
+static int {prefix}_npus_ready = 0;
+
+// One base-pointer table per NPU slot: every region but the weights points at that slot's copy.
+static uint64_t {prefix}_slot_base_addr[{prefix_upper}_NUM_NPUS][ETHOSU_MAX_REGIONS];
+
+int {prefix}_init(void) {{
+    if ({prefix}_npus_ready) return 0;
+
+    for (int r = 0; r < ETHOSU_MAX_REGIONS; ++r) {{
+        if (!{prefix}_base_addr[r]) {{
+            {prefix}_base_addr[r] = (uint64_t)(uintptr_t)get_region_base_ptr(r);
+        }}
+    }}
+    for (int s = 0; s < {prefix_upper}_NUM_NPUS; ++s) {{
+        for (int r = 0; r < ETHOSU_MAX_REGIONS; ++r) {{
+            {prefix}_slot_base_addr[s][r] = (uint64_t)(uintptr_t)get_region_slot_base_ptr(r, s);
+        }}
+        {prefix}_slot_base_addr[s][{weight_region}] = {prefix}_base_addr[{weight_region}]; // shared weights
+    }}
+
+    for (int n = 0; n < {prefix_upper}_NUM_NPUS; ++n) {{
+        int rc = ethosu_init(&{prefix}_drivers[n], ethosu_get_regs_base_n(n), 0, 0, /*secure*/0, /*privileged*/1);
+        if (rc) {{
+            while (n--) ethosu_deinit(&{prefix}_drivers[n]);
+            return rc;
+        }}
+    }}
+    {prefix}_npus_ready = 1;
+    return 0;
+}}
+
+void {prefix}_deinit(void) {{
+    if (!{prefix}_npus_ready) return;
+    for (int n = 0; n < {prefix_upper}_NUM_NPUS; ++n) {{
+        ethosu_deinit(&{prefix}_drivers[n]);
+    }}
+    {prefix}_npus_ready = 0;
+}}
+
+int {prefix}_npu_acquire(void) {{
+    if (!{prefix}_npus_ready) {{
+        int rc = {prefix}_init();
+        if (rc) return rc;
+    }}
+    struct ethosu_driver *drv = ethosu_reserve_driver();
+    for (int n = 0; n < {prefix_upper}_NUM_NPUS; ++n) {{
+        if (drv == &{prefix}_drivers[n]) return n;
+    }}
+    if (drv) ethosu_release_driver(drv); // Registered by someone else
+    return -1;
+}}
+
+int {prefix}_npu_start(int slot) {{
+    if (slot < 0 || slot >= {prefix_upper}_NUM_NPUS) return -1;
+    return ethosu_invoke_async(&{prefix}_drivers[slot],
+                               {prefix}_cmd_data, (int){prefix}_cmd_size,
+                               {prefix}_slot_base_addr[slot], {prefix}_base_size, ETHOSU_MAX_REGIONS,
+                               /*user_arg*/0);
+}}
+
+int {prefix}_npu_poll(int slot) {{
+    if (slot < 0 || slot >= {prefix_upper}_NUM_NPUS) return -1;
+    return ethosu_wait(&{prefix}_drivers[slot], false);
+}}
+
+int {prefix}_npu_wait(int slot) {{
+    if (slot < 0 || slot >= {prefix_upper}_NUM_NPUS) return -1;
+    return ethosu_wait(&{prefix}_drivers[slot], true);
+}}
+
+int {prefix}_invoke_slot(int slot) {{
+    int rc = {prefix}_npu_start(slot);
+    if (rc) return rc;
+    return {prefix}_npu_wait(slot);
+}}
+
+void {prefix}_npu_release(int slot) {{
+    if (slot < 0 || slot >= {prefix_upper}_NUM_NPUS) return;
+    ethosu_release_driver(&{prefix}_drivers[slot]);
+}}
+
+void {prefix}_irq_handler(int npu) {{
+    if (npu < 0 || npu >= {prefix_upper}_NUM_NPUS) return;
+    ethosu_irq_handler(&{prefix}_drivers[npu]);
+}}
+"""
+
+
+WEIGHT_STAGING_DECLS = """
+// Weight staging: {prefix}_init() copies the weights into a fast-memory buffer and
+// rebinds the weight region to it. Override this weak hook to do the copy with a
+// DMA engine; return 0 once the copy has completed, or non-zero to fall back to memcpy().
+int {prefix}_weights_dma_copy(void *dst, const void *src, size_t size);
+"""
+
+WEIGHT_STAGING_SOURCE = """
+// ---- Weight staging ----
+
+__attribute__(({attrs})) static uint8_t {prefix}_weights_staged[{size}];
+
+__attribute__((weak)) int {prefix}_weights_dma_copy(void *dst, const void *src, size_t size) {{
+    (void)dst;
+    (void)src;
+    (void)size;
+    return -1;
+}}
+
+static void {prefix}_stage_weights(void) {{
+    const uint8_t *src = get_region_base_ptr({region});
+    if ({prefix}_weights_dma_copy({prefix}_weights_staged, src, sizeof({prefix}_weights_staged)) != 0) {{
+        memcpy({prefix}_weights_staged, src, sizeof({prefix}_weights_staged));
+#ifdef CMSIS_device_header
+        // The NPU does not see the D-cache: write the copy back before the first invoke.
+        SCB_CleanDCache_by_Addr((void *){prefix}_weights_staged, (int32_t)sizeof({prefix}_weights_staged));
+#endif
+    }}
+    {prefix}_base_addr[{region}] = (uint64_t)(uintptr_t){prefix}_weights_staged;
+}}
+
+"""
+
+
+def weight_staging_report(model, summary, source_memory):
+    """
+    Describe the SRAM cost of staging the weights against the cycles Vela's
+    summary suggests it saves, as a list of lines.
+
+    The saving is the weight traffic per inference priced at the source
+    memory's bandwidth minus the same traffic at SRAM bandwidth. The NPU
+    overlaps transfers with compute, so this bounds the gain from above.
+    """
+    cost = int(model["weight_blob"].size)
+    lines = [f"SRAM cost:          {cost} bytes (staged copy of the weights)"]
+    if summary is None:
+        lines.append("Cycle savings:      unknown (no Vela summary CSV found; pass --summary-csv)")
+        return lines
+
+    # Summary columns per Vela memory area; bandwidths are in GB/s (2**30 bytes)
+    areas = {"SRAM": "sram", "DRAM": "dram", "ONCHIPFLASH": "on_chip_flash", "OFFCHIPFLASH": "off_chip_flash"}
+    storage = areas.get(str(summary.get("weights_storage_area", "")).upper().replace("_", ""), "dram")
+    if storage == "sram":
+        # Vela already priced weight reads at SRAM speed; compare with where the blob is linked
+        storage = "on_chip_flash" if source_memory.upper() in NONVOLATILE_MEMORIES else "dram"
+        read_bytes = int(summary.get("total_npu_encoded_weights", cost))
+    else:
+        read_bytes = int(summary.get(f"{storage}_weight_read_bytes", 0))
+
+    slow_bw = float(summary.get(f"{storage}_bandwidth", 0.0))
+    sram_bw = float(summary.get("sram_bandwidth", 0.0))
+    clock = float(summary.get("core_clock", 0.0))
+    if not (slow_bw and sram_bw and clock):
+        lines.append("Cycle savings:      unknown (summary CSV lacks bandwidth/clock columns)")
+        return lines
+
+    saved = read_bytes * clock * (1.0 / slow_bw - 1.0 / sram_bw) / 2**30
+    total = summary.get("cycles_total", 0)
+    lines.append(f"Weight reads:       {read_bytes} bytes/inference from {storage} ({slow_bw:.2f} GB/s, SRAM {sram_bw:.2f} GB/s)")
+    share = f" ({100.0 * saved / total:.1f}% of {total} cycles_total)" if total else ""
+    lines.append(f"Cycle savings:      <= {saved:.0f} cycles/inference{share}")
+    if saved > 0:
+        lines.append(f"SRAM per cycle:     {cost / saved:.1f} bytes per saved cycle")
+    return lines
+
+
+# Events counted by <prefix>_invoke_profiled() when --pmu-events is given no list,
+# per --pmu-target; the Ethos-U85 set is the counters reported in
+# example_models/performance/*_performance.txt. Ethos-U55/U65 name the ports
+# AXI0 (SRAM) and AXI1 (external memory) instead.
+DEFAULT_PMU_EVENTS = {
+    "ethos-u55": (
+        "NPU_ACTIVE", "MAC_ACTIVE",
+        "AXI1_RD_TRANS_COMPLETED", "AXI1_WR_TRANS_COMPLETED_M",
+        "AXI0_RD_TRANS_COMPLETED", "AXI0_WR_TRANS_COMPLETED_M",
+        "AXI1_RD_STALL_LIMIT", "AXI_LATENCY_ANY", "NPU_IDLE",
+    ),
+    "ethos-u85": (
+        "NPU_ACTIVE", "MAC_ACTIVE",
+        "EXT_RD_TRANS_COMPLETED", "EXT_WR_TRANS_COMPLETED_M",
+        "SRAM_RD_TRANS_COMPLETED", "SRAM_WR_TRANS_COMPLETED_M",
+        "EXT_RD_STALL_LIMIT", "AXI_LATENCY_ANY", "NPU_IDLE",
+    ),
+}
+DEFAULT_PMU_EVENTS["ethos-u65"] = DEFAULT_PMU_EVENTS["ethos-u55"]
+
+# Bundled driver header the event names are checked against, and the macro
+# selecting each NPU's event enum in it.
+PMU_HEADER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "ethos-u-core-driver-real", "include", "pmu_ethosu.h"
+)
+PMU_TARGETS = {"ethos-u55": "ETHOSU55", "ethos-u65": "ETHOSU65", "ethos-u85": "ETHOSU85"}
+
+
+def pmu_event_names(target, header=PMU_HEADER):
+    """
+    Event names (without the ETHOSU_PMU_ prefix) the bundled pmu_ethosu.h
+    defines for target, or None when the header is not available.
+    """
+    try:
+        with open(header) as f:
+            text = f.read()
+    except OSError:
+        return None
+    macro = PMU_TARGETS[target]
+    for cond, body in re.findall(r"#(?:el)?if ([^\n]*)\s*enum ethosu_pmu_event_type\s*\{(.*?)\};", text, re.S):
+        if f"defined({macro})" in cond:
+            return [n for n in re.findall(r"ETHOSU_PMU_(\w+)", body) if n not in ("NO_EVENT", "SENTINEL")]
+    return None
+
+
+PMU_API_DECLS = """
+// ---- PMU profiling ----
+// Only one generated runner per image may be built with PMU profiling: it provides
+// the driver's ethosu_inference_begin()/ethosu_inference_end() hooks.
+
+#define {prefix_upper}_PMU_NUM_EVENTS {num_events}
+
+typedef struct {{
+    uint64_t cycles; // NPU cycle counter (first pass)
+    uint32_t counts[{prefix_upper}_PMU_NUM_EVENTS]; // One per {prefix}_pmu_event_names[] entry
+    int      passes; // Inferences run to cover all events
+}} {prefix}_pmu_profile_t;
+
+extern const char *const {prefix}_pmu_event_names[{prefix_upper}_PMU_NUM_EVENTS];
+
+// Run the model once per ETHOSU_PMU_NCOUNTERS events (outputs are those of the last
+// pass), fill *profile if non-NULL and print it with {prefix}_print_profile().
+int  {prefix}_invoke_profiled({prefix}_pmu_profile_t *profile);
+
+// Print one "PMU,{prefix},<EVENT>,<count>" line per counter, starting with
+// PASSES and CYCLES. Override the output function with -D{prefix_upper}_PMU_PRINTF=...
+void {prefix}_print_profile(const {prefix}_pmu_profile_t *profile);
+"""
+
+PMU_API_SOURCE = """
+// ---- PMU profiling ----
+
+#ifndef {target_macro}
+#error "{prefix}_run.c was generated with PMU events for {target}; regenerate with the matching --pmu-target"
+#endif
+
+#ifndef {prefix_upper}_PMU_PRINTF
+#include <stdio.h>
+#define {prefix_upper}_PMU_PRINTF printf
+#endif
+
+static const enum ethosu_pmu_event_type {prefix}_pmu_events[{prefix_upper}_PMU_NUM_EVENTS] = {{
+{event_rows}
+}};
+
+const char *const {prefix}_pmu_event_names[{prefix_upper}_PMU_NUM_EVENTS] = {{
+{name_rows}
+}};
+
+// One profiling pass: up to ETHOSU_PMU_NCOUNTERS events. Passed as the invoke
+// user_arg; the driver soft-resets the NPU (and its PMU) before each inference,
+// so the counters are programmed in the begin hook, not before the invoke.
+struct {prefix}_pmu_pass {{
+    const enum ethosu_pmu_event_type *events;
+    uint32_t count;
+    uint64_t cycles;
+    uint32_t counts[ETHOSU_PMU_NCOUNTERS];
+}};
+
+void ethosu_inference_begin(struct ethosu_driver *drv, void *user_arg) {{
+    struct {prefix}_pmu_pass *pass = (struct {prefix}_pmu_pass *)user_arg;
+    if (!pass) return;
+
+    ETHOSU_PMU_Enable(drv);
+    for (uint32_t c = 0; c < ETHOSU_PMU_NCOUNTERS; ++c) {{
+        ETHOSU_PMU_Set_EVTYPER(drv, c, c < pass->count ? pass->events[c] : ETHOSU_PMU_NO_EVENT);
+    }}
+    ETHOSU_PMU_CYCCNT_Reset(drv);
+    ETHOSU_PMU_EVCNTR_ALL_Reset(drv);
+    ETHOSU_PMU_CNTR_Enable(drv, ETHOSU_PMU_CCNT_Msk | ((1UL << pass->count) - 1UL));
+}}
+
+void ethosu_inference_end(struct ethosu_driver *drv, void *user_arg) {{
+    struct {prefix}_pmu_pass *pass = (struct {prefix}_pmu_pass *)user_arg;
+    if (!pass) return;
+
+    ETHOSU_PMU_CNTR_Disable(drv, ETHOSU_PMU_CCNT_Msk | ((1UL << pass->count) - 1UL));
+    pass->cycles = ETHOSU_PMU_Get_CCNTR(drv);
+    for (uint32_t c = 0; c < pass->count; ++c) {{
+        pass->counts[c] = ETHOSU_PMU_Get_EVCNTR(drv, c);
+    }}
+    ETHOSU_PMU_Disable(drv);
+}}
+
+int {prefix}_invoke_profiled({prefix}_pmu_profile_t *profile) {{
+    {prefix}_pmu_profile_t local;
+    if (!profile) profile = &local;
+    if (!{prefix}_drv) {{
+        int rc = {prefix}_init();
+        if (rc) return rc;
+    }}
+
+    profile->passes = 0;
+    for (uint32_t first = 0; first < {prefix_upper}_PMU_NUM_EVENTS; first += ETHOSU_PMU_NCOUNTERS) {{
+        struct {prefix}_pmu_pass pass = {{0}};
+        pass.events = &{prefix}_pmu_events[first];
+        pass.count = {prefix_upper}_PMU_NUM_EVENTS - first;
+        if (pass.count > ETHOSU_PMU_NCOUNTERS) pass.count = ETHOSU_PMU_NCOUNTERS;
+
+        int rc = ethosu_invoke_v3({prefix}_drv,
+                                  {prefix}_cmd_data, (int){prefix}_cmd_size,
+                                  {prefix}_base_addr, {prefix}_base_size, ETHOSU_MAX_REGIONS,
+                                  &pass);
+        if (rc) return rc;
+
+        if (first == 0) profile->cycles = pass.cycles;
+        for (uint32_t c = 0; c < pass.count; ++c) {{
+            profile->counts[first + c] = pass.counts[c];
+        }}
+        profile->passes++;
+    }}
+
+    {prefix}_print_profile(profile);
+    return 0;
+}}
+
+void {prefix}_print_profile(const {prefix}_pmu_profile_t *profile) {{
+    {prefix_upper}_PMU_PRINTF("PMU,{prefix},PASSES,%d\\n", profile->passes);
+    {prefix_upper}_PMU_PRINTF("PMU,{prefix},CYCLES,%llu\\n", (unsigned long long)profile->cycles);
+    for (int i = 0; i < {prefix_upper}_PMU_NUM_EVENTS; ++i) {{
+        {prefix_upper}_PMU_PRINTF("PMU,{prefix},%s,%lu\\n", {prefix}_pmu_event_names[i], (unsigned long)profile->counts[i]);
+    }}
+}}
+"""
+
+
+def pmu_api_source(prefix, events, target):
+    return PMU_API_SOURCE.format(
+        prefix=prefix,
+        prefix_upper=prefix.upper(),
+        target=target,
+        target_macro=PMU_TARGETS[target],
+        event_rows="\n".join(f"    ETHOSU_PMU_{name}," for name in events),
+        name_rows="\n".join(f'    "{name}",' for name in events),
+    )
+
+
+def write_cache_hooks(f, model):
+    """
+    Emit strong ethosu_flush_dcache()/ethosu_invalidate_dcache() overrides that
+    only touch the tensor ranges from cache_ranges(), using CMSIS cache
+    operations (which round the range out to whole cache lines).
+    """
+    flush, invalidate = cache_ranges(model)
+
+    def calls(func, ranges):
+        lines = [
+            f"    {func}((void *)(uintptr_t)(base_addr[{region}] + {offset}u), {size}); // {label}"
+            for region, offset, size, label in merge_ranges(ranges)
+        ]
+        return "\n".join(lines) if lines else "    (void)base_addr;"
+
+    f.write(textwrap.dedent("""
+        // ---- D-cache maintenance ----
+        // Overrides the driver's weak hooks so that only the bytes the model needs are
+        // cleaned/invalidated; the weights region is read-only and never touched.
+        // Only one generated runner per image may provide these hooks.
+
+        #ifdef CMSIS_device_header
+        #include CMSIS_device_header
+        #else
+        #error "D-cache maintenance uses the CMSIS SCB_*DCache_by_Addr() calls: define CMSIS_device_header"
+        #endif
+
+        void ethosu_flush_dcache(const uint64_t *base_addr, const size_t *base_addr_size, int num_base_addr) {
+            (void)base_addr_size;
+            (void)num_base_addr;
+        %s
+        }
+
+        void ethosu_invalidate_dcache(const uint64_t *base_addr, const size_t *base_addr_size, int num_base_addr) {
+            (void)base_addr_size;
+            (void)num_base_addr;
+        %s
+        }
+        """) % (calls("SCB_CleanDCache_by_Addr", flush), calls("SCB_InvalidateDCache_by_Addr", invalidate)))
+
+
+def write_runner(out_dir, prefix, model, region_caps, region_sources, async_api=False, cache_hooks=False,
+                 bind_io=False, io_buffers=1, bundle=None, stage_weights=False, placement=None,
+                 stage_memory=None, pmu_events=None, pmu_target="ethos-u85", num_npus=1, quant=None):
+    """
+    Runner with a persistent driver handle: <prefix>_init() binds the region
+    table and reserves the driver once, <prefix>_invoke() only runs the
+    command stream and <prefix>_deinit() releases the driver.
+
+    With async_api, <prefix>_invoke_async() starts an inference and returns
+    immediately; <prefix>_poll()/<prefix>_wait() finish it and call the
+    completion callback, and a weak ISR hook can wake an RTOS task.
+
+    Typed accessors return pointers straight into the input/output tensors;
+    with bind_io, tensors alone in their region can be redirected to
+    caller-owned buffers.
+
+    With io_buffers > 1, a ring API pipelines inferences over that many copies
+    of the input/output regions (see write_buffers()).
+
+    With bundle, the model is part of a multi-model bundle (vela_multi_to_c.py):
+    its regions come from <prefix>_get_region_base_ptr() and the NPU driver is
+    the one shared by the bundle (<bundle>_npu_driver()).
+
+    With stage_weights, <prefix>_init() copies the weights into a static buffer
+    (in stage_memory's section when placement is given) through a weak DMA hook
+    with a memcpy() fallback and rebinds the weight region to the copy.
+
+    With pmu_events, <prefix>_invoke_profiled() counts those PMU events (names
+    without the ETHOSU_PMU_ prefix, valid for pmu_target), running as many
+    passes as the hardware counters require.
+
+    With num_npus > 1, <prefix>_init() initializes that many drivers instead
+    and a dispatcher API (<prefix>_npu_acquire()/_start()/_wait()/_release())
+    runs each inference on the next free NPU in that NPU's copy of the
+    regions (see write_buffers()).
+
+    With quant (from io_quantization()), quantize/dequantize/argmax/top-k
+    helpers work directly on the quantized input/output tensors; with
+    io_buffers > 1 or num_npus > 1 they take the slot to work on.
+    """
+    h_run = os.path.join(out_dir, f"{prefix}_run.h")
+    slotted = io_buffers > 1 or num_npus > 1
+    c_run = os.path.join(out_dir, f"{prefix}_run.c")
+    region_fn = f"{prefix}_get_region_base_ptr" if bundle else "get_region_base_ptr"
+
+    if num_npus > 1:
+        driver_decls = MULTI_NPU_DECLS.format(
+            prefix=prefix, prefix_upper=prefix.upper(), num_npus=num_npus,
+            accessors=slot_accessor_decls(prefix, model, region_sources)
+        )
+    elif bundle:
+        driver_decls = textwrap.dedent(f"""\
+            // Bind the region table and attach to the NPU driver shared by the {bundle} bundle.
+            int  {prefix}_init(void);
+
+            // Run one inference (calls {prefix}_init() on first use).
+            int  {prefix}_invoke(void);
+
+            // Detach from the shared driver (see {bundle}_npu_deinit()).
+            void {prefix}_deinit(void);
+            """)
+    else:
+        driver_decls = textwrap.dedent(f"""\
+            // Initialize and reserve the NPU driver and bind the region table. Call once at startup.
+            int  {prefix}_init(void);
+
+            // Run one inference (calls {prefix}_init() on first use).
+            int  {prefix}_invoke(void);
+
+            // Release the driver reserved by {prefix}_init().
+            void {prefix}_deinit(void);
+
+            // Route the NPU interrupt here from your platform's IRQ vector.
+            void {prefix}_irq_handler(void);
+            """)
+
+    with open(h_run, "w") as f:
+        f.write(HEADER.format(npz_name=model["npz_name"]))
+        f.write(textwrap.dedent("""\
+            #pragma once
             #include <stddef.h>
-            #include "ethosu_driver.h"
-            #include "{args.prefix}_cmd_data.h"
-            #include "{args.prefix}_weights.h"
-            #include "{args.prefix}_meta.h"
-            #include "{args.prefix}_buffers.h"
+            #include <stdint.h>
+
+            #ifdef __cplusplus
+            extern "C" {
+            #endif
+
+            """))
+        f.write(driver_decls)
+        f.write(io_api_decls(prefix, model, region_sources, bind_io))
+        if stage_weights:
+            f.write(WEIGHT_STAGING_DECLS.format(prefix=prefix))
+        if pmu_events:
+            f.write(PMU_API_DECLS.format(prefix=prefix, prefix_upper=prefix.upper(), num_events=len(pmu_events)))
+        if async_api:
+            async_decls = ASYNC_API_DECLS.format(prefix=prefix)
+            if bundle:
+                # The bundle owns the interrupt entry, so there is no per-model ISR hook
+                async_decls = async_decls[:async_decls.index("\n// Called from")] + "\n"
+            f.write(async_decls)
+        if io_buffers > 1:
+            f.write(ring_api_decls(prefix, model, region_sources, io_buffers))
+        if quant:
+            f.write(quant_api_decls(prefix, model, region_sources, quant, slotted))
+        f.write(textwrap.dedent("""
+            #ifdef __cplusplus
+            }
+            #endif
+            """))
+
+    sizes = region_sizes(model, region_caps)
+    size_rows = "\n".join(
+        f"    {sizes[r]}, // region {r}: {region_comment(model, region_sources, r)}"
+        for r in range(MAX_REGIONS)
+    )
 
-            // Provide your platform's NPU register base here.
-            extern void *ethosu_get_regs_base(void);
+    if num_npus > 1:
+        driver_source = MULTI_NPU_SOURCE.format(
+            prefix=prefix, prefix_upper=prefix.upper(), weight_region=model["weight_region"]
+        ).lstrip("\n") + slot_accessor_source(prefix, model, region_sources)
+    elif bundle:
+        driver_source = textwrap.dedent(f"""\
+            static struct ethosu_driver *{prefix}_drv = 0;
 
-            int {args.prefix}_invoke(void) {{
-                uint64_t base_addr[ETHOSU_MAX_REGIONS] = {{0}};
-                size_t   base_size[ETHOSU_MAX_REGIONS] = {{0}};
+            int {prefix}_init(void) {{
+                if ({prefix}_drv) return 0;
 
-                // Bind all present regions (weights + any allocated regions).
                 for (int r = 0; r < ETHOSU_MAX_REGIONS; ++r) {{
-                    uint8_t* p = get_region_base_ptr(r);
-                    size_t   s = get_region_size(r);
-                    if (p && s) {{
-                        base_addr[r] = (uint64_t)(uintptr_t)p;
-                        base_size[r] = s;
+                    if (!{prefix}_base_addr[r]) {{
+                        {prefix}_base_addr[r] = (uint64_t)(uintptr_t){region_fn}(r);
                     }}
                 }}
 
-                // Init driver and run
-                struct ethosu_driver drv = {{0}};
-                int rc = ethosu_init(&drv, ethosu_get_regs_base(), 0, 0, /*secure*/0, /*privileged*/1);
+                {prefix}_drv = {bundle}_npu_driver();
+                return {prefix}_drv ? 0 : -1;
+            }}
+
+            int {prefix}_invoke(void) {{
+                if (!{prefix}_drv) {{
+                    int rc = {prefix}_init();
+                    if (rc) return rc;
+                }}
+                return ethosu_invoke_v3({prefix}_drv,
+                                        {prefix}_cmd_data, (int){prefix}_cmd_size,
+                                        {prefix}_base_addr, {prefix}_base_size, ETHOSU_MAX_REGIONS,
+                                        /*user_arg*/0);
+            }}
+
+            void {prefix}_deinit(void) {{
+                {prefix}_drv = 0;
+            }}
+            """)
+    else:
+        driver_source = textwrap.dedent(f"""\
+            static struct ethosu_driver  {prefix}_driver;
+            static struct ethosu_driver *{prefix}_drv = 0;
+
+            int {prefix}_init(void) {{
+                if ({prefix}_drv) return 0;
+
+                for (int r = 0; r < ETHOSU_MAX_REGIONS; ++r) {{
+                    if (!{prefix}_base_addr[r]) {{
+                        {prefix}_base_addr[r] = (uint64_t)(uintptr_t){region_fn}(r);
+                    }}
+                }}
+
+                int rc = ethosu_init(&{prefix}_driver, ethosu_get_regs_base(), 0, 0, /*secure*/0, /*privileged*/1);
                 if (rc) return rc;
 
-                // Optional: configure cache handling per region (defaults to scratch only).
-                // ethosu_set_basep_cache_mask(&drv, /*flush_mask*/0xFF, /*invalidate_mask*/0xFF);
+                // Cache maintenance only needs the regions in {prefix.upper()}_CACHE_FLUSH_MASK and
+                // {prefix.upper()}_CACHE_INVALIDATE_MASK (see {prefix}_meta.h); generate with
+                // --cache-maintenance to get ethosu_flush_dcache()/ethosu_invalidate_dcache() that do just that.
+
+                // The pool hands out the first free registered driver; the interrupt is
+                // routed to {prefix}_driver, so any other instance is refused.
+                {prefix}_drv = ethosu_reserve_driver();
+                if ({prefix}_drv != &{prefix}_driver) {{
+                    if ({prefix}_drv) ethosu_release_driver({prefix}_drv);
+                    {prefix}_drv = 0;
+                    ethosu_deinit(&{prefix}_driver);
+                    return -1;
+                }}
+                return 0;
+            }}
+
+            int {prefix}_invoke(void) {{
+                if (!{prefix}_drv) {{
+                    int rc = {prefix}_init();
+                    if (rc) return rc;
+                }}
+                return ethosu_invoke_v3({prefix}_drv,
+                                        {prefix}_cmd_data, (int){prefix}_cmd_size,
+                                        {prefix}_base_addr, {prefix}_base_size, ETHOSU_MAX_REGIONS,
+                                        /*user_arg*/0);
+            }}
+
+            void {prefix}_deinit(void) {{
+                if (!{prefix}_drv) return;
+                ethosu_release_driver({prefix}_drv);
+                ethosu_deinit(&{prefix}_driver);
+                {prefix}_drv = 0;
+            }}
 
-                rc = ethosu_invoke(&drv,
-                                   {args.prefix}_cmd_data, (int){args.prefix}_cmd_size,
-                                   base_addr, base_size, ETHOSU_MAX_REGIONS);
-                // Wait for completion if using async interface; here we use the sync wrapper.
-                ethosu_deinit(&drv);
-                return rc;
+            void {prefix}_irq_handler(void) {{
+                ethosu_irq_handler(&{prefix}_driver);%s
             }}
+            """) % (f"\n    {prefix}_npu_done_isr();" if async_api else "")
+
+    if stage_weights:
+        bind_loop = "    for (int r = 0; r < ETHOSU_MAX_REGIONS; ++r) {"
+        driver_source = driver_source.replace(
+            bind_loop, f"    {prefix}_stage_weights(); // Sets the weight region entry\n\n{bind_loop}", 1
+        )
+
+    with open(c_run, "w") as f:
+        f.write(HEADER.format(npz_name=model["npz_name"]))
+        f.write(textwrap.dedent(f"""\
+            #include <stdint.h>
+            #include <stddef.h>
+            #include "ethosu_driver.h"
+            #include "{prefix}_cmd_data.h"
+            #include "{prefix}_meta.h"
+            #include "{prefix}_buffers.h"
+            #include "{prefix}_run.h"
             """))
+        if pmu_events:
+            f.write('#include "pmu_ethosu.h"\n')
+        if stage_weights:
+            f.write(textwrap.dedent("""\
+                #include <string.h>
+                #ifdef CMSIS_device_header
+                #include CMSIS_device_header
+                #endif
+                """))
+        if bundle:
+            f.write(f'#include "{bundle}_bundle.h"\n')
+        elif num_npus > 1:
+            f.write(textwrap.dedent("""
+                // Provide your platform's register base of NPU <npu> here.
+                extern void *ethosu_get_regs_base_n(int npu);
+                """))
+        else:
+            f.write(textwrap.dedent("""
+                // Provide your platform's NPU register base here.
+                extern void *ethosu_get_regs_base(void);
+                """))
+        f.write(textwrap.dedent(f"""
+            // Region sizes are fixed by Vela and emitted at generation time.
+            static const size_t {prefix}_base_size[ETHOSU_MAX_REGIONS] = {{
+            %s
+            }};
+
+            // Region addresses are only known at link time (and a pointer cannot be a
+            // portable 64-bit static initializer), so they are bound once in {prefix}_init().
+            // Entries that are already set (bound I/O buffers) are kept.
+            static uint64_t {prefix}_base_addr[ETHOSU_MAX_REGIONS];
+
+            """) % size_rows)
+        if stage_weights:
+            weight_region = model["weight_region"]
+            attrs = buffer_attrs(prefix, {weight_region: stage_memory} if placement else None, weight_region)
+            f.write(WEIGHT_STAGING_SOURCE.format(
+                prefix=prefix, attrs=attrs, size=int(model["weight_blob"].size), region=weight_region
+            ))
+        f.write(driver_source)
+        f.write(io_api_source(prefix, model, region_sources, bind_io, region_fn))
+        if pmu_events:
+            f.write(pmu_api_source(prefix, pmu_events, pmu_target))
+        if async_api:
+            async_source = ASYNC_API_SOURCE.format(prefix=prefix)
+            if bundle:
+                async_source = async_source.replace(
+                    f"__attribute__((weak)) void {prefix}_npu_done_isr(void) {{\n}}\n\n", "", 1
+                )
+            f.write(async_source)
+        if io_buffers > 1:
+            f.write(ring_api_source(prefix, model, region_sources, stage_weights))
+        if quant:
+            f.write(quant_api_source(prefix, model, region_sources, quant, slotted))
+        if cache_hooks:
+            write_cache_hooks(f, model)
+    return h_run, c_run
+
+
+def generate(npz_path, out_dir, prefix, async_api=False, cache_hooks=False, bind_io=False, io_buffers=1,
+             vela_config=None, system_config=None, memory_mode=None, placement_overrides=None, load_memory="MRAM",
+             stage_weights=False, stage_memory=None, summary_csv=None, pmu_events=None, pmu_target="ethos-u85",
+             num_npus=1, tflite=None, backend="auto"):
+    """
+    Generate all C sources for one Vela raw .npz. Returns the written paths.
+
+    With vela_config/system_config/memory_mode and/or placement_overrides the
+    region buffers and weights get section attributes and a matching
+    <prefix>_placement.ld fragment is written.
+
+    With stage_weights the runner copies the weights into fast memory at init.
+    If the placement puts the weights in volatile memory, that is where the
+    copy goes and the weights themselves move to load_memory.
+
+    With pmu_events the runner also gets <prefix>_invoke_profiled().
+
+    With num_npus > 1 the runner is a dispatcher over that many NPUs.
 
-    print(f"Generated:\n  {h_cmd}\n  {h_weights}\n  {h_meta}\n  {h_buf}\n  {c_buf}\n  {c_run}")
+    With tflite (the model Vela compiled), the runner also gets quantization
+    helpers for the quantized inputs/outputs.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    model = load_vela_npz(npz_path)
+    region_caps, region_sources = compute_regions(model)
+
+    placement = None
+    if vela_config or placement_overrides:
+        areas = vela_memory_areas(vela_config, system_config, memory_mode) if vela_config else None
+        placement = resolve_placement(model, region_caps, areas, placement_overrides, system_config)
+
+    weight_memory = (placement or {}).get(model["weight_region"])
+    if stage_weights:
+        if not stage_memory:
+            volatile = weight_memory and weight_memory.upper() not in NONVOLATILE_MEMORIES
+            stage_memory = weight_memory if volatile else "SRAM"
+        if placement and (not weight_memory or weight_memory.upper() not in NONVOLATILE_MEMORIES):
+            placement[model["weight_region"]] = weight_memory = load_memory
+
+    paths = [
+        write_cmd_header(out_dir, prefix, model),
+        write_weights_header(out_dir, prefix, model, placement),
+        write_meta_header(out_dir, prefix, model),
+    ]
+    if io_buffers > 1:
+        ring = ring_regions(model, region_sources)
+        shared = [name for r in ring for name, _, _, _ in region_sources[r] if name not in ("INPUT", "OUTPUT")]
+        if "VARIABLE" in shared:
+            print(f"Warning: variables share an I/O region; each of the {io_buffers} slots keeps its own state")
+        elif shared:
+            print(f"Note: scratch shares an I/O region, so it is replicated {io_buffers}x as well")
+    quant = io_quantization(tflite, model, backend) if tflite else None
+    if num_npus > 1 and model["variables"]:
+        print(f"Warning: the model has variables; each of the {num_npus} NPU slots keeps its own state")
+
+    paths.extend(write_buffers(out_dir, prefix, model, region_caps, region_sources, io_buffers, placement, num_npus,
+                               CACHE_LINE if cache_hooks else 0))
+    if placement:
+        description = f"System_Config {system_config}, Memory_Mode {memory_mode}" if vela_config else "explicit"
+        paths.append(write_placement_ld(
+            out_dir, prefix, model, region_sources, placement, description, load_memory,
+            stage_memory if stage_weights else None
+        ))
+        if weight_memory and weight_memory.upper() not in NONVOLATILE_MEMORIES:
+            print(f"Note: weights are placed in {weight_memory}; copy them from {load_memory} at startup "
+                  f"(see {prefix}_placement.ld)")
+    paths.extend(write_runner(
+        out_dir, prefix, model, region_caps, region_sources, async_api, cache_hooks, bind_io, io_buffers,
+        stage_weights=stage_weights, placement=placement, stage_memory=stage_memory,
+        pmu_events=pmu_events, pmu_target=pmu_target, num_npus=num_npus, quant=quant
+    ))
+
+    if stage_weights:
+        if summary_csv is None:
+            stem = os.path.basename(npz_path)
+            stem = stem[:-len("_vela.npz")] if stem.endswith("_vela.npz") else os.path.splitext(stem)[0]
+            summary_csv = find_summary_csv(os.path.dirname(os.path.abspath(npz_path)), stem, system_config)
+        summary = read_summary_csv(summary_csv) if summary_csv else None
+        print(f"Weight staging ({prefix}_weights -> {stage_memory}"
+              f"{f', summary {os.path.basename(str(summary_csv))}' if summary_csv else ''}):")
+        for line in weight_staging_report(model, summary, weight_memory or "MRAM"):
+            print(f"  {line}")
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert Vela raw .npz to C for Ethos-U driver")
+    ap.add_argument("npz", help="Vela raw output (.npz) produced with --output-format raw")
+    ap.add_argument("--out-dir", default="gen", help="Output directory for generated C")
+    ap.add_argument("--prefix", default="model", help="Symbol prefix for generated arrays")
+    ap.add_argument("--async", dest="async_api", action="store_true",
+                    help="Also generate <prefix>_invoke_async()/_poll()/_wait() with a completion callback")
+    ap.add_argument("--cache-maintenance", action="store_true",
+                    help="Override ethosu_flush_dcache()/ethosu_invalidate_dcache() to touch only the "
+                         "input/output/variable/scratch ranges (Cortex-M D-cache via CMSIS)")
+    ap.add_argument("--bind-io", action="store_true",
+                    help="Generate <prefix>_bind_input<i>()/_output<i>() for inputs/outputs that Vela placed "
+                         "alone in a region, so caller-owned buffers are used without copies")
+    ap.add_argument("--io-buffers", type=int, default=1, metavar="K",
+                    help="Allocate K copies of the regions holding inputs/outputs and generate a ring API "
+                         "(<prefix>_ring_start()/_ring_wait()) that pipelines frames across them (default: 1)")
+    ap.add_argument("--vela-config", default=None,
+                    help="Vela .ini used to compile the model; with --system-config/--memory-mode, places each "
+                         "region in the memory Vela assumed and writes <prefix>_placement.ld")
+    ap.add_argument("--system-config", default=None, help="Vela System_Config name (with --vela-config)")
+    ap.add_argument("--memory-mode", default=None, help="Vela Memory_Mode name (with --vela-config)")
+    ap.add_argument("--placement", nargs="+", default=None, metavar="KEY=MEMORY",
+                    help="Explicit placement: KEY is weights, scratch, scratch_fast, a region index or a Vela "
+                         "memory type (Sram/Dram/OffChipFlash); MEMORY is a linker MEMORY region, e.g. "
+                         "weights=MRAM scratch=TCM. Overrides --vela-config")
+    ap.add_argument("--load-memory", default="MRAM",
+                    help="Load memory for weights placed in volatile memory (default: MRAM)")
+    ap.add_argument("--stage-weights", action="store_true",
+                    help="Copy the weights into fast memory in <prefix>_init() (weak <prefix>_weights_dma_copy() "
+                         "hook, memcpy() fallback) and rebind the weight region to the copy")
+    ap.add_argument("--stage-memory", default=None,
+                    help="Memory for the staged weights with --stage-weights (default: where the placement "
+                         "puts the weights if volatile, else SRAM)")
+    ap.add_argument("--summary-csv", default=None,
+                    help="Vela summary CSV for the --stage-weights report (default: found next to the .npz)")
+    ap.add_argument("--pmu-events", nargs="*", default=None, metavar="EVENT",
+                    help="Generate <prefix>_invoke_profiled() counting these PMU events (pmu_ethosu.h names "
+                         "without ETHOSU_PMU_, e.g. NPU_ACTIVE MAC_ACTIVE); with no names, the events in "
+                         "example_models/performance/*_performance.txt")
+    ap.add_argument("--pmu-target", choices=sorted(PMU_TARGETS), default="ethos-u85",
+                    help="NPU whose PMU event set --pmu-events is checked against (default: ethos-u85)")
+    ap.add_argument("--num-npus", type=int, default=1, metavar="N",
+                    help="Generate a dispatcher over N NPUs (driver reserve/release pool) with one copy of the "
+                         "scratch/IO regions per NPU, so independent inferences run in parallel (default: 1)")
+    ap.add_argument("--tflite", default=None,
+                    help="The .tflite Vela compiled; generates <prefix>_input<i>_quantize()/_quantize_q15() and "
+                         "<prefix>_output<i>_dequantize()/_argmax()/_topk() from its scales and zero points")
+    ap.add_argument("--backend", choices=BACKEND_CHOICES, default="auto",
+                    help="TFLite interpreter used to read --tflite (default: auto)")
+    args = ap.parse_args()
+
+    if args.vela_config and not (args.system_config and args.memory_mode):
+        ap.error("--vela-config requires --system-config and --memory-mode")
+    overrides = {}
+    for item in args.placement or []:
+        key, sep, memory = item.partition("=")
+        valid_key = key in PLACEMENT_ROLES or key in VELA_MEM_TYPES or (key.isdigit() and int(key) < MAX_REGIONS)
+        if not sep or not memory or not valid_key:
+            ap.error(f"invalid --placement entry: {item}")
+        overrides[key] = memory
+
+    pmu_events = None
+    if args.pmu_events is not None:
+        pmu_events = [e.upper().removeprefix("ETHOSU_PMU_") for e in args.pmu_events]
+        pmu_events = pmu_events or list(DEFAULT_PMU_EVENTS[args.pmu_target])
+        known = pmu_event_names(args.pmu_target)
+        unknown = [e for e in pmu_events if known is not None and e not in known]
+        if unknown:
+            ap.error(f"unknown {args.pmu_target} PMU event(s): {', '.join(unknown)}")
+        if len(set(pmu_events)) != len(pmu_events):
+            ap.error("--pmu-events lists an event twice")
+
+    if args.io_buffers < 1:
+        ap.error("--io-buffers must be at least 1")
+    if args.io_buffers > 1 and args.bind_io:
+        ap.error("--io-buffers and --bind-io are mutually exclusive")
+    if args.num_npus < 1:
+        ap.error("--num-npus must be at least 1")
+    if args.num_npus > 1:
+        for flag, used in (("--async", args.async_api), ("--bind-io", args.bind_io),
+                           ("--io-buffers", args.io_buffers > 1), ("--pmu-events", pmu_events)):
+            if used:
+                ap.error(f"{flag} is not supported with --num-npus (the dispatcher is asynchronous per NPU slot)")
+
+    paths = generate(
+        args.npz, args.out_dir, args.prefix, args.async_api, args.cache_maintenance, args.bind_io, args.io_buffers,
+        args.vela_config, args.system_config, args.memory_mode, overrides, args.load_memory,
+        args.stage_weights, args.stage_memory, args.summary_csv, pmu_events, args.pmu_target, args.num_npus,
+        args.tflite, args.backend
+    )
+
+    print("Generated:\n" + "\n".join(f"  {p}" for p in paths))
     print("\nUsage example:\n  gcc -Igen -c gen/{p}_buffers.c -c gen/{p}_run.c -o app.o  # plus your platform glue & driver\n".format(p=args.prefix))
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Vela Summary CSV Helpers
+
+Vela writes a one-row `<model>_summary_<SystemConfig>.csv` next to its output
+for every compile. These helpers locate and parse those files so that the
+slice, reporting and regression tools all read the metrics the same way.
+"""
+
+import csv
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Text columns; every other column is parsed as a number.
+TEXT_COLUMNS = {
+    "experiment",
+    "network",
+    "accelerator_configuration",
+    "system_config",
+    "memory_mode",
+    "weights_storage_area",
+    "feature_map_storage_area",
+}
+
+
+def _parse_value(key: str, value: str) -> Union[str, int, float]:
+    if key in TEXT_COLUMNS:
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def read_summary_csv(path: Union[str, Path]) -> Dict[str, Union[str, int, float]]:
+    """Read a Vela summary CSV and return its (single) row with numeric values parsed."""
+    with open(path, "r", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    if not rows:
+        raise ValueError(f"Vela summary CSV has no rows: {path}")
+
+    return {key: _parse_value(key, value) for key, value in rows[0].items()}
+
+
+def find_summary_csv(
+    directory: Union[str, Path],
+    model_name: Optional[str] = None,
+    system_config: Optional[str] = None,
+) -> Optional[Path]:
+    """
+    Find the Vela summary CSV in `directory`.
+
+    Prefers `<model_name>_summary_<system_config>.csv` when both are given and
+    falls back to the first `*_summary_*.csv` (sorted) otherwise.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return None
+
+    if model_name and system_config:
+        candidate = directory / f"{model_name}_summary_{system_config}.csv"
+        if candidate.exists():
+            return candidate
+
+    pattern = f"{model_name}_summary_*.csv" if model_name else "*_summary_*.csv"
+    matches = sorted(directory.glob(pattern))
+    if system_config:
+        preferred = [p for p in matches if p.stem.endswith(f"_summary_{system_config}")]
+        if preferred:
+            return preferred[0]
+    return matches[0] if matches else None
@@ -148,7 +148,21 @@ Examples:
         default=None,
         help='Prefix for vela_raw_to_c.py (overrides --vela-prefix if set)'
     )
+
+    parser.add_argument(
+        '--emit-placement',
+        action='store_true',
+        help='Place region buffers/weights in the memories named by --vela-config/--system-config/'
+             '--memory-mode and write <prefix>_placement.ld (vela_raw_to_c.py --vela-config)'
+    )
     
+    parser.add_argument(
+        '--quant-helpers',
+        action='store_true',
+        help='Generate quantize/dequantize/argmax/top-k helpers from the model quantization '
+             '(vela_raw_to_c.py --tflite)'
+    )
+
     # generate_c_arrays.py arguments
     parser.add_argument(
         '--c-arrays-output',
@@ -185,6 +199,48 @@ Examples:
         help='Optional expected output tensor .npy file to verify against generate_c_arrays.py output'
     )
 
+    parser.add_argument(
+        '--num-vectors',
+        type=int,
+        default=None,
+        help='Number of random test vectors for generate_c_arrays.py (emits packed [N][size] arrays)'
+    )
+
+    parser.add_argument(
+        '--input-dir',
+        type=str,
+        default=None,
+        help='Optional directory of input tensor .npy files (one test vector per file) for generate_c_arrays.py'
+    )
+
+    parser.add_argument(
+        '--num-threads',
+        type=int,
+        default=None,
+        help='Number of TFLite interpreter threads for generate_c_arrays.py'
+    )
+
+    parser.add_argument(
+        '--golden-cache-dir',
+        type=str,
+        default=None,
+        help='Golden output cache directory for generate_c_arrays.py (default: $VELA_GOLDEN_CACHE_DIR)'
+    )
+
+    parser.add_argument(
+        '--golden-digest',
+        choices=('crc32', 'fnv1a64'),
+        default=None,
+        help='Emit per-vector output digests and a C verifier instead of the output arrays (generate_c_arrays.py)'
+    )
+
+    parser.add_argument(
+        '--golden-tolerance',
+        type=int,
+        default=None,
+        help='Tolerance in LSBs for the --golden-digest verifier (default: 0, bit-exact)'
+    )
+
     parser.add_argument(
         '--use-model-sidecar-npy',
         action='store_true',
@@ -281,6 +337,7 @@ Examples:
     output_npy_path = resolve_optional_path(script_dir, args.output_npy)
     source_output_npy_path = resolve_optional_path(script_dir, args.source_output_npy)
     expected_output_npy_path = resolve_optional_path(script_dir, args.expected_output_npy)
+    input_dir_path = resolve_optional_path(script_dir, args.input_dir)
 
     if args.use_model_sidecar_npy:
         if input_npy_path is None:
@@ -303,6 +360,8 @@ Examples:
 
     if input_npy_path is not None:
         print(f"Input NPY:     {input_npy_path}")
+    if input_dir_path is not None:
+        print(f"Input dir:     {input_dir_path}")
     if source_output_npy_path is not None:
         print(f"Golden OFM:    {source_output_npy_path}")
     if expected_output_npy_path is not None:
@@ -404,6 +463,19 @@ Examples:
             '--prefix', prefix
         ]
         
+        if args.emit_placement:
+            vela_config_path = Path(args.vela_config)
+            if not vela_config_path.is_absolute():
+                vela_config_path = script_dir / vela_config_path
+            raw_to_c_cmd += [
+                '--vela-config', str(vela_config_path),
+                '--system-config', args.system_config,
+                '--memory-mode', args.memory_mode
+            ]
+        
+        if args.quant_helpers:
+            raw_to_c_cmd += ['--tflite', str(tflite_path)]
+
         success = run_command(raw_to_c_cmd, f"Step 2: Running vela_raw_to_c.py (prefix: {prefix})")
         
         if not success:
@@ -448,6 +520,18 @@ Examples:
             generate_cmd.extend(['--source-output-npy', str(source_output_npy_path)])
         if expected_output_npy_path is not None:
             generate_cmd.extend(['--expected-output-npy', str(expected_output_npy_path)])
+        if input_dir_path is not None:
+            generate_cmd.extend(['--input-dir', str(input_dir_path)])
+        if args.num_vectors is not None:
+            generate_cmd.extend(['--num-vectors', str(args.num_vectors)])
+        if args.num_threads is not None:
+            generate_cmd.extend(['--num-threads', str(args.num_threads)])
+        if args.golden_cache_dir is not None:
+            generate_cmd.extend(['--cache-dir', str(resolve_optional_path(script_dir, args.golden_cache_dir))])
+        if args.golden_digest is not None:
+            generate_cmd.extend(['--golden-digest', args.golden_digest])
+        if args.golden_tolerance is not None:
+            generate_cmd.extend(['--golden-tolerance', str(args.golden_tolerance)])
         
         success = run_command(generate_cmd, f"Step 3: Running generate_c_arrays.py")
         
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pytest
+
+from ethosu_cmd_analyze import analyze, operation_accesses
+from ethosu_cmd_decode import decode
+from vela_raw_to_c import load_vela_npz
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "example_models"
+
+
+def _decoded(npz):
+    model = load_vela_npz(str(EXAMPLES / npz))
+    return model, decode(model["cmd_data"].tobytes())
+
+
+@pytest.mark.parametrize("npz", [
+    "resnet_v1_8_32_tfs_int8/resnet_v1_8_32_tfs_int8_vela.npz",
+    "rnnoise_INT8/rnnoise_INT8_vela.npz",
+])
+def test_chained_feature_maps_are_not_memory_accesses(npz):
+    model, decoded = _decoded(npz)
+    operations = [op for stream in decoded["streams"] for op in stream["operations"]]
+    chained = [op for op in operations
+               if any(op.get(operand, {}).get("storage") == "CHAINED" for operand in ("ifm", "ifm2", "ofm"))]
+    assert decoded["arch"] == "ethos-u85" and chained
+
+    for op in chained:
+        operands = {access[1] for access in operation_accesses(op)}
+        for operand in ("ifm", "ifm2", "ofm"):
+            if op.get(operand, {}).get("storage") == "CHAINED":
+                assert operand not in operands
+
+    result = analyze(model, decoded)
+    assert result["warnings"] == []
+    assert result["problems"] == []
@@ -0,0 +1,40 @@
+import pickle
+
+import numpy as np
+
+import generate_cifar10_input as cifar
+
+
+def _write_batch(path, first_label, count=4):
+    data = np.arange(count * 3072, dtype=np.uint32).astype(np.uint8).reshape(count, 3072)
+    labels = [(first_label + i) % 10 for i in range(count)]
+    with open(path, "wb") as f:
+        pickle.dump({b"data": data, b"labels": labels}, f)
+
+
+def _fake_keras_datasets(root, relative):
+    data_dir = root / relative
+    data_dir.mkdir(parents=True)
+    for i, name in enumerate(cifar.CIFAR10_BATCHES["train"] + cifar.CIFAR10_BATCHES["test"]):
+        _write_batch(data_dir / name, i)
+    return data_dir
+
+
+def test_finds_keras3_target_layout(tmp_path, monkeypatch):
+    data_dir = _fake_keras_datasets(tmp_path, "cifar-10-batches-py-target/cifar-10-batches-py")
+    monkeypatch.setattr(cifar, "KERAS_DATASETS_DIR", tmp_path)
+
+    assert cifar.download_cifar10() == data_dir
+
+    images, labels = cifar.load_cifar10_split(use_test_set=True, cache_dir=tmp_path / "npy")
+    assert images.shape == (4, 32, 32, 3)
+    assert list(labels) == [5, 6, 7, 8]
+    train_images, _ = cifar.load_cifar10_split(cache_dir=tmp_path / "npy")
+    assert train_images.shape == (20, 32, 32, 3)
+
+
+def test_falls_back_to_keras2_layout(tmp_path, monkeypatch):
+    data_dir = _fake_keras_datasets(tmp_path, "cifar-10-batches-py")
+    monkeypatch.setattr(cifar, "KERAS_DATASETS_DIR", tmp_path)
+
+    assert cifar.find_cifar10_batches() == data_dir
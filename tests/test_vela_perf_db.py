@@ -0,0 +1,27 @@
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def _perf_db(db, *args):
+    return subprocess.run(
+        [sys.executable, str(REPO / "python" / "vela_perf_db.py"), "--db", str(db), *args],
+        capture_output=True, text=True,
+    )
+
+
+def test_check_without_baseline_fails(tmp_path):
+    result = _perf_db(tmp_path / "perf.sqlite", "check")
+    assert result.returncode == 1
+    assert "no baseline run" in result.stderr
+
+
+def test_check_baseline_label_skips_new_run(tmp_path):
+    db = tmp_path / "perf.sqlite"
+    assert _perf_db(db, "record", "--label", "nightly").returncode == 0
+
+    result = _perf_db(db, "check", "--label", "nightly", "--baseline", "nightly")
+    assert result.returncode == 0, result.stderr
+    assert "Run 2 vs baseline run 1" in result.stdout
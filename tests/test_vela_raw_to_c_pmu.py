@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import vela_raw_to_c
+
+REPO = Path(__file__).resolve().parent.parent
+KWS_NPZ = next((REPO / "example_models" / "kws_micronet_m").glob("*.npz"))
+
+
+@pytest.mark.parametrize("target", sorted(vela_raw_to_c.PMU_TARGETS))
+def test_default_events_exist_for_target(target):
+    defaults = vela_raw_to_c.DEFAULT_PMU_EVENTS[target]
+    assert set(defaults) <= set(vela_raw_to_c.pmu_event_names(target))
+    assert len(set(defaults)) == len(defaults)
+
+
+@pytest.mark.parametrize("target", ["ethos-u55", "ethos-u65"])
+def test_pmu_events_without_list_use_target_defaults(target, tmp_path):
+    subprocess.run(
+        [sys.executable, str(REPO / "python" / "vela_raw_to_c.py"), str(KWS_NPZ), "--out-dir", str(tmp_path),
+         "--prefix", "kws", "--pmu-events", "--pmu-target", target],
+        check=True, capture_output=True, text=True,
+    )
+    runner = (tmp_path / "kws_run.c").read_text()
+    for name in vela_raw_to_c.DEFAULT_PMU_EVENTS[target]:
+        assert f"ETHOSU_PMU_{name}," in runner
+    assert "ETHOSU_PMU_SRAM_RD_TRANS_COMPLETED" not in runner